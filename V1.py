@@ -1,9 +1,24 @@
+import time
+started = time.perf_counter()
 import os
 import sys
+from functools import partial
+from xmlgen.startup import StartupTimer
+
+# Time the imports below when started with --startup-report
+startup_timer = StartupTimer.from_argv("V1", started=started)
+
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
-import xml.etree.ElementTree as ET
-from xml.dom import minidom
+from xmlgen.authors import AuthorRegistry, load_registry
+from xmlgen.dates import DateError, complete_pub_dates
+from xmlgen.jobs import CANCELLED, DONE, FAILED, QUEUED, STAGES, JobQueue
+from xmlgen.journals import JournalStore, load_store
+from xmlgen.model import AUTHOR_FIELDS, ArticleForm, Author, PubDate, default_file_name, save_form
+from xmlgen.persian import normalize_form
+from xmlgen.profiling import options_from_argv, profile_call
+from xmlgen.pretty import DEFAULT_PRETTY_METHOD
+from xmlgen.validate import describe, validate_form
 
 class ScrollableFrame(ttk.Frame):
     def __init__(self, container, *args, **kwargs):
@@ -25,6 +40,185 @@ class ScrollableFrame(ttk.Frame):
         canvas.pack(side="left", fill="both", expand=True)
         scrollbar.pack(side="right", fill="y")
 
+# Label and entry width of each author field, in AUTHOR_FIELDS order
+AUTHOR_FORM_FIELDS = [
+    ("First Name", 15), ("Middle Name", 15), ("Last Name", 15), ("Suffix", 10),
+    ("First Name (FA)", 15), ("Middle Name (FA)", 15), ("Last Name (FA)", 15), ("Suffix (FA)", 10),
+    ("Email", 25), ("Code", 10), ("ORCID", 20), ("Core Author (Yes/No)", 10),
+    ("Affiliation", 30), ("Affiliation (FA)", 30)
+]
+
+class AuthorRow:
+    """The widgets of one on-screen author row; record is the author it shows"""
+    def __init__(self, frame, title, selected, variables):
+        self.frame = frame
+        self.title = title
+        self.selected = selected
+        self.variables = variables
+        self.record = None
+        self.index = None
+
+class VirtualAuthorList(ttk.Frame):
+    """Author editor that only builds widgets for the rows on screen.
+
+    The authors live in store (a list of Author records). A small pool of
+    rows is created to fill the visible height and re-bound to whichever
+    authors are scrolled into view, so the widget count does not grow with
+    the number of authors.
+    """
+    def __init__(self, container, store, prepare_entry=None, complete=None, *args, **kwargs):
+        super().__init__(container, *args, **kwargs)
+        self.store = store
+        self.prepare_entry = prepare_entry
+        self.complete = complete  # complete(record, value) fills record from an ORCID or email
+        self.selected = set()  # id() of the selected author records
+        self.first = 0  # Index of the author shown in the top row
+        self.visible = 1
+        self.rows = []
+        self.loading = False  # Set while rows are filled from the store
+        self.scroll_tag = "VirtualAuthorList%d" % id(self)
+
+        self.body = ttk.Frame(self)
+        self.body.columnconfigure(0, weight=1)
+        self.body.grid_propagate(False)  # The rows must not resize the list
+        self.scrollbar = ttk.Scrollbar(self, orient="vertical", command=self.yview)
+        self.scrollbar.pack(side="right", fill="y")
+        self.body.pack(side="left", fill="both", expand=True)
+
+        self.body.bind("<Configure>", self.on_resize)
+        self.bind_class(self.scroll_tag, "<MouseWheel>", self.on_mousewheel)
+        self.bind_class(self.scroll_tag, "<Button-4>", lambda e: self.yview("scroll", -1, "units"))
+        self.bind_class(self.scroll_tag, "<Button-5>", lambda e: self.yview("scroll", 1, "units"))
+        self.add_scroll_tag(self.body)
+
+        # One row is always built so its height can be measured
+        self.row_height = None
+        self.rows.append(self.make_row())
+
+    def add_scroll_tag(self, widget):
+        widget.bindtags((self.scroll_tag,) + widget.bindtags())
+
+    def make_row(self):
+        frame = ttk.Frame(self.body, padding="5", relief="groove")
+        self.add_scroll_tag(frame)
+        selected = tk.BooleanVar()
+        title = ttk.Checkbutton(frame, variable=selected)
+        title.grid(row=0, column=0, columnspan=8, sticky=tk.W, padx=(10, 5))
+        self.add_scroll_tag(title)
+        row = AuthorRow(frame, title, selected, {})
+        selected.trace_add("write", lambda *args: self.store_selection(row))
+
+        for i, ((label, width), key) in enumerate(zip(AUTHOR_FORM_FIELDS, AUTHOR_FIELDS)):
+            label_widget = ttk.Label(frame, text=label + ":", anchor='w')
+            label_widget.grid(row=i//4 + 1, column=(i % 4) * 2, sticky=tk.W, padx=(10, 5))
+            self.add_scroll_tag(label_widget)
+            if key == "coreauthor":  # Core author as a boolean checkbox
+                var = tk.BooleanVar()
+                widget = ttk.Checkbutton(frame, variable=var)
+            else:
+                var = tk.StringVar()
+                widget = ttk.Entry(frame, width=width, textvariable=var)
+                if self.prepare_entry:
+                    self.prepare_entry(widget)  # Enable copy-paste operations
+            widget.grid(row=i//4 + 1, column=(i % 4) * 2 + 1, padx=(5, 10), sticky=tk.W)
+            self.add_scroll_tag(widget)
+            var.trace_add("write", lambda *args, key=key, var=var: self.store_value(row, key, var))
+            row.variables[key] = var
+
+        remove_button = ttk.Button(frame, text="Remove", command=lambda: self.remove(row.index))
+        remove_button.grid(row=len(AUTHOR_FORM_FIELDS)//4 + 2, column=0, columnspan=8, pady=5)
+        self.add_scroll_tag(remove_button)
+        return row
+
+    def store_value(self, row, key, var):
+        if not self.loading and row.record is not None:
+            setattr(row.record, key, var.get())
+            if key in ("orcid", "email") and self.complete and self.complete(row.record, var.get()):
+                self.render()
+
+    def store_selection(self, row):
+        if self.loading or row.record is None:
+            return
+        if row.selected.get():
+            self.selected.add(id(row.record))
+        else:
+            self.selected.discard(id(row.record))
+
+    def on_resize(self, event):
+        if self.row_height is None:
+            self.update_idletasks()
+            self.row_height = self.rows[0].frame.winfo_reqheight() + 4  # Plus the grid pady
+        self.visible = max(1, event.height // self.row_height)
+        while len(self.rows) < self.visible:
+            self.rows.append(self.make_row())
+        self.render()
+
+    def on_mousewheel(self, event):
+        self.yview("scroll", -1 if event.delta > 0 else 1, "units")
+
+    def yview(self, *args):
+        if args[0] == "moveto":
+            self.first = int(float(args[1]) * len(self.store))
+        elif args[0] == "scroll":
+            amount = int(args[1])
+            self.first += amount * self.visible if args[2] == "pages" else amount
+        self.render()
+
+    def render(self):
+        """Show the authors from self.first on in the row pool"""
+        count = len(self.store)
+        self.first = max(0, min(self.first, count - self.visible))
+        self.loading = True
+        try:
+            for slot, row in enumerate(self.rows):
+                index = self.first + slot
+                if slot < self.visible and index < count:
+                    record = self.store[index]
+                    row.record = record
+                    row.index = index
+                    row.title.configure(text="Author %d of %d" % (index + 1, count))
+                    row.selected.set(id(record) in self.selected)
+                    for key, var in row.variables.items():
+                        var.set(getattr(record, key))
+                    row.frame.grid(row=slot, column=0, sticky='ew', pady=2)
+                else:
+                    row.record = row.index = None
+                    row.frame.grid_remove()
+        finally:
+            self.loading = False
+        if count:
+            self.scrollbar.set(self.first / count, min(1.0, (self.first + self.visible) / count))
+        else:
+            self.scrollbar.set(0.0, 1.0)
+
+    def add(self, count=1):
+        self.store.extend(Author() for _ in range(count))
+        self.first = len(self.store)  # Scroll to the new authors
+        self.render()
+
+    def remove(self, index):
+        self.selected.discard(id(self.store[index]))
+        del self.store[index]
+        self.render()
+
+    def remove_selected(self):
+        # One pass over the store, however many authors are selected
+        self.store[:] = [author for author in self.store if id(author) not in self.selected]
+        self.selected.clear()
+        self.render()
+
+    def clear(self):
+        self.store.clear()
+        self.selected.clear()
+        self.render()
+
+    def load(self, authors):
+        """Replace the authors with authors and scroll back to the top"""
+        self.store[:] = authors
+        self.selected.clear()
+        self.first = 0
+        self.render()
+
 class XMLGeneratorApp:
     def __init__(self, root):
         self.root = root
@@ -35,6 +229,22 @@ class XMLGeneratorApp:
         icon_path = self.resource_path("logo.ico")
         self.root.iconbitmap(icon_path)
 
+        # How the generated XML is indented (see xmlgen.pretty)
+        self.pretty_method = tk.StringVar(value=DEFAULT_PRETTY_METHOD)
+        # Normalize the Persian (_fa) fields when saving (see xmlgen.persian)
+        self.normalize_fa = tk.BooleanVar(value=False)
+        # Rebuild only the changed sections of a file saved before (see xmlgen.incremental)
+        self.incremental = tk.BooleanVar(value=False)
+
+        # The article being edited; the widgets below are bound to it
+        self.form = ArticleForm()
+
+        # Journal profiles for the Defaults menu and the journal tab's buttons
+        self.journals = self.load_journals()
+
+        # Authors of the articles saved so far, for filling in authors by ORCID or email
+        self.author_registry = self.load_author_registry()
+
         # Create Menu
         self.create_menu()
 
@@ -47,9 +257,22 @@ class XMLGeneratorApp:
         self.create_article_tab()
         self.create_authors_tab()
 
-        # Generate Button
-        self.generate_button = ttk.Button(root, text="Generate XML", command=self.generate_xml)
-        self.generate_button.pack(pady=10)
+        # Generate Button, progress of the running save and Cancel
+        generate_frame = ttk.Frame(root)
+        generate_frame.pack(pady=10)
+        self.generate_button = ttk.Button(generate_frame, text="Generate XML", command=self.generate_xml)
+        self.generate_button.grid(row=0, column=0, padx=5)
+        self.progress_bar = ttk.Progressbar(generate_frame, length=200, maximum=len(STAGES))
+        self.progress_bar.grid(row=0, column=1, padx=5)
+        self.cancel_button = ttk.Button(generate_frame, text="Cancel", command=self.cancel_generate, state=tk.DISABLED)
+        self.cancel_button.grid(row=0, column=2, padx=5)
+        self.progress_label = ttk.Label(generate_frame, width=40)
+        self.progress_label.grid(row=0, column=3, padx=5, sticky=tk.W)
+
+        # Saves run on a worker thread so the window stays responsive
+        self.jobs = JobQueue(root, self.on_job_update)
+        # --timings=FILE, --profile=DIR and --trace-memory time every save
+        self.profile_options = options_from_argv()
 
     def resource_path(self, relative_path):
         """ Get the absolute path to the resource, works for dev and PyInstaller """
@@ -69,6 +292,7 @@ class XMLGeneratorApp:
         file_menu = tk.Menu(menubar, tearoff=0)
         menubar.add_cascade(label="File", menu=file_menu)
         file_menu.add_command(label="New", command=self.new_file)
+        file_menu.add_command(label="Open XML...", command=self.open_xml)
         file_menu.add_command(label="Save", command=self.generate_xml)
         file_menu.add_separator()
         file_menu.add_command(label="Exit", command=self.root.quit)
@@ -83,11 +307,24 @@ class XMLGeneratorApp:
         file_menu.add_separator()
         file_menu.add_command(label="Clear All", command=self.clear_fields)
 
-        # Default menu for applying predefined values (JIDS and JZMS)
+        # Default menu with one entry per journal profile (journals.json)
         default_menu = tk.Menu(menubar, tearoff=0)
         menubar.add_cascade(label="Defaults", menu=default_menu)
-        default_menu.add_command(label="JIDS", command=self.apply_default_1)
-        default_menu.add_command(label="JZMS", command=self.apply_default_2)
+        for label, journal in self.journals:
+            default_menu.add_command(label=label, command=partial(self.apply_journal_defaults, journal.to_dict()))
+        if not len(self.journals):
+            default_menu.add_command(label="No journal profiles", state=tk.DISABLED)
+
+        # Options menu for choosing how the XML output is indented
+        options_menu = tk.Menu(menubar, tearoff=0)
+        menubar.add_cascade(label="Options", menu=options_menu)
+        options_menu.add_radiobutton(label="Standard Indent (minidom)", variable=self.pretty_method, value="minidom")
+        # Faster, but writes empty elements as <x /> instead of <x/>
+        options_menu.add_radiobutton(label="Fast Indent (<x /> for empty tags)", variable=self.pretty_method, value="indent")
+        options_menu.add_separator()
+        options_menu.add_checkbutton(label="Normalize Persian Text", variable=self.normalize_fa)
+        # Only the fast indent can be spliced; with minidom the whole file is rebuilt
+        options_menu.add_checkbutton(label="Reuse Unchanged Sections (Fast Indent)", variable=self.incremental)
 
         # Help menu
         help_menu = tk.Menu(menubar, tearoff=0)
@@ -130,6 +367,24 @@ class XMLGeneratorApp:
         self.clear_fields()
         messagebox.showinfo("New File", "All fields have been reset.")
 
+    def open_xml(self):
+        """Fill the form from an XML file written by this app or by the workbook converter"""
+        file_path = filedialog.askopenfilename(filetypes=[("XML files", "*.xml")])
+        if not file_path:
+            return
+        try:
+            from xmlgen.importer import load_form  # Needs lxml; only loaded when used
+            form = load_form(file_path)
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to open XML: {e}")
+            return
+        self.form.journal.update(form.journal.to_dict())
+        self.form.article.update(form.article.to_dict())
+        self.refresh_journal_fields()
+        self.refresh_article_fields()
+        self.show_pub_dates(form.pub_dates)
+        self.author_list.load(form.authors)
+
     def show_about(self):
         # Editable help content
         messagebox.showinfo("About", "XML File Generator\nVersion 1.1\n\nThis tool helps generate XML files for journal articles. Use the tabs to input journal, article, and author details.")
@@ -169,29 +424,31 @@ class XMLGeneratorApp:
             ("Number", "number")
         ]
 
-        self.journal_entries = {}
+        self.journal_vars = {}
         for i, (label_text, key) in enumerate(fields):
             label = ttk.Label(journal_frame, text=label_text + ":", anchor='w')
             label.grid(row=i, column=0, sticky=tk.W, padx=(10, 5), pady=2)  # Consistent padding
             entry = ttk.Entry(journal_frame, width=50)
             entry.grid(row=i, column=1, padx=(5, 10), pady=2, sticky=tk.W)  # Align to start of column
             self.bind_copy_paste(entry)  # Enable copy-paste operations
-            self.journal_entries[key] = entry
+            self.journal_vars[key] = self.bind_entry(entry, self.form.journal, key)
 
         # Publication Dates Section
         self.date_frame = ttk.LabelFrame(journal_frame, text="Publication Dates", padding="10")
         self.date_frame.grid(row=len(fields), column=0, columnspan=2, pady=10, padx=5, sticky='ew')
 
-        self.pub_dates = []
+        self.date_rows = []
         ttk.Button(self.date_frame, text="Add Date", command=self.add_date).grid(row=0, column=0, sticky=(tk.W, tk.E))
 
         # Default Buttons and Clear Button
         buttons_frame = ttk.Frame(journal_frame)
         buttons_frame.grid(row=len(fields) + 1, column=0, columnspan=2, pady=10)
 
-        ttk.Button(buttons_frame, text="JIDS", command=self.apply_default_1).grid(row=0, column=0, padx=5)
-        ttk.Button(buttons_frame, text="JZMS", command=self.apply_default_2).grid(row=0, column=1, padx=5)
-        ttk.Button(buttons_frame, text="Clear", command=self.clear_journal_fields).grid(row=0, column=2, padx=5)
+        # One button per journal profile, eight to a row
+        for i, (label, journal) in enumerate(self.journals):
+            ttk.Button(buttons_frame, text=label, command=partial(self.apply_journal_defaults, journal.to_dict())).grid(row=i // 8, column=i % 8, padx=5, pady=2)
+        count = len(self.journals)
+        ttk.Button(buttons_frame, text="Clear", command=self.clear_journal_fields).grid(row=count // 8, column=count % 8, padx=5, pady=2)
 
     def create_article_tab(self):
         # Article Information Tab
@@ -216,99 +473,105 @@ class XMLGeneratorApp:
             ("Keywords (FA)", "keywords_fa")
         ]
 
-        self.article_entries = {}
+        self.article_vars = {}
         for i, (label_text, key) in enumerate(fields):
             label = ttk.Label(article_frame, text=label_text + ":", anchor='w')
             label.grid(row=i, column=0, sticky=tk.W, padx=(10, 5), pady=2)  # Consistent padding
             entry = ttk.Entry(article_frame, width=50)
             entry.grid(row=i, column=1, padx=(5, 10), pady=2, sticky=tk.W)  # Align to start of column
             self.bind_copy_paste(entry)  # Enable copy-paste operations
-            self.article_entries[key] = entry
+            self.article_vars[key] = self.bind_entry(entry, self.form.article, key)
 
         # Abstract as Rich Text Box
         ttk.Label(article_frame, text="Abstract:", anchor='w').grid(row=len(fields), column=0, sticky=tk.W, padx=(10, 5), pady=2)
         self.abstract_text = tk.Text(article_frame, height=5, width=50, wrap="word")
         self.abstract_text.grid(row=len(fields), column=1, padx=(5, 10), pady=2, sticky=tk.W)
         self.bind_copy_paste(self.abstract_text)  # Enable copy-paste operations
+        self.bind_text(self.abstract_text, self.form.article, "abstract")
 
         ttk.Label(article_frame, text="Abstract (FA):", anchor='w').grid(row=len(fields) + 1, column=0, sticky=tk.W, padx=(10, 5), pady=2)
         self.abstract_text_fa = tk.Text(article_frame, height=5, width=50, wrap="word")
         self.abstract_text_fa.grid(row=len(fields) + 1, column=1, padx=(5, 10), pady=2, sticky=tk.W)
         self.bind_copy_paste(self.abstract_text_fa)  # Enable copy-paste operations
+        self.bind_text(self.abstract_text_fa, self.form.article, "abstract_fa")
 
         # Clear Button
         ttk.Button(article_frame, text="Clear", command=self.clear_article_fields).grid(row=len(fields) + 2, column=0, columnspan=2, pady=10)
 
     def create_authors_tab(self):
-        # Authors Management Tab
-        self.authors_tab = ScrollableFrame(self.notebook)
+        # Authors Management Tab; the author list scrolls itself
+        self.authors_tab = ttk.Frame(self.notebook)
         self.notebook.add(self.authors_tab, text="Author(s)")
 
-        self.authors_frame = ttk.LabelFrame(self.authors_tab.scrollable_frame, text="Authors", padding="10")
+        self.authors_frame = ttk.LabelFrame(self.authors_tab, text="Authors", padding="10")
         self.authors_frame.pack(fill='both', expand=True, padx=10, pady=10)
 
-        self.authors = []
-        ttk.Button(self.authors_frame, text="Add Author", command=self.add_author).pack(pady=5)
-        ttk.Button(self.authors_frame, text="Clear", command=self.clear_authors).pack(pady=5)
+        buttons_frame = ttk.Frame(self.authors_frame)
+        buttons_frame.pack(pady=5)
+        ttk.Button(buttons_frame, text="Add Author", command=self.add_author).grid(row=0, column=0, padx=5)
+        self.bulk_count = tk.StringVar(value="10")
+        ttk.Spinbox(buttons_frame, from_=1, to=1000, width=5, textvariable=self.bulk_count).grid(row=0, column=1, padx=(15, 2))
+        ttk.Button(buttons_frame, text="Add Authors", command=self.add_authors).grid(row=0, column=2, padx=5)
+        ttk.Button(buttons_frame, text="Remove Selected", command=self.remove_selected_authors).grid(row=0, column=3, padx=(15, 5))
+        ttk.Button(buttons_frame, text="Clear", command=self.clear_authors).grid(row=0, column=4, padx=5)
+
+        self.author_list = VirtualAuthorList(self.authors_frame, self.form.authors, prepare_entry=self.bind_copy_paste, complete=self.complete_author)
+        self.author_list.pack(fill='both', expand=True)
+
+    def add_date(self, date=None):
+        if date is None:
+            date = PubDate()
+        self.form.pub_dates.append(date)
 
-    def add_date(self):
         date_frame = ttk.Frame(self.date_frame)
         date_frame.grid(pady=5, sticky='ew')
+        self.date_rows.append(date_frame)
 
         ttk.Label(date_frame, text="Type:").grid(row=0, column=0, sticky=tk.W, padx=(10, 5))
         type_combobox = ttk.Combobox(date_frame, values=["jalali", "gregorian"], width=10)
         type_combobox.grid(row=0, column=1, padx=(5, 10))
+        self.bind_entry(type_combobox, date, "type")
 
         ttk.Label(date_frame, text="Year:").grid(row=0, column=2, sticky=tk.W, padx=(10, 5))
         year_entry = ttk.Entry(date_frame, width=5)
         year_entry.grid(row=0, column=3, padx=(5, 10))
         self.bind_copy_paste(year_entry)  # Enable copy-paste operations
+        self.bind_entry(year_entry, date, "year")
 
         ttk.Label(date_frame, text="Month:").grid(row=0, column=4, sticky=tk.W, padx=(10, 5))
         month_entry = ttk.Entry(date_frame, width=5)
         month_entry.grid(row=0, column=5, padx=(5, 10))
         self.bind_copy_paste(month_entry)  # Enable copy-paste operations
+        self.bind_entry(month_entry, date, "month")
 
         ttk.Label(date_frame, text="Day:").grid(row=0, column=6, sticky=tk.W, padx=(10, 5))
         day_entry = ttk.Entry(date_frame, width=5)
         day_entry.grid(row=0, column=7, padx=(5, 10))
         self.bind_copy_paste(day_entry)  # Enable copy-paste operations
+        self.bind_entry(day_entry, date, "day")
 
-        self.pub_dates.append((type_combobox, year_entry, month_entry, day_entry))
+    def show_pub_dates(self, dates):
+        """Replace the publication date rows with dates"""
+        for row in self.date_rows:
+            row.destroy()
+        self.date_rows.clear()
+        self.form.pub_dates.clear()
+        for date in dates:
+            self.add_date(date)
 
     def add_author(self):
-        author_frame = ttk.Frame(self.authors_frame, padding="5")
-        author_frame.pack(pady=5, fill='x')
-
-        fields = [
-            ("First Name", 15), ("Middle Name", 15), ("Last Name", 15), ("Suffix", 10),
-            ("First Name (FA)", 15), ("Middle Name (FA)", 15), ("Last Name (FA)", 15), ("Suffix (FA)", 10),
-            ("Email", 25), ("Code", 10), ("ORCID", 20), ("Core Author (Yes/No)", 10),
-            ("Affiliation", 30), ("Affiliation (FA)", 30)
-        ]
-
-        author_entries = []
-        for i, (label, width) in enumerate(fields):
-            ttk.Label(author_frame, text=label + ":", anchor='w').grid(row=i//4, column=(i % 4) * 2, sticky=tk.W, padx=(10, 5))
-            if label == "Core Author (Yes/No)":  # Core author as a boolean checkbox
-                var = tk.BooleanVar()
-                checkbox = ttk.Checkbutton(author_frame, variable=var)
-                checkbox.grid(row=i//4, column=(i % 4) * 2 + 1, padx=(5, 10), sticky=tk.W)
-                author_entries.append(var)
-            else:
-                entry = ttk.Entry(author_frame, width=width)
-                entry.grid(row=i//4, column=(i % 4) * 2 + 1, padx=(5, 10), sticky=tk.W)
-                self.bind_copy_paste(entry)  # Enable copy-paste operations
-                author_entries.append(entry)
+        self.author_list.add()
 
-        remove_button = ttk.Button(author_frame, text="Remove", command=lambda: self.remove_author(author_frame))
-        remove_button.grid(row=len(fields)//4 + 1, column=0, columnspan=8, pady=5)
-
-        self.authors.append((author_frame, author_entries))
+    def add_authors(self):
+        try:
+            count = int(self.bulk_count.get())
+        except ValueError:
+            messagebox.showerror("Add Authors", "Please enter the number of authors to add.")
+            return
+        self.author_list.add(max(1, count))
 
-    def remove_author(self, frame):
-        frame.destroy()
-        self.authors = [author for author in self.authors if author[0] != frame]
+    def remove_selected_authors(self):
+        self.author_list.remove_selected()
 
     def clear_fields(self):
         self.clear_journal_fields()
@@ -316,127 +579,92 @@ class XMLGeneratorApp:
         self.clear_authors()
 
     def clear_journal_fields(self):
-        for entry in self.journal_entries.values():
-            entry.delete(0, tk.END)
+        self.form.journal.clear()
+        self.refresh_journal_fields()
 
     def clear_article_fields(self):
-        for entry in self.article_entries.values():
-            entry.delete(0, tk.END)
-        self.abstract_text.delete("1.0", tk.END)
-        self.abstract_text_fa.delete("1.0", tk.END)
+        self.form.article.clear()
+        self.refresh_article_fields()
 
     def clear_authors(self):
-        for author_frame, _ in list(self.authors):  # Convert to list to avoid modification during iteration
-            self.remove_author(author_frame)
-
-    def apply_default_1(self):
-        # Predefined values for Default 1
-        defaults = {
-            "title": "Journal of Isfahan Dental School",
-            "title_fa": "مجله دانکشده دندانپزشکی",
-            "short_title": "JIDS",
-            "subject": "Medical Sciences",
-            "web_url": "http://jids.ir",
-            "journal_hbi_system_id": "",
-            "journal_hbi_system_user": "",
-            "journal_id_issn": "1735-255X",
-            "journal_id_issn_online": "",
-            "journal_id_pii": "",
-            "journal_id_doi": "",
-            "journal_id_iranmedex": "",
-            "journal_id_magiran": "",
-            "journal_id_sid": "",
-            "journal_id_nlai": "",
-            "journal_id_science": "",
-            "language": "fa",
-            "volume": "",
-            "number": ""
-        }
-        for key, value in defaults.items():
-            self.journal_entries[key].delete(0, tk.END)
-            self.journal_entries[key].insert(0, value)
-
-    def apply_default_2(self):
-        # Predefined values for Default 2
-        defaults = {
-            "title": "Journal of Zabol Medical school",
-            "title_fa": "مجمله دانشگاه زابل",
-            "short_title": "ZJMS",
-            "subject": "Engineering",
-            "web_url": "http://jzms.ir",
-            "journal_hbi_system_id": "",
-            "journal_hbi_system_user": "",
-            "journal_id_issn": "2645-880X",
-            "journal_id_issn_online": "2645-7180",
-            "journal_id_pii": "",
-            "journal_id_doi": "",
-            "journal_id_iranmedex": "",
-            "journal_id_magiran": "",
-            "journal_id_sid": "",
-            "journal_id_nlai": "",
-            "journal_id_science": "",
-            "language": "en",
-            "volume": "20",
-            "number": "2"
-        }
-        for key, value in defaults.items():
-            self.journal_entries[key].delete(0, tk.END)
-            self.journal_entries[key].insert(0, value)
+        self.author_list.clear()
+
+    def refresh_journal_fields(self):
+        # Show the model's journal values in the widgets
+        for key, var in self.journal_vars.items():
+            var.set(getattr(self.form.journal, key))
+
+    def refresh_article_fields(self):
+        # Show the model's article values in the widgets
+        for key, var in self.article_vars.items():
+            var.set(getattr(self.form.article, key))
+        for text, key in ((self.abstract_text, "abstract"), (self.abstract_text_fa, "abstract_fa")):
+            value = getattr(self.form.article, key)
+            text.delete("1.0", tk.END)
+            text.insert("1.0", value)
+            text.edit_modified(False)
+
+    def apply_journal_defaults(self, defaults):
+        self.form.journal.update(defaults)
+        self.refresh_journal_fields()
+
+    def load_journals(self):
+        """Load the journal profiles behind the Defaults menu and buttons"""
+        try:
+            return load_store(self.resource_path("journals.json"))
+        except FileNotFoundError:
+            return JournalStore()
+        except ValueError as e:
+            messagebox.showerror("Journal Profiles", f"Could not load journals.json:\n{e}")
+            return JournalStore()
+
+    def load_author_registry(self):
+        try:
+            return load_registry()
+        except (OSError, ValueError, TypeError) as e:
+            messagebox.showerror("Author Registry", f"Could not load the saved authors:\n{e}")
+            return AuthorRegistry()
+
+    def complete_author(self, record, value):
+        """Fill the empty fields of record from the saved author with this ORCID or email"""
+        found = self.author_registry.lookup(value)
+        if found is None:
+            return False
+        changed = False
+        for key in AUTHOR_FIELDS:
+            if key != "coreauthor" and not getattr(record, key) and getattr(found, key):
+                setattr(record, key, getattr(found, key))
+                changed = True
+        return changed
+
+    def remember_authors(self, form, file_path):
+        for author in form.authors:
+            self.author_registry.add(author, file_path)
+        if self.author_registry.source:
+            try:
+                self.author_registry.save()
+            except OSError:
+                pass  # Filling in authors is a convenience; the XML was saved
 
     def generate_xml(self):
-        root = ET.Element("journal")
-
-        # Add journal details
-        for key, entry in self.journal_entries.items():
-            element = ET.SubElement(root, key)
-            element.text = entry.get()
-
-        # Add publication dates
-        for type_entry, year_entry, month_entry, day_entry in self.pub_dates:
-            pubdate = ET.SubElement(root, "pubdate")
-            type_elem = ET.SubElement(pubdate, "type")
-            type_elem.text = type_entry.get()
-            year_elem = ET.SubElement(pubdate, "year")
-            year_elem.text = year_entry.get()
-            month_elem = ET.SubElement(pubdate, "month")
-            month_elem.text = month_entry.get()
-            day_elem = ET.SubElement(pubdate, "day")
-            day_elem.text = day_entry.get()
-
-        # Add article details
-        article = ET.SubElement(root, "article")
-        for key, entry in self.article_entries.items():
-            element = ET.SubElement(article, key)
-            element.text = entry.get()
-
-        # Add abstracts
-        abstract = ET.SubElement(article, "abstract")
-        abstract.text = self.abstract_text.get("1.0", tk.END).strip()
-
-        abstract_fa = ET.SubElement(article, "abstract_fa")
-        abstract_fa.text = self.abstract_text_fa.get("1.0", tk.END).strip()
-
-        # Add authors
-        author_list = ET.SubElement(root, "author_list")
-        for author_frame, entries in self.authors:
-            author = ET.SubElement(author_list, "author")
-            fields = ["first_name", "middle_name", "last_name", "suffix",
-                      "first_name_fa", "middle_name_fa", "last_name_fa", "suffix_fa",
-                      "email", "code", "orcid", "coreauthor", "affiliation", "affiliation_fa"]
-
-            for field, entry in zip(fields, entries):
-                if field == "coreauthor":
-                    elem = ET.SubElement(author, field)
-                    elem.text = "Yes" if entry.get() else "No"  # Set as Yes/No based on boolean checkbox
-                else:
-                    elem = ET.SubElement(author, field)
-                    elem.text = entry.get()
-
-        # Format XML to be readable
-        xmlstr = minidom.parseString(ET.tostring(root)).toprettyxml(indent="   ")
+        # Check the dates and fill in their other calendar before asking where to save
+        try:
+            pub_dates = complete_pub_dates(self.form.pub_dates)
+        except DateError as e:
+            messagebox.showerror("Invalid Date", str(e))
+            return
+        if len(pub_dates) != len(self.form.pub_dates):
+            self.show_pub_dates(pub_dates)
+
+        # ISSNs, DOI, ORCIDs and emails the indexer would reject
+        problems = validate_form(self.form)
+        if problems:
+            details = "\n".join(describe(problem) for problem in problems)
+            if not messagebox.askyesno("Invalid Identifiers", f"{details}\n\nSave anyway?"):
+                return
 
         # Get default name for save dialog
-        default_name = self.article_entries.get("article_title").get() or "Untitled_Article"
+        default_name = default_file_name(self.form)
 
         # Save File Dialog
         file_path = filedialog.asksaveasfilename(
@@ -445,9 +673,64 @@ class XMLGeneratorApp:
             initialfile=default_name
         )
         if file_path:
-            with open(file_path, "w", encoding="utf-8") as f:
-                f.write(xmlstr)
+            # The worker gets its own copy, so editing can go on while it saves
+            form = self.form.copy()
+            if self.normalize_fa.get():
+                normalize_form(form)
+            args = (form, file_path, self.pretty_method.get())
+            if self.profile_options:
+                save = partial(profile_call, save_form, options=self.profile_options, label=file_path,
+                               incremental=self.incremental.get())
+            else:
+                save = partial(save_form, incremental=self.incremental.get())
+            self.jobs.submit(os.path.basename(file_path), save, *args)
+
+    def cancel_generate(self):
+        self.jobs.cancel()
+
+    def on_job_update(self, job, state, stage):
+        if state == QUEUED:
+            message = f"Queued {job.name}"
+        elif state == DONE:
+            self.progress_bar["value"] = len(STAGES)
+            message = f"Saved {job.name}"
+        elif state == FAILED:
+            self.progress_bar["value"] = 0
+            message = f"Failed: {job.name}"
+        elif state == CANCELLED:
+            self.progress_bar["value"] = 0
+            message = f"Cancelled {job.name}"
+        elif stage is not None:
+            self.progress_bar["value"] = STAGES.index(stage)
+            message = f"{job.name}: {stage}..."
+        else:
+            return
+        if self.jobs.waiting:
+            message += f" ({self.jobs.waiting} more queued)"
+        self.progress_label.config(text=message)
+        self.cancel_button.config(state=tk.NORMAL if self.jobs.jobs else tk.DISABLED)
+
+        if state == DONE:
+            self.remember_authors(job.args[0], job.args[1])
             messagebox.showinfo("Success", "XML file generated successfully!")
+        elif state == FAILED:
+            messagebox.showerror("Error", f"Failed to generate XML: {job.error}")
+
+    def bind_entry(self, widget, record, field):
+        """Bind an Entry or Combobox to record.field so typing updates the model"""
+        var = tk.StringVar(value=getattr(record, field))
+        widget.configure(textvariable=var)
+        var.trace_add("write", lambda *args: setattr(record, field, var.get()))
+        return var
+
+    def bind_text(self, widget, record, field):
+        """Bind a Text widget to record.field; the stored value is stripped"""
+        def on_modified(event):
+            if widget.edit_modified():
+                setattr(record, field, widget.get("1.0", tk.END).strip())
+                widget.edit_modified(False)
+
+        widget.bind("<<Modified>>", on_modified)
 
     def bind_copy_paste(self, widget):
         """Enable copy, cut, paste, and select all for entry and text widgets with custom paste handling"""
@@ -472,6 +755,8 @@ class XMLGeneratorApp:
 def main():
     root = tk.Tk()
     app = XMLGeneratorApp(root)
+    if startup_timer:
+        startup_timer.watch(root)
     root.mainloop()
 
 if __name__ == "__main__":
@@ -1,8 +1,22 @@
-import tkinter as tk
-from tkinter import filedialog
-import pandas as pd
-from lxml import etree  # Using lxml for better XML handling
+import time
+started = time.perf_counter()
 import os
+import sys
+
+# The conversion engine lives in the xmlgen package at the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from xmlgen.startup import StartupTimer, prewarm
+
+# Time the imports below when started with --startup-report
+startup_timer = StartupTimer.from_argv("V2.2", started=started)
+
+import tkinter as tk
+from tkinter import filedialog, ttk
+from xmlgen.jobs import CANCELLED, DONE, FAILED, QUEUED, STAGES, JobQueue
+from xmlgen.profiling import options_from_argv, profile_call
+
+# --timings=FILE, --profile=DIR and --trace-memory time every conversion
+profile_options = options_from_argv()
 
 def update_status(message):
     status_label.config(text=message)
@@ -23,7 +37,7 @@ def generate_xml():
     if not excel_file_path:
         update_status("Error: Please select an Excel file first!")
         return
-    
+
     save_path = filedialog.asksaveasfilename(
         initialfile=default_xml_name,
         defaultextension=".xml",
@@ -31,60 +45,76 @@ def generate_xml():
     )
     
     if save_path:
-        try:
-            # Read the Excel file
-            xl = pd.ExcelFile(excel_file_path)
-            
-            # Parse the sheets
-            journal_df = xl.parse('Journal')
-            article_df = xl.parse('Article')
-            author_df = xl.parse('Author(s)')
-
-            # Create the root XML element
-            root = etree.Element("article")
-
-            # Create journal element
-            journal_element = etree.SubElement(root, "journal")
-            for _, row in journal_df.iterrows():
-                # Assuming column A is attributes and column B is values
-                sub_element = etree.SubElement(journal_element, row[0])  # Attribute name
-                # Create empty tags if value is NaN
-                sub_element.text = str(row[1]) if pd.notna(row[1]) else " "  # Ensure tags are empty
-
-            # Create article element
-            article_element = etree.SubElement(root, "article_info")
-            for _, row in article_df.iterrows():
-                # Assuming column A is attributes and column B is values
-                sub_element = etree.SubElement(article_element, row[0])  # Attribute name
-                # Create empty tags if value is NaN
-                sub_element.text = str(row[1]) if pd.notna(row[1]) else " "  # Ensure tags are empty
-
-            # Create authors list element
-            authors_element = etree.SubElement(root, "author_list")
-
-            # Iterate through the authors
-            for col in author_df.columns[1:]:  # Skip the first column (attributes)
-                author_element = etree.SubElement(authors_element, "author")
-                for index, row in author_df.iterrows():
-                    # Create a sub-element for each attribute in the first column
-                    attribute = author_df.iloc[index, 0]  # Get the attribute name from the first column
-                    sub_element = etree.SubElement(author_element, attribute)
-                    # Create empty tags if value is NaN
-                    sub_element.text = row[col] if pd.notna(row[col]) else " "  # Ensure tags are empty
-
-            # Write to XML file with pretty print
-            xml_str = etree.tostring(root, pretty_print=True, xml_declaration=True, encoding='UTF-8')
-            with open(save_path, 'wb') as file:
-                file.write(xml_str)
-
-            update_status(f"Success: XML file generated and saved to: {save_path}")
-        except Exception as e:
-            update_status(f"Error: Failed to generate XML: {e}")
+        # Converted on a worker thread; more files can be queued meanwhile
+        jobs.submit(os.path.basename(excel_file_path), convert_job, excel_file_path, save_path,
+                    normalize_fa.get(), validate.get(), incremental.get(), complete_dates.get())
+
+def convert_job(source, output, normalize, check, reuse, dates, progress):
+    # Imported here so the window doesn't wait for lxml and openpyxl
+    from xmlgen.converter import convert_file
+    from xmlgen.issues import is_issue_workbook
+    # Checked here rather than in generate_xml, which would open the workbook
+    # on the Tk thread. An issue workbook (see xmlgen.issues) becomes one XML
+    # file per article, in a folder named after the chosen file.
+    if is_issue_workbook(source):
+        return issue_job(source, os.path.splitext(output)[0], normalize, check, reuse, dates,
+                         progress)
+    # With check the rows read for the conversion are validated, and nothing
+    # is written for a workbook the indexer would reject
+    if profile_options:
+        return profile_call(convert_file, source, output, options=profile_options,
+                            label=source, progress=progress, normalize_fa=normalize,
+                            incremental=reuse, validate=check, complete_dates=dates)
+    return convert_file(source, output, progress=progress, normalize_fa=normalize,
+                        incremental=reuse, validate=check, complete_dates=dates)
+
+def issue_job(source, output_dir, normalize, check, reuse, dates, progress):
+    from xmlgen.converter import ConversionResult
+    from xmlgen.issues import convert_issue
+    start = time.perf_counter()
+    if profile_options:
+        results = profile_call(convert_issue, source, output_dir, options=profile_options,
+                               label=source, progress=progress, normalize_fa=normalize,
+                               incremental=reuse, validate=check, complete_dates=dates)
+    else:
+        results = convert_issue(source, output_dir, normalize_fa=normalize, incremental=reuse,
+                                validate=check, progress=progress, complete_dates=dates)
+    # One result for the status line; the failed articles are listed in it
+    failed = [result for result in results if not result.ok]
+    return ConversionResult(source, output_dir, not failed,
+                            "; ".join(f"{result.source}: {result.error}" for result in failed)
+                            or None, time.perf_counter() - start,
+                            unchanged=bool(results) and all(result.unchanged
+                                                             for result in results))
+
+def on_job_update(job, state, stage):
+    if state == QUEUED:
+        update_status(f"Queued {job.name}")
+    elif state == DONE:
+        progress_bar["value"] = len(STAGES)
+        result = job.result
+        if result.ok and result.unchanged:
+            update_status(f"Success: {result.output} already matches the workbook")
+        elif result.ok:
+            update_status(f"Success: XML file generated and saved to: {result.output}")
+        else:
+            update_status(f"Error: Failed to generate XML: {result.error}")
+    elif state == FAILED:
+        progress_bar["value"] = 0
+        update_status(f"Error: Failed to generate XML: {job.error}")
+    elif state == CANCELLED:
+        progress_bar["value"] = 0
+        update_status(f"Cancelled {job.name}")
+    elif stage is not None:
+        progress_bar["value"] = STAGES.index(stage)
+        update_status(f"Converting {job.name}: {stage}...")
+    queue_label.config(text=f"{jobs.waiting} more queued" if jobs.waiting else "")
+    btn_cancel.config(state=tk.NORMAL if jobs.jobs else tk.DISABLED)
 
 # Setup the main window
 root = tk.Tk()
 root.title("Excel to XML Converter")
-root.geometry("600x300")  # Set the initial size to 600x400
+root.geometry("600x410")  # Set the initial size to 600x400
 
 # Menu setup
 menu = tk.Menu(root)
@@ -101,6 +131,33 @@ btn_open.pack(pady=10)
 btn_generate = tk.Button(root, text="Generate", command=generate_xml)
 btn_generate.pack(pady=10)
 
+# Normalize the Persian (_FA) fields, see xmlgen.persian
+normalize_fa = tk.BooleanVar(value=False)
+tk.Checkbutton(root, text="Normalize Persian text", variable=normalize_fa).pack()
+
+# Refuse workbooks with a bad ISSN, DOI, ORCID or email, see xmlgen.validate.
+# Off by default: TemplateFinal.xlsx itself has placeholder ISSNs and DOI.
+validate = tk.BooleanVar(value=False)
+tk.Checkbutton(root, text="Check ISSN, DOI, ORCID and email", variable=validate).pack()
+
+# Rebuild only the sections whose rows changed since the last run, see xmlgen.incremental
+incremental = tk.BooleanVar(value=False)
+tk.Checkbutton(root, text="Only rewrite changed sections", variable=incremental).pack()
+
+# Check the Pub_Date_Jalali / Pub_Date_Gregorian rows and fill in the other one, see xmlgen.dates
+complete_dates = tk.BooleanVar(value=False)
+tk.Checkbutton(root, text="Complete publication dates", variable=complete_dates).pack()
+
+# Progress of the running conversion (read, build, serialize, write)
+progress_bar = ttk.Progressbar(root, length=300, maximum=len(STAGES))
+progress_bar.pack(pady=5)
+
+btn_cancel = tk.Button(root, text="Cancel", command=lambda: jobs.cancel(), state=tk.DISABLED)
+btn_cancel.pack(pady=5)
+
+queue_label = tk.Label(root, text="")
+queue_label.pack()
+
 # Status label to show messages
 status_label = tk.Label(root, text="Please open an Excel file", fg="blue")
 status_label.pack(pady=10)
@@ -108,6 +165,13 @@ status_label.pack(pady=10)
 # Initialize global variables
 excel_file_path = None
 default_xml_name = "output.xml"
+jobs = JobQueue(root, on_job_update)
+
+if startup_timer:
+    startup_timer.watch(root)
+
+# Load the conversion engine in the background once the window is up
+prewarm(root, ["xmlgen.converter"])
 
 # Run the application
 root.mainloop()
\ No newline at end of file
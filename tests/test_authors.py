@@ -0,0 +1,118 @@
+import pytest
+
+from xmlgen.authors import AuthorRegistry, load_registry, normalize_email, normalize_orcid
+from xmlgen.issues import pack_workbooks, read_issue
+from xmlgen.model import AUTHOR_TAGS, Author
+from xmlgen.synthetic import article_values, write_workbook
+
+
+def text(value):
+    # A fresh string object each call, as read from separate workbooks
+    return "".join(list(value))
+
+
+def author(**fields):
+    values = {"first_name": "Sara", "last_name": "Ahmadi", "email": "s.ahmadi@example.org",
+              "orcid": "0000-0002-1825-0097", "affiliation": "Dept. of Physics"}
+    values.update(fields)
+    return Author(**{field: text(value) if isinstance(value, str) else value
+                     for field, value in values.items()})
+
+
+@pytest.mark.parametrize("value", [
+    "0000-0002-1825-0097",
+    "  0000 0002 1825 0097 ",
+    "000000021825009 7",
+    "https://orcid.org/0000-0002-1825-0097",
+    "http://www.ORCID.org/0000-0002-1825-0097",
+])
+def test_orcid_spellings(value):
+    assert normalize_orcid(value) == "0000-0002-1825-0097"
+
+
+@pytest.mark.parametrize("value", ["", None, "0000-0002-1825", "0000-0002-1825-009Y",
+                                   "https://example.org/0000-0002-1825-0097"])
+def test_not_an_orcid(value):
+    assert normalize_orcid(value) is None
+
+
+def test_x_check_digit_is_upper_case():
+    assert normalize_orcid("0000-0002-9079-593x") == "0000-0002-9079-593X"
+
+
+def test_email_is_case_folded():
+    assert normalize_email(" S.Ahmadi@Example.ORG ") == "s.ahmadi@example.org"
+    assert normalize_email("not an email") is None
+
+
+def test_repeated_authors_share_one_record():
+    registry = AuthorRegistry()
+    first = registry.add(author(), "a.xml")
+    again = registry.add(author(), "b.xml")
+    assert again is first
+    # Being the core author elsewhere is another record but the same person
+    core = registry.add(author(coreauthor=True), "c.xml")
+    assert core is not first and core.affiliation is first.affiliation
+    # The five field values and "" for the empty fields
+    assert registry.stats() == {"records": 3, "distinct": 1, "orcids": 1, "emails": 1,
+                                "strings": 6, "conflicts": 0}
+    assert registry.lookup("https://orcid.org/0000000218250097") is core
+    assert registry.lookup("S.AHMADI@example.org") is core
+    assert registry.lookup("0000-0001-5109-3700") is None
+
+
+def test_rows_are_interned():
+    registry = AuthorRegistry()
+    attributes = list(AUTHOR_TAGS)
+    row = dict.fromkeys(AUTHOR_TAGS)
+    row.update(First_Name="Sara", Last_Name="Ahmadi", Affiliation="Dept. of Physics",
+               Core_Author_Yes_No="Yes")
+    first = registry.add_row(attributes, [text(value) if value else value
+                                          for value in row.values()], "a.xlsx")
+    second = registry.add_row(attributes, [text(value) if value else value
+                                           for value in row.values()], "b.xlsx")
+    affiliation = AUTHOR_TAGS.index("Affiliation")
+    assert first[affiliation] is second[affiliation]
+    assert len(registry) == 1 and list(registry)[0].coreauthor is True
+
+
+def test_conflicts_are_flagged():
+    registry = AuthorRegistry()
+    registry.add(author(), "a.xml")
+    registry.add(author(last_name="Ahmady"), "b.xml")
+    registry.add(author(orcid="0000-0001-5109-3700"), "c.xml")
+    conflicts = {(conflict.key, conflict.field): conflict.values
+                 for conflict in registry.conflicts()}
+    assert conflicts == {
+        ("0000-0002-1825-0097", "last_name"): {"Ahmadi": {"a.xml"}, "Ahmady": {"b.xml"}},
+        ("s.ahmadi@example.org", "orcid"): {"0000-0002-1825-0097": {"a.xml", "b.xml"},
+                                            "0000-0001-5109-3700": {"c.xml"}},
+    }
+
+
+def test_registry_round_trips(tmp_path):
+    path = str(tmp_path / "authors.json")
+    registry = load_registry(path)
+    assert len(registry) == 0
+    registry.add(author())
+    registry.add(author(first_name="Reza", orcid="", email=""))
+    registry.save()
+    loaded = load_registry(path)
+    assert loaded.to_dict() == registry.to_dict()
+    assert loaded.lookup("0000-0002-1825-0097").first_name == "Sara"
+
+
+def test_issue_authors_are_interned(tmp_path):
+    journal, article, authors = article_values(seed=1)
+    sources = [write_workbook(str(tmp_path / f"{number}.xlsx"), journal, article, authors)
+               for number in (1, 2)]
+    registry = AuthorRegistry()
+    first, second = read_issue(pack_workbooks(sources, str(tmp_path / "issue.xlsx")),
+                               registry=registry)
+    (attributes, first_authors), (_, second_authors) = first.rows[2], second.rows[2]
+    affiliation = attributes.index("Affiliation")
+    assert first_authors == second_authors
+    assert all(one[affiliation] is other[affiliation]
+               for one, other in zip(first_authors, second_authors))
+    assert registry.stats()["records"] == 2 * len(authors)
+    assert len(registry) == len(authors)
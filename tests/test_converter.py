@@ -0,0 +1,32 @@
+import os
+
+from xmlgen.converter import convert_file, convert_workbook
+from xmlgen.synthetic import article_values, write_workbook
+
+
+def workbook(tmp_path, issn):
+    journal, article, authors = article_values(seed=1)
+    journal["Journal_ISSN"] = issn
+    return write_workbook(str(tmp_path / "article.xlsx"), journal, article, authors)
+
+
+def test_validated_conversion_writes_the_same_xml(tmp_path):
+    source = workbook(tmp_path, "0317-8471")
+    output = str(tmp_path / "article.xml")
+    stages = []
+    result = convert_file(source, output, validate=True, progress=stages.append)
+    assert result.ok and not result.cached
+    assert stages == ["read", "build", "serialize", "write"]
+    with open(output, "rb") as file:
+        assert file.read() == convert_workbook(source)
+
+
+def test_workbook_that_fails_validation_is_not_written(tmp_path):
+    source = workbook(tmp_path, "0317-8472")
+    output = str(tmp_path / "article.xml")
+    result = convert_file(source, output, validate=True)
+    assert not result.ok
+    assert result.error == ("failed validation: Journal_ISSN: '0317-8472': "
+                            "bad ISSN check digit, expected 1")
+    assert not os.path.exists(output)
+    assert convert_file(source, output).ok  # Not checked unless asked
@@ -0,0 +1,133 @@
+import datetime
+
+import pytest
+from lxml import etree
+
+from xmlgen.converter import convert_workbook
+from xmlgen.dates import (END_DAY, FIRST_DAY, FIRST_YEAR, LAST_YEAR, DateError,
+                          complete_pub_dates, fill_date_rows, gregorian_to_jalali, is_leap,
+                          jalali_to_gregorian, jalali_to_ordinal, ordinal_to_jalali)
+from xmlgen.importer import write_workbook
+from xmlgen.model import ARTICLE_TAGS, AUTHOR_TAGS, JOURNAL_TAGS, PubDate
+from xmlgen.readers import BACKENDS
+from xmlgen.synthetic import article_values
+
+KNOWN = [
+    ((1200, 1, 1), (1821, 3, 21)),
+    ((1300, 1, 1), (1921, 3, 21)),
+    ((1348, 10, 11), (1970, 1, 1)),
+    ((1357, 11, 22), (1979, 2, 11)),
+    ((1399, 12, 30), (2021, 3, 20)),
+    ((1403, 1, 1), (2024, 3, 20)),
+    ((1403, 12, 30), (2025, 3, 20)),
+    ((1404, 1, 1), (2025, 3, 21)),
+]
+
+
+@pytest.mark.parametrize("jalali, gregorian", KNOWN)
+def test_known_dates(jalali, gregorian):
+    assert jalali_to_gregorian(*jalali) == gregorian
+    assert gregorian_to_jalali(*gregorian) == jalali
+
+
+def test_every_day_round_trips():
+    expected = None
+    for number in range(FIRST_DAY, END_DAY):
+        jalali = ordinal_to_jalali(number)
+        assert jalali_to_ordinal(*jalali) == number
+        # Consecutive day numbers are consecutive dates
+        if expected is not None and jalali != expected:
+            year, month, _ = expected
+            assert jalali == ((year + 1, 1, 1) if month == 12 else (year, month + 1, 1))
+        year, month, day = jalali
+        expected = (year, month, day + 1)
+    assert ordinal_to_jalali(FIRST_DAY) == (FIRST_YEAR, 1, 1)
+    assert ordinal_to_jalali(END_DAY - 1)[0] == LAST_YEAR
+
+
+def test_leap_years():
+    # The 33-year cycle has a five-year gap between 1403 and 1408
+    assert [year for year in range(1395, 1413) if is_leap(year)] == [1395, 1399, 1403, 1408,
+                                                                      1412]
+    assert jalali_to_gregorian(1408, 12, 30) == (2030, 3, 20)
+    with pytest.raises(DateError, match="day must be 1-29"):
+        jalali_to_gregorian(1402, 12, 30)
+    with pytest.raises(DateError, match="day must be 1-29"):
+        jalali_to_gregorian(1407, 12, 30)
+
+
+@pytest.mark.parametrize("call, message", [
+    (lambda: jalali_to_gregorian(FIRST_YEAR - 1, 12, 29), "outside 1200-1600"),
+    (lambda: jalali_to_gregorian(LAST_YEAR + 1, 1, 1), "outside 1200-1600"),
+    (lambda: jalali_to_gregorian(1403, 13, 1), "month must be 1-12"),
+    (lambda: jalali_to_gregorian(1403, 1, 32), "day must be 1-31"),
+    (lambda: jalali_to_gregorian(1403, 7, 31), "day must be 1-30"),
+    (lambda: gregorian_to_jalali(2023, 2, 29), "day is out of range"),
+    (lambda: gregorian_to_jalali(1821, 3, 20), "outside the supported range"),
+    (lambda: ordinal_to_jalali(END_DAY), "outside Jalali 1200-1600"),
+])
+def test_range_checks(call, message):
+    with pytest.raises(DateError, match=message):
+        call()
+
+
+def test_complete_pub_dates():
+    dates = [PubDate(type="jalali", year="1403", month="1", day="1"),
+             PubDate(type="epublish", year="2024")]
+    completed = complete_pub_dates(dates)
+    assert [date.to_dict() for date in completed] == [
+        dates[0].to_dict(),
+        PubDate(type="gregorian", year="2024", month="3", day="20").to_dict(),
+        dates[1].to_dict(),
+    ]
+    # A counterpart that is already there is not added twice
+    assert len(complete_pub_dates(completed)) == 3
+    with pytest.raises(DateError, match="jalali date"):
+        complete_pub_dates([PubDate(type="jalali", year="1402", month="12", day="30")])
+
+
+def test_fill_date_rows():
+    rows = [("Article_Title", "A"), ("Pub_Date_Jalali", " 1403/1/1 ")]
+    assert fill_date_rows(rows) == [("Article_Title", "A"), ("Pub_Date_Jalali", "1403-01-01"),
+                                    ("Pub_Date_Gregorian", "2024-03-20")]
+    rows = [("Pub_Date_Jalali", None), ("Pub_Date_Gregorian", datetime.date(2024, 3, 20))]
+    assert fill_date_rows(rows) == [("Pub_Date_Jalali", "1403-01-01"),
+                                    ("Pub_Date_Gregorian", "2024-03-20")]
+    assert fill_date_rows([("Article_Title", "A")]) == [("Article_Title", "A")]
+    with pytest.raises(DateError, match="different days"):
+        fill_date_rows([("Pub_Date_Jalali", "1403/1/1"), ("Pub_Date_Gregorian", "2024-03-21")])
+    with pytest.raises(DateError, match="not a jalali date"):
+        fill_date_rows([("Pub_Date_Jalali", "1403")])
+
+
+def dated_workbook(path, value):
+    journal, article, authors = article_values(seed=2)
+    author_rows = [[None] + [f"Author {number}" for number in range(1, len(authors) + 1)]]
+    author_rows.extend([tag] + [author[tag] for author in authors] for tag in AUTHOR_TAGS)
+    article_rows = [(tag, article[tag]) for tag in ARTICLE_TAGS] + [("Pub_Date_Jalali", value)]
+    return write_workbook(str(path), [(tag, journal[tag]) for tag in JOURNAL_TAGS],
+                          article_rows, author_rows)
+
+
+def dates_in(xml):
+    article = etree.fromstring(xml).find("article_info")
+    return {tag: article.findtext(tag) for tag in ("Pub_Date_Jalali", "Pub_Date_Gregorian")}
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_workbook_dates_are_completed_on_request(tmp_path, backend):
+    if backend == "pandas":
+        pytest.importorskip("pandas")
+    source = dated_workbook(tmp_path / "dated.xlsx", "1403/1/1")
+    assert dates_in(convert_workbook(source, backend, complete_dates=True)) == {
+        "Pub_Date_Jalali": "1403-01-01", "Pub_Date_Gregorian": "2024-03-20"}
+    # By default the row is written as it is
+    assert dates_in(convert_workbook(source, backend)) == {"Pub_Date_Jalali": "1403/1/1",
+                                                           "Pub_Date_Gregorian": None}
+
+
+def test_bad_workbook_date_only_fails_when_completing(tmp_path):
+    source = dated_workbook(tmp_path / "dated.xlsx", "1403")
+    assert dates_in(convert_workbook(source))["Pub_Date_Jalali"] == "1403"
+    with pytest.raises(DateError):
+        convert_workbook(source, complete_dates=True)
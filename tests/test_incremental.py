@@ -0,0 +1,108 @@
+import json
+import os
+
+import pytest
+
+from xmlgen.converter import read_rows
+from xmlgen.incremental import sidecar_path, write_incremental
+from xmlgen.model import form_xml
+from xmlgen.schema import FORM_SCHEMA, WORKBOOK_SCHEMA, form_sections, load_schema, row_sections
+from xmlgen.synthetic import article_values, make_forms, write_workbook
+
+
+@pytest.fixture
+def rows(tmp_path):
+    journal, article, authors = article_values(seed=3)
+    source = write_workbook(str(tmp_path / "article.xlsx"), journal, article, authors)
+    journal_rows, article_rows, (attributes, values) = read_rows(source, "openpyxl", None, None,
+                                                                 False)
+    assert len(values) >= 3
+    return journal_rows, article_rows, (attributes, [list(author) for author in values])
+
+
+def render(schema, rows):
+    return schema.render(row_sections(*rows))
+
+
+def write(schema, rows, path):
+    result = write_incremental(schema, row_sections(*rows), path)
+    with open(path, "rb") as file:
+        assert file.read() == render(schema, rows)
+    return result
+
+
+def test_unchanged_rows_rebuild_nothing(tmp_path, rows):
+    schema, path = load_schema(WORKBOOK_SCHEMA), str(tmp_path / "article.xml")
+    first = write(schema, rows, path)
+    assert first.written and first.rebuilt == first.units == 2 + len(rows[2][1])
+    again = write(schema, rows, path)
+    assert not again.written and again.rebuilt == 0
+
+
+def test_edited_author_is_the_only_unit_rebuilt(tmp_path, rows):
+    schema, path = load_schema(WORKBOOK_SCHEMA), str(tmp_path / "article.xml")
+    write(schema, rows, path)
+    attributes, authors = rows[2]
+    authors[1][attributes.index("Affiliation")] = "Department of Physics & <Astronomy>"
+    result = write(schema, rows, path)
+    assert result.written and result.rebuilt == 1
+
+
+def test_removed_author_rebuilds_nothing(tmp_path, rows):
+    schema, path = load_schema(WORKBOOK_SCHEMA), str(tmp_path / "article.xml")
+    write(schema, rows, path)
+    del rows[2][1][0]
+    result = write(schema, rows, path)
+    assert result.written and result.rebuilt == 0 and result.units == 2 + len(rows[2][1])
+    del rows[2][1][:]  # No authors at all
+    assert write(schema, rows, path).rebuilt == 0
+
+
+def test_changed_schema_rebuilds_everything(tmp_path, rows):
+    with open(load_schema(WORKBOOK_SCHEMA).source, encoding="utf-8") as file:
+        layout = json.load(file)
+    layout["body"][1]["element"] = "article_data"
+    changed_path = str(tmp_path / "changed.json")
+    with open(changed_path, "w", encoding="utf-8") as file:
+        json.dump(layout, file)
+
+    path = str(tmp_path / "article.xml")
+    write(load_schema(WORKBOOK_SCHEMA), rows, path)
+    result = write(load_schema(changed_path), rows, path)
+    assert result.written and result.rebuilt == result.units
+
+
+def test_stale_sidecar_forces_a_full_rebuild(tmp_path, rows):
+    schema, path = load_schema(WORKBOOK_SCHEMA), str(tmp_path / "article.xml")
+    write(schema, rows, path)
+    # Edited by hand: the sidecar's SHA-256 no longer matches the file
+    with open(path, "rb") as file:
+        data = file.read()
+    with open(path, "wb") as file:
+        file.write(data.replace(b"<journal>", b"<journal> "))
+    result = write(schema, rows, path)
+    assert result.written and result.rebuilt == result.units
+
+
+def test_missing_sidecar_forces_a_full_rebuild(tmp_path, rows):
+    schema, path = load_schema(WORKBOOK_SCHEMA), str(tmp_path / "article.xml")
+    write(schema, rows, path)
+    os.unlink(sidecar_path(path))
+    result = write(schema, rows, path)
+    assert not result.written and result.rebuilt == result.units
+
+
+def test_form_splices_with_windows_newlines(tmp_path):
+    form = make_forms(1, authors=4, persian=0.5)[0]
+    schema, path = load_schema(FORM_SCHEMA), str(tmp_path / "form.xml")
+
+    def expected():
+        return form_xml(form.copy(), "indent").replace("\n", "\r\n").encode("utf-8")
+
+    write_incremental(schema, form_sections(form), path, "indent", newline="\r\n")
+    form.authors[2].affiliation = "Edited affiliation"
+    del form.authors[0]
+    result = write_incremental(schema, form_sections(form), path, "indent", newline="\r\n")
+    assert result.rebuilt == 1
+    with open(path, "rb") as file:
+        assert file.read() == expected()
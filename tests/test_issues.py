@@ -0,0 +1,96 @@
+import os
+import shutil
+
+import pytest
+
+from xmlgen.converter import convert_workbook
+from xmlgen.issues import (IssueWorkbookError, article_path, convert_issue, is_issue_workbook,
+                           pack_workbooks, read_issue)
+from xmlgen.synthetic import article_values, write_workbook
+from xmlgen.writer import write_issue
+
+TEMPLATE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                        "Version 2", "TemplateFinal.xlsx")
+
+
+def read(path):
+    with open(path, "rb") as file:
+        return file.read()
+
+
+def issue_workbooks(tmp_path, count, bad_email=None):
+    """count workbooks of one journal; article bad_email gets an invalid email."""
+    journal = article_values(seed=0)[0]
+    journal["Journal_ISSN"] = "0317-8471"  # The random one rarely has the right check digit
+    sources = []
+    for seed in range(count):
+        _, article, authors = article_values(seed=seed, authors=seed + 1)
+        if seed == bad_email:
+            authors[0]["Email"] = "nobody at example.org"
+        sources.append(write_workbook(str(tmp_path / f"paper-{seed}.xlsx"), journal, article,
+                                      authors))
+    return sources
+
+
+def test_issue_converts_like_its_workbooks(tmp_path):
+    sources = issue_workbooks(tmp_path, 4)
+    issue = pack_workbooks(sources, str(tmp_path / "issue.xlsx"))
+    assert is_issue_workbook(issue) and not is_issue_workbook(sources[0])
+    output_dir, combined = str(tmp_path / "xml"), str(tmp_path / "issue.xml")
+    results = convert_issue(issue, output_dir, combined)
+    assert [result.source for result in results] == [f"{issue}#paper-{seed}" for seed in range(4)]
+    assert all(result.ok for result in results)
+    for seed, source in enumerate(sources):
+        assert read(article_path(output_dir, f"paper-{seed}")) == convert_workbook(source)
+    write_issue(sources, str(tmp_path / "expected.xml"), workers=1)
+    assert read(combined) == read(tmp_path / "expected.xml")
+
+
+def test_template_workbooks_pack(tmp_path):
+    sources = []
+    for name in ("first", "second"):
+        sources.append(shutil.copy(TEMPLATE, tmp_path / f"{name}.xlsx"))
+    issue = pack_workbooks(sources, str(tmp_path / "issue.xlsx"))
+    output_dir = str(tmp_path / "xml")
+    assert all(result.ok for result in convert_issue(issue, output_dir))
+    for name in ("first", "second"):
+        assert read(article_path(output_dir, name)) == convert_workbook(TEMPLATE)
+
+
+def test_bad_article_fails_alone(tmp_path):
+    sources = issue_workbooks(tmp_path, 3, bad_email=1)
+    issue = pack_workbooks(sources, str(tmp_path / "issue.xlsx"))
+    output_dir, combined = str(tmp_path / "xml"), str(tmp_path / "issue.xml")
+    results = convert_issue(issue, output_dir, combined, validate=True)
+    assert [result.ok for result in results] == [True, False, True]
+    assert results[1].error.startswith("failed validation: ")
+    assert "nobody at example.org" in results[1].error
+    assert not os.path.exists(article_path(output_dir, "paper-1"))
+    for seed in (0, 2):
+        assert read(article_path(output_dir, f"paper-{seed}")) == convert_workbook(sources[seed])
+    write_issue([sources[0], sources[2]], str(tmp_path / "expected.xml"), workers=1)
+    assert read(combined) == read(tmp_path / "expected.xml")
+
+
+def test_workbook_that_is_not_an_issue_fails_once(tmp_path):
+    source, = issue_workbooks(tmp_path, 1)
+    results = convert_issue(source, str(tmp_path / "xml"))
+    assert len(results) == 1 and not results[0].ok
+    assert results[0].error == "IssueWorkbookError: not an issue workbook, no 'Articles' sheet"
+
+
+def test_pack_needs_one_journal_and_distinct_ids(tmp_path):
+    first = issue_workbooks(tmp_path, 1)[0]
+    journal, article, authors = article_values(seed=5)
+    other = write_workbook(str(tmp_path / "other.xlsx"), journal, article, authors)
+    with pytest.raises(IssueWorkbookError, match="journal fields differ"):
+        pack_workbooks([first, other], str(tmp_path / "issue.xlsx"))
+    with pytest.raises(IssueWorkbookError, match="its own ID"):
+        pack_workbooks([first, first], str(tmp_path / "issue.xlsx"))
+    assert not os.path.exists(tmp_path / "issue.xlsx")
+
+
+def test_article_ids_are_read_as_text(tmp_path):
+    sources = issue_workbooks(tmp_path, 2)
+    issue = pack_workbooks(sources, str(tmp_path / "issue.xlsx"), article_ids=[12, 13])
+    assert [article.article_id for article in read_issue(issue)] == ["12", "13"]
@@ -0,0 +1,130 @@
+import os
+import shutil
+import threading
+import time
+
+import pytest
+
+from xmlgen.converter import convert_file, convert_workbook
+from xmlgen.jobs import CANCELLED, DONE, FAILED, QUEUED, RUNNING, STAGES, JobQueue
+
+TEMPLATE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                        "Version 2", "TemplateFinal.xlsx")
+
+
+class FakeRoot:
+    """Collects root.after callbacks for the test to run, as mainloop would."""
+
+    def __init__(self):
+        self.callbacks = []
+
+    def after(self, ms, func):
+        self.callbacks.append(func)
+
+    def pump(self, done, timeout=10):
+        deadline = time.monotonic() + timeout
+        while not done():
+            assert time.monotonic() < deadline, "the jobs did not finish"
+            callbacks, self.callbacks = self.callbacks, []
+            for callback in callbacks:
+                callback()
+            time.sleep(0.005)
+
+
+@pytest.fixture
+def jobs():
+    events = []
+    root = FakeRoot()
+    queue = JobQueue(root, lambda job, state, stage: events.append((job.name, state, stage)))
+    queue.events = events
+    return root, queue
+
+
+def through_stages(result):
+    def job(progress):
+        for stage in STAGES:
+            progress(stage)
+        return result
+    return job
+
+
+def test_jobs_run_in_order_and_report_every_stage(jobs):
+    root, queue = jobs
+    first = queue.submit("first", through_stages(1))
+    second = queue.submit("second", through_stages(2))
+    failing = queue.submit("failing", lambda progress: 1 / 0)
+    root.pump(lambda: not queue.jobs)
+
+    def run(name, result_state=DONE):
+        return ([(name, RUNNING, None)] + [(name, RUNNING, stage) for stage in STAGES]
+                + [(name, result_state, STAGES[-1])])
+
+    assert queue.events == ([("first", QUEUED, None), ("second", QUEUED, None),
+                             ("failing", QUEUED, None)] + run("first") + run("second")
+                            + [("failing", RUNNING, None), ("failing", FAILED, None)])
+    assert (first.state, first.result, second.result) == (DONE, 1, 2)
+    assert failing.error == "ZeroDivisionError: division by zero"
+    assert queue.waiting == 0 and not root.callbacks
+
+
+def test_cancelled_queued_job_never_starts(jobs):
+    root, queue = jobs
+    release = threading.Event()
+    called = []
+    queue.submit("blocking", lambda progress: release.wait(10))
+    queued = queue.submit("queued", lambda progress: called.append(True))
+    assert queue.waiting == 2
+    assert queue.cancel(queued) is queued
+    release.set()
+    root.pump(lambda: not queue.jobs)
+    assert queued.state == CANCELLED and not called
+    assert ("queued", RUNNING, None) not in queue.events
+
+
+@pytest.fixture
+def workbook(tmp_path):
+    return shutil.copy(TEMPLATE, tmp_path / "article.xlsx")
+
+
+def paused_conversion(source, output, pause_after):
+    """A convert_file job that waits once it has entered stage pause_after."""
+    reached, resume = threading.Event(), threading.Event()
+
+    def job(progress):
+        def paused(stage):
+            progress(stage)
+            if stage == pause_after:
+                reached.set()
+                resume.wait(10)
+        return convert_file(source, output, progress=paused)
+
+    return job, reached, resume
+
+
+@pytest.mark.parametrize("stage", STAGES[:-1])
+def test_cancel_mid_job_writes_nothing(jobs, workbook, tmp_path, stage):
+    root, queue = jobs
+    output = str(tmp_path / "article.xml")
+    job, reached, resume = paused_conversion(workbook, output, stage)
+    running = queue.submit("convert", job)
+    assert reached.wait(10)
+    queue.cancel()  # The oldest unfinished job
+    resume.set()
+    root.pump(lambda: not queue.jobs)
+    assert running.state == CANCELLED and running.stage == stage
+    assert not os.path.exists(output)
+
+
+def test_cancel_while_writing_is_too_late(jobs, workbook, tmp_path):
+    root, queue = jobs
+    output = str(tmp_path / "article.xml")
+    job, reached, resume = paused_conversion(workbook, output, "write")
+    running = queue.submit("convert", job)
+    assert reached.wait(10)
+    queue.cancel(running)
+    resume.set()
+    root.pump(lambda: not queue.jobs)
+    # The last stage has no boundary after it, so the job completes
+    assert running.state == DONE and running.result.ok
+    with open(output, "rb") as file:
+        assert file.read() == convert_workbook(workbook)
@@ -0,0 +1,47 @@
+import os
+
+import pytest
+
+from xmlgen.converter import convert_workbook
+from xmlgen.importer import iter_documents
+from xmlgen.journals import JournalStore, JournalStoreError, journal_rows
+from xmlgen.model import JOURNAL_FIELDS, Journal
+
+TEMPLATE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                        "Version 2", "TemplateFinal.xlsx")
+
+
+def journal(**values):
+    return Journal(title="Journal of Islamic Dental Sciences", journal_id_issn="1735-255X",
+                   **values)
+
+
+def test_a_profile_is_found_by_any_key():
+    profile = journal(journal_id_issn_online="2008-1234", short_title="J Isl Dent Sci")
+    store = JournalStore([("JIDS", profile)])
+    assert all(store.get(key) is profile
+               for key in ("jids", "1735255x", "2008 1234", "j-isl-dent-sci"))
+    assert store.find("1735-2551") is None
+    with pytest.raises(KeyError):
+        store.get("other")
+
+
+def test_a_profile_may_repeat_its_own_key():
+    store = JournalStore([("JIDS", journal(short_title="Jids"))])
+    assert store.get("jids") is store.get("1735255x")
+
+
+def test_two_profiles_may_not_share_a_key():
+    store = JournalStore([("JIDS", journal(short_title="J Isl Dent Sci"))])
+    with pytest.raises(JournalStoreError, match="'Other' and 'JIDS' both use the key 'jids'"):
+        store.add("Other", Journal(short_title="JIDS"))
+
+
+def test_journal_rows_round_trip_through_the_xml(tmp_path):
+    profile = journal(short_title="Jids", language="en", volume="12")
+    xml = tmp_path / "article.xml"
+    xml.write_bytes(convert_workbook(TEMPLATE, journal_rows=journal_rows(profile)))
+    [document] = iter_documents(str(xml))
+    imported = document.to_form().journal
+    for field in JOURNAL_FIELDS:
+        assert getattr(imported, field) == getattr(profile, field), field
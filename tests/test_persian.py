@@ -0,0 +1,93 @@
+import random
+
+import pytest
+
+from xmlgen import persian
+from xmlgen.model import ArticleForm, Author
+from xmlgen.persian import (SEPARATOR, is_persian_field, normalize, normalize_authors,
+                            normalize_column, normalize_form, normalize_pairs)
+
+ZWNJ = "\u200c"
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("علي", "علی"),  # Arabic yeh
+    ("مصطفى", "مصطفی"),  # Alef maksura
+    ("كتاب", "کتاب"),  # Arabic kaf
+    ("سال ١٤٠٣", "سال ۱۴۰۳"),  # Arabic-Indic digits
+    ("سال ۱۴۰۳ and 2024", "سال ۱۴۰۳ and 2024"),  # Persian and ASCII digits stay
+    ("\ufeffعنوان", "عنوان"),
+])
+def test_letters_and_digits(text, expected):
+    assert normalize(text) == expected
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("  دانشگاه \u00a0\t تهران  ", "دانشگاه تهران"),
+    ("دانشگاه\u2003\u2009تهران", "دانشگاه تهران"),
+    ("می" + ZWNJ * 3 + "خواهیم", "می" + ZWNJ + "خواهیم"),
+    ("می" + ZWNJ + " خواهیم", "می خواهیم"),
+    ("می " + ZWNJ + ZWNJ + " خواهیم", "می خواهیم"),
+    (ZWNJ + "کتاب" + ZWNJ, "کتاب"),
+    ("خط اول" + ZWNJ + " \nخط دوم", "خط اول\nخط دوم"),
+    ("خط اول\n  " + ZWNJ + "خط دوم", "خط اول\nخط دوم"),
+    (" " + ZWNJ + " ", ""),
+])
+def test_spaces_and_zwnjs(text, expected):
+    assert normalize(text) == expected
+
+
+def test_values_that_are_not_text():
+    assert [normalize(value) for value in (None, 12, 1.5)] == [None, 12, 1.5]
+
+
+def test_persian_fields():
+    assert is_persian_field("Title_FA") and is_persian_field("affiliation_fa")
+    assert not is_persian_field("Title") and not is_persian_field(None)
+
+
+def random_values(rng, count):
+    pieces = ["علي", "كتاب", "دانشگاه", "abc", "١٤٠٣", " ", "  ", "\u00a0", "\t", ZWNJ,
+              ZWNJ * 2, "\n", "\ufeff", SEPARATOR]
+    values = []
+    for _ in range(count):
+        roll = rng.random()
+        if roll < 0.1:
+            values.append(rng.choice([None, 7, 2.5]))
+        elif roll < 0.15:
+            values.append("".join(rng.choices(pieces, k=400)))  # Past JOIN_LIMIT
+        else:
+            values.append("".join(rng.choices(pieces, k=rng.randint(0, 8))))
+    return values
+
+
+@pytest.mark.parametrize("chunk", [persian.CHUNK, 64])
+def test_columns_match_cells(monkeypatch, chunk):
+    monkeypatch.setattr(persian, "CHUNK", chunk)  # Small chunks split the column many times
+    values = random_values(random.Random(20), 2000)
+    assert any(isinstance(value, str) and SEPARATOR in value for value in values)
+    expected = [normalize(value) or None if isinstance(value, str) else value
+                for value in values]
+    assert normalize_column(values) == expected
+
+
+def test_separator_does_not_shift_the_column():
+    values = ["a" + SEPARATOR + "b", "علي", "  ", "كتاب"]
+    assert normalize_column(values) == ["a" + SEPARATOR + "b", "علی", None, "کتاب"]
+
+
+def test_rows_and_authors():
+    rows = [("Title", " علي "), ("Title_FA", " علي "), ("Volume", 3)]
+    assert normalize_pairs(rows) == [("Title", " علي "), ("Title_FA", "علی"), ("Volume", 3)]
+    attributes = ["First_Name", "First_Name_FA", "Affiliation_FA"]
+    authors = [("Ali", "علي", "دانشگاه  تهران"), ("Reza", None), ("Sara", " ", "كرج")]
+    assert normalize_authors((attributes, authors)) == (attributes, [
+        ("Ali", "علی", "دانشگاه تهران"), ("Reza", None), ("Sara", None, "کرج")])
+
+
+def test_form_fields():
+    form = ArticleForm(authors=[Author(first_name="علي", first_name_fa="علي")])
+    form.article.article_title_fa = "كتاب  ١"
+    normalize_form(form)
+    assert form.article.article_title_fa == "کتاب ۱"
+    assert (form.authors[0].first_name, form.authors[0].first_name_fa) == ("علي", "علی")
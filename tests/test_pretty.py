@@ -0,0 +1,61 @@
+import xml.etree.ElementTree as ET
+
+import pytest
+
+from xmlgen.bench import build_form_tree
+from xmlgen.model import build_form_tree as build_article_tree
+from xmlgen.pretty import pretty_xml
+from xmlgen.synthetic import make_forms
+
+
+def same_document(first, second):
+    """True if two XML strings differ only in indentation whitespace."""
+    def normalize(text):
+        return (text or "").strip()
+
+    def equal(a, b):
+        return (a.tag == b.tag and a.attrib == b.attrib and len(a) == len(b)
+                and normalize(a.text) == normalize(b.text)
+                and normalize(a.tail) == normalize(b.tail)
+                and all(equal(x, y) for x, y in zip(a, b)))
+
+    return equal(ET.fromstring(first.encode("utf-8")), ET.fromstring(second.encode("utf-8")))
+
+
+def escaping_tree():
+    root = build_form_tree(3, 20)
+    article = root.find("article")
+    ET.SubElement(article, "keywords").text = 'a < b && c > d, "quoted" \'single\''
+    ET.SubElement(article, "abstract_lines").text = "first line\nsecond & third\n"
+    ET.SubElement(article, "subject_fa").text = "می‌خواهیم «پژوهش» ۱۴۰۳ <ویژه>"
+    ET.SubElement(article, "empty")
+    return root
+
+
+TREES = {
+    "long abstracts": lambda: build_form_tree(50, 5000),
+    "escaping": escaping_tree,
+    "persian form": lambda: build_article_tree(
+        make_forms(1, authors=20, abstract_words=2000, persian=0.8)[0]),
+}
+
+
+@pytest.mark.parametrize("tree", TREES.values(), ids=TREES.keys())
+def test_indent_and_minidom_write_the_same_document(tree):
+    # pretty_xml indents in place, so each method gets a fresh tree
+    indent, minidom = pretty_xml(tree(), "indent"), pretty_xml(tree(), "minidom")
+    assert indent != minidom  # Empty elements and whitespace are spelled differently
+    assert same_document(indent, minidom)
+
+
+def test_same_document_notices_a_difference():
+    root = escaping_tree()
+    root.find("article/keywords").text = "changed"
+    assert not same_document(pretty_xml(escaping_tree(), "indent"), pretty_xml(root, "minidom"))
+
+
+def test_minidom_is_the_default():
+    # V1's saved files keep their original spelling unless indent is picked
+    assert pretty_xml(escaping_tree()) == pretty_xml(escaping_tree(), "minidom")
+    assert "<empty/>" in pretty_xml(escaping_tree())
+    assert "<empty />" in pretty_xml(escaping_tree(), "indent")
@@ -0,0 +1,21 @@
+import pytest
+
+from xmlgen.bench import convert_iterrows, write_author_workbook
+from xmlgen.converter import convert_workbook
+from xmlgen.readers import BACKENDS
+
+pytest.importorskip("pandas")  # convert_iterrows is the original pandas conversion
+
+
+@pytest.fixture(scope="module")
+def wide_sheet(tmp_path_factory):
+    """A 500-author sheet and its XML as the original iterrows code wrote it."""
+    path = str(tmp_path_factory.mktemp("authors") / "authors.xlsx")
+    write_author_workbook(path, 500)
+    return path, convert_iterrows(path)
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_500_authors_match_the_original_conversion(wide_sheet, backend):
+    path, expected = wide_sheet
+    assert convert_workbook(path, backend) == expected
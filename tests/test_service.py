@@ -0,0 +1,119 @@
+import asyncio
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from xmlgen import service as service_module
+from xmlgen.converter import convert_workbook
+from xmlgen.model import ArticleForm, form_xml
+from xmlgen.service import ConversionService
+from xmlgen.synthetic import make_forms
+
+TEMPLATE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                        "Version 2", "TemplateFinal.xlsx")
+
+
+def template_bytes():
+    with open(TEMPLATE, "rb") as file:
+        return file.read()
+
+
+async def request(port, method, path, body=b"", content_length=None):
+    """Send one request and return (status, headers, body)."""
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    length = len(body) if content_length is None else content_length
+    writer.write(f"{method} {path} HTTP/1.1\r\nHost: localhost\r\nConnection: close\r\n"
+                 f"Content-Length: {length}\r\n\r\n".encode("latin-1") + body)
+    await writer.drain()
+    head = await reader.readuntil(b"\r\n\r\n")
+    lines = head.decode("latin-1").split("\r\n")[:-2]
+    headers = dict(line.split(": ", 1) for line in lines[1:])
+    payload = await reader.readexactly(int(headers["Content-Length"]))
+    writer.close()
+    return int(lines[0].split(" ")[1]), headers, payload
+
+
+def run(service, scenario):
+    async def main():
+        await service.start()
+        try:
+            return await scenario(service.port)
+        finally:
+            await service.close()
+
+    return asyncio.run(main())
+
+
+def test_convert_form_and_metrics():
+    form = make_forms(1, authors=3)[0]
+
+    async def scenario(port):
+        converted = await request(port, "POST", "/convert", template_bytes())
+        formed = await request(port, "POST", "/form?pretty=indent",
+                               json.dumps(form.to_dict()).encode("utf-8"))
+        bad = await request(port, "POST", "/convert", b"not a workbook")
+        metrics = await request(port, "GET", "/metrics")
+        return converted, formed, bad, metrics
+
+    service = ConversionService(port=0, workers=1)
+    converted, formed, bad, metrics = run(service, scenario)
+    assert converted[0] == 200
+    assert converted[1]["Content-Type"].startswith("application/xml")
+    assert converted[2] == convert_workbook(TEMPLATE)
+    assert formed[0] == 200
+    assert formed[2] == form_xml(ArticleForm.from_dict(form.to_dict()), "indent").encode("utf-8")
+    assert bad[0] == 422
+
+    stats = json.loads(metrics[2])
+    assert stats["requests"] == 3  # The /metrics request itself is counted once answered
+    assert stats["responses"] == {"200": 2, "422": 1}
+    assert stats["rejected"] == 0
+    assert stats["queue_depth"] == {"pending": 0, "running": 0, "waiting": 0, "peak": 1}
+    assert stats["latency_seconds"]["p50"] > 0
+
+
+def test_full_pool_answers_503(monkeypatch):
+    release = threading.Event()
+    convert = service_module._convert_upload
+
+    def blocked_convert(*args):
+        release.wait(30)
+        return convert(*args)
+
+    # Threads instead of processes, so the conversions can be held up
+    monkeypatch.setattr(service_module, "_convert_upload", blocked_convert)
+    service = ConversionService(port=0, workers=1, queue=1)
+
+    async def scenario(port):
+        service._executor.shutdown()
+        service._executor = ThreadPoolExecutor(max_workers=1)
+        held = [asyncio.create_task(request(port, "POST", "/convert", template_bytes()))
+                for _ in range(service.limit)]
+        while service.pending < service.limit:
+            await asyncio.sleep(0.01)
+        rejected = await request(port, "POST", "/convert", template_bytes())
+        release.set()
+        return rejected, await asyncio.gather(*held), service.stats()
+
+    rejected, held, stats = run(service, scenario)
+    assert rejected[0] == 503
+    assert rejected[1]["Retry-After"] == "1"
+    assert [status for status, _, _ in held] == [200, 200]
+    assert stats["rejected"] == 1
+    assert stats["responses"] == {"200": 2, "503": 1}
+    assert stats["queue_depth"]["peak"] == 2
+
+
+def test_stalled_body_times_out(monkeypatch):
+    monkeypatch.setattr(service_module, "BODY_TIMEOUT", 0.2)
+
+    async def scenario(port):
+        return await request(port, "POST", "/convert", b"PK\x03\x04", content_length=1000)
+
+    service = ConversionService(port=0, workers=1)
+    status, headers, body = run(service, scenario)
+    assert status == 408
+    assert headers["Connection"] == "close"
+    assert "did not arrive" in json.loads(body)["error"]
+    assert service.pending == 0
@@ -0,0 +1,85 @@
+import pytest
+
+from xmlgen.model import ArticleForm, Author, Journal
+from xmlgen.readers import read_workbook
+from xmlgen.synthetic import article_values, write_workbook
+from xmlgen.validate import (CHECK_CACHE_SIZE, check, describe, validate_form, validate_rows,
+                             validate_workbooks)
+
+
+@pytest.mark.parametrize("kind, value, error", [
+    ("issn", "2049-3630", None),
+    ("issn", "03178471", None),
+    ("issn", "0317-8472", "bad ISSN check digit, expected 1"),
+    ("issn", "0317-847", "not an ISSN (NNNN-NNNN)"),
+    ("orcid", "0000-0002-1825-0097", None),
+    ("orcid", "https://orcid.org/0000-0002-1694-233X", None),
+    ("orcid", "0000-0002-1825-0098", "bad ORCID check digit, expected 7"),
+    ("orcid", "0000-0002-1694-2330", "bad ORCID check digit, expected X"),
+    ("orcid", "1234", "not an ORCID (0000-0000-0000-0000)"),
+    ("doi", "10.1000/xyz123", None),
+    ("doi", "https://doi.org/10.1000/182", None),
+    ("doi", "doi: 10.1016/j.cell.2020.01.001", None),
+    ("doi", "11.1000/x", "not a DOI (10.NNNN/suffix)"),
+    ("email", "a.b@example.org", None),
+    ("email", "a@b", "not an email address"),
+    ("email", "a b@example.org", "not an email address"),
+    ("issn", None, None),  # Empty cells are not checked
+    ("email", "  ", None),
+])
+def test_identifiers(kind, value, error):
+    assert check(kind, value) == error
+
+
+def workbook(path, issn="0317-8471", email=None):
+    journal, article, authors = article_values(seed=6)
+    journal["Journal_ISSN"] = issn
+    if email is not None:
+        authors[1]["Email"] = email
+    return write_workbook(str(path), journal, article, authors)
+
+
+def test_rows(tmp_path):
+    source = workbook(tmp_path / "bad.xlsx", "0317-8472", "nobody")
+    problems = validate_rows(*read_workbook(source), source=source)
+    assert [describe(problem) for problem in problems] == [
+        "Journal_ISSN: '0317-8472': bad ISSN check digit, expected 1",
+        "Email of author 2: 'nobody': not an email address",
+    ]
+    assert {problem.source for problem in problems} == {source}
+    assert validate_rows(*read_workbook(workbook(tmp_path / "good.xlsx"))) == []
+
+
+def test_form():
+    form = ArticleForm(journal=Journal(journal_id_issn="0317-8471", journal_id_doi="10.1000"),
+                       authors=[Author(orcid="0000-0002-1825-0098")])
+    assert [describe(problem) for problem in validate_form(form)] == [
+        "orcid of author 1: '0000-0002-1825-0098': bad ORCID check digit, expected 7"]
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_workbooks(tmp_path, workers):
+    good = workbook(tmp_path / "good.xlsx")
+    bad = workbook(tmp_path / "bad.xlsx", email="nobody")
+    missing = str(tmp_path / "missing.xlsx")
+    report = validate_workbooks([good, bad, missing, good], workers=workers)
+    assert not report.ok
+    assert report.checked == [good, bad, missing, good]
+    assert report.invalid_sources() == [bad, missing]
+    assert report.problems[1].error.startswith("FileNotFoundError")
+    assert report.to_dict()["invalid"] == [bad, missing]
+
+
+def test_fail_fast_stops_at_the_first_problem(tmp_path):
+    good = workbook(tmp_path / "good.xlsx")
+    bad = workbook(tmp_path / "bad.xlsx", "0317-8472")
+    report = validate_workbooks([good, bad, good], workers=1, fail_fast=True)
+    assert report.checked == [good, bad] and report.stopped
+
+
+def test_checks_are_remembered_in_a_bounded_cache():
+    check.cache_clear()
+    check("issn", "0317-8471")
+    check("issn", "0317-8471")
+    info = check.cache_info()
+    assert (info.hits, info.misses, info.maxsize) == (1, 1, CHECK_CACHE_SIZE)
@@ -0,0 +1,160 @@
+import json
+import os
+import shutil
+import time
+
+import pytest
+
+from xmlgen import output
+from xmlgen.converter import convert_workbook
+from xmlgen.output import write_output
+from xmlgen.watch import INCOMPLETE_SETTLES, Watcher
+
+TEMPLATE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                        "Version 2", "TemplateFinal.xlsx")
+SETTLE = 1.0
+
+
+@pytest.fixture
+def watcher(tmp_path):
+    inbox = tmp_path / "inbox"
+    inbox.mkdir()
+    watcher = Watcher(str(inbox), str(tmp_path / "xml"), workers=1, settle=SETTLE,
+                      stats_file=str(tmp_path / "stats.json"), use_events=False)
+    yield watcher
+    watcher.close()
+
+
+def finish(watcher, timeout=60):
+    """Convert everything that is ready, waiting for the pool."""
+    results = []
+    deadline = time.monotonic() + timeout
+    while (watcher.in_flight or watcher.ready) and time.monotonic() < deadline:
+        watcher.submit()
+        time.sleep(0.05)
+        results += watcher.collect()
+    assert not watcher.in_flight and not watcher.ready, "conversions did not finish"
+    return results
+
+
+def drop(watcher, name, data):
+    path = os.path.join(watcher.input_dir, name)
+    with open(path, "wb") as file:
+        file.write(data)
+    return path
+
+
+def template_bytes():
+    with open(TEMPLATE, "rb") as file:
+        return file.read()
+
+
+def test_waits_for_the_workbook_to_settle(watcher):
+    start = time.monotonic()
+    path = drop(watcher, "article.xlsx", template_bytes())
+    assert watcher.step(now=start) == []
+    assert path in watcher.candidates
+    watcher.step(now=start + SETTLE / 2)
+    assert not watcher.in_flight and not watcher.ready
+
+    watcher.step(now=start + SETTLE)
+    assert [path for path, _, _ in watcher.in_flight.values()] == [path]
+    [result] = finish(watcher)
+    assert result.ok
+    assert result.output == os.path.join(watcher.output_dir, "article.xml")
+
+
+def test_partially_written_workbook_is_not_converted(watcher):
+    start = time.monotonic()
+    data = template_bytes()
+    path = drop(watcher, "article.xlsx", data[:len(data) // 2])
+    watcher.step(now=start)
+    # Settled, but no zip directory yet: the copy may just be stalled
+    watcher.step(now=start + SETTLE * 2)
+    assert path in watcher.candidates and not watcher.in_flight
+
+    # The rest arrives; the settle period starts again
+    drop(watcher, "article.xlsx", data)
+    watcher.step(now=start + SETTLE * 3)
+    assert not watcher.in_flight
+    watcher.step(now=start + SETTLE * 4)
+    assert watcher.in_flight
+    [result] = finish(watcher)
+    assert result.ok
+
+
+def test_a_file_that_never_completes_is_reported(watcher):
+    start = time.monotonic()
+    path = drop(watcher, "broken.xlsx", b"not a workbook")
+    watcher.step(now=start)
+    watcher.step(now=start + SETTLE * (INCOMPLETE_SETTLES - 1))
+    assert not watcher.in_flight
+    watcher.step(now=start + SETTLE * INCOMPLETE_SETTLES)
+    [result] = finish(watcher)
+    assert result.source == path and not result.ok
+    assert not os.path.exists(watcher.output_for(path))
+
+
+def test_output_is_replaced_atomically(watcher):
+    start = time.monotonic()
+    drop(watcher, "article.xlsx", template_bytes())
+    os.makedirs(watcher.output_dir)
+    output = os.path.join(watcher.output_dir, "article.xml")
+    with open(output, "wb") as file:
+        file.write(b"old")
+    os.utime(output, (0, 0))  # Older than the workbook, so it is converted again
+
+    watcher.step(now=start)
+    watcher.step(now=start + SETTLE)
+    finish(watcher)
+    with open(output, "rb") as file:
+        assert file.read() == convert_workbook(TEMPLATE)
+    # No temporary files are left next to the output
+    assert os.listdir(watcher.output_dir) == ["article.xml"]
+
+
+def test_write_output_renames_a_complete_file(tmp_path, monkeypatch):
+    path = str(tmp_path / "article.xml")
+    write_output(path, b"old")
+    renames = []
+    replace = os.replace
+
+    def checked_replace(source, target):
+        # The target still has the old content while the new one is written
+        with open(target, "rb") as file:
+            assert file.read() == b"old"
+        with open(source, "rb") as file:
+            renames.append(file.read())
+        replace(source, target)
+
+    monkeypatch.setattr(output.os, "replace", checked_replace)
+    write_output(path, b"new")
+    assert renames == [b"new"]
+
+    with pytest.raises(TypeError):
+        write_output(path, "not bytes")
+    with open(path, "rb") as file:
+        assert file.read() == b"new"
+    assert os.listdir(tmp_path) == ["article.xml"]
+
+
+def test_stats_file(watcher):
+    # Settled in the past, so the latencies are real waits
+    start = time.monotonic() - SETTLE * INCOMPLETE_SETTLES
+    drop(watcher, "one.xlsx", template_bytes())
+    shutil.copy(TEMPLATE, os.path.join(watcher.input_dir, "two.xlsx"))
+    drop(watcher, "bad.xlsx", b"PK\x03\x04 not really a zip")
+    watcher.step(now=start)
+    watcher.step(now=start + SETTLE * INCOMPLETE_SETTLES)
+    finish(watcher)
+
+    with open(watcher.stats_file, encoding="utf-8") as file:
+        stats = json.load(file)
+    assert stats["converted"] == 2
+    assert stats["failed"] == 1
+    assert stats["cached"] == 0
+    assert stats["waiting"] == 0 and stats["in_flight"] == 0
+    assert stats["per_minute"] > 0
+    latency = stats["latency_seconds"]
+    assert 0 <= latency["p50"] <= latency["p95"] <= latency["max"]
+    assert latency["mean"] <= latency["max"]
@@ -0,0 +1,60 @@
+import os
+
+import openpyxl
+import pytest
+
+from xmlgen.converter import build_tree, convert_workbook
+from xmlgen.readers import read_workbook
+from xmlgen.writer import IssueWriter, write_issue
+
+TEMPLATE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                        "Version 2", "TemplateFinal.xlsx")
+DECLARATION = b"<?xml version='1.0' encoding='UTF-8'?>\n"
+
+
+def workbooks(tmp_path, count):
+    """count copies of TemplateFinal.xlsx, each with its own article title."""
+    sources = []
+    for number in range(count):
+        book = openpyxl.load_workbook(TEMPLATE)
+        book["Article"]["B1"] = f"Article {number}"
+        sources.append(str(tmp_path / f"article{number}.xlsx"))
+        book.save(sources[-1])
+    return sources
+
+
+def as_issue(documents):
+    """The <issue> document holding each article document, indented one level."""
+    articles = []
+    for document in documents:
+        assert document.startswith(DECLARATION)
+        lines = document[len(DECLARATION):].splitlines(keepends=True)
+        articles.extend(b"  " + line for line in lines)
+    return DECLARATION + b"<issue>\n" + b"".join(articles) + b"</issue>"
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_issue_is_the_articles_one_level_down(tmp_path, workers):
+    sources = workbooks(tmp_path, 3)
+    missing = str(tmp_path / "missing.xlsx")
+    output = str(tmp_path / "xml" / "issue.xml")
+    results = write_issue(sources[:2] + [missing] + sources[2:], output, workers=workers)
+    assert [result.ok for result in results] == [True, True, False, True]
+    assert results[2].error.startswith("FileNotFoundError")
+    with open(output, "rb") as file:
+        assert file.read() == as_issue(convert_workbook(source) for source in sources)
+    assert os.listdir(tmp_path / "xml") == ["issue.xml"]
+
+
+def test_failed_issue_leaves_the_old_document(tmp_path):
+    source, = workbooks(tmp_path, 1)
+    output = str(tmp_path / "issue.xml")
+    with open(output, "wb") as file:
+        file.write(b"old")
+    with pytest.raises(KeyboardInterrupt):
+        with IssueWriter(output) as issue:
+            issue.write(build_tree(*read_workbook(source)))
+            raise KeyboardInterrupt
+    with open(output, "rb") as file:
+        assert file.read() == b"old"
+    assert sorted(os.listdir(tmp_path)) == ["article0.xlsx", "issue.xml"]
@@ -0,0 +1,81 @@
+"""Excel-to-XML conversion engine shared by the desktop apps and the command line.
+
+The public names below are loaded on first use, so importing the package
+(or a light submodule such as xmlgen.model) does not pull in lxml or the
+workbook readers.
+"""
+
+import importlib
+
+# Public name -> submodule that defines it
+_EXPORTS = {
+    "ArchiveWriter": "bundle",
+    "AuthorRegistry": "authors",
+    "BACKENDS": "readers",
+    "ConversionResult": "converter",
+    "ConversionService": "service",
+    "DateError": "dates",
+    "IncrementalResult": "incremental",
+    "IssueWorkbookError": "issues",
+    "IssueWriter": "writer",
+    "JobQueue": "jobs",
+    "JournalStore": "journals",
+    "ProfileOptions": "profiling",
+    "Schema": "schema",
+    "SchemaError": "schema",
+    "StageTimer": "profiling",
+    "StreamingWorkbook": "readers",
+    "TemplateMismatchError": "template",
+    "TemplatePlan": "template",
+    "ValidationReport": "validate",
+    "build_tree": "converter",
+    "collect_jobs": "converter",
+    "compile_template": "template",
+    "complete_pub_dates": "dates",
+    "convert_file": "converter",
+    "convert_issue": "issues",
+    "convert_many": "converter",
+    "convert_workbook": "converter",
+    "fill_date_rows": "dates",
+    "find_workbooks": "converter",
+    "gregorian_to_jalali": "dates",
+    "import_archive": "importer",
+    "iter_documents": "importer",
+    "jalali_to_gregorian": "dates",
+    "load_form": "importer",
+    "load_plan": "template",
+    "load_registry": "authors",
+    "load_schema": "schema",
+    "load_store": "journals",
+    "normalize_form": "persian",
+    "normalize_rows": "persian",
+    "pack_workbooks": "issues",
+    "profile_call": "profiling",
+    "read_issue": "issues",
+    "read_rows": "converter",
+    "read_workbook": "readers",
+    "read_with_plan": "template",
+    "serialize": "converter",
+    "sidecar_path": "incremental",
+    "validate_form": "validate",
+    "validate_workbooks": "validate",
+    "write_archive": "bundle",
+    "write_forms": "bundle",
+    "write_incremental": "incremental",
+    "write_issue": "writer",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{module}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_EXPORTS))
@@ -0,0 +1,210 @@
+"""Author registry: every author seen across an issue or a year, indexed.
+
+The same authors come back article after article with the same names,
+affiliations, ORCID and email. An AuthorRegistry keeps one Author record
+per distinct author, indexed by ORCID and by normalized email, so
+
+* the form app can fill in an author from an ORCID or email in one
+  dictionary lookup (see lookup()),
+* a batch holds each repeated author record, and each repeated string
+  (affiliations above all), only once: add() returns the registry's own
+  record and interns every field value,
+* the same ORCID written with different names, or one email under two
+  ORCIDs, is flagged (see conflicts()).
+
+Workbook author columns are added with add_row(). A registry is saved as
+``{"authors": [...]}`` with the form app's author fields.
+"""
+
+import json
+import os
+import re
+from collections import namedtuple
+
+from .model import AUTHOR_FIELDS, AUTHOR_TAGS, Author
+from .output import write_output
+
+# Where the form app keeps the authors of the articles it has saved
+DEFAULT_REGISTRY = os.path.join(os.path.expanduser("~"), ".xmlgen", "authors.json")
+
+# Fields that must agree for two records with one ORCID to be the same person
+IDENTITY_FIELDS = ("first_name", "middle_name", "last_name", "first_name_fa", "middle_name_fa",
+                   "last_name_fa", "email")
+
+# key is the normalized ORCID (or email, for field "orcid"); values maps each
+# spelling of field to the sources it came from
+AuthorConflict = namedtuple("AuthorConflict", "key field values")
+
+_ORCID_PREFIX = re.compile(r"^(?:https?://)?(?:www\.)?orcid\.org/", re.IGNORECASE)
+_TAG_FIELDS = dict(zip(AUTHOR_TAGS, AUTHOR_FIELDS))
+_YES = ("yes", "y", "true", "1")
+
+
+def normalize_orcid(value):
+    """0000-0002-1825-0097 for any spelling of it (URL, spaces, no hyphens),
+    or None if value does not have the shape of an ORCID."""
+    if not value:
+        return None
+    digits = re.sub(r"[\s\-]+", "", _ORCID_PREFIX.sub("", str(value).strip())).upper()
+    if not re.fullmatch(r"\d{15}[\dX]", digits):
+        return None
+    return "-".join(digits[i:i + 4] for i in range(0, 16, 4))
+
+
+def normalize_email(value):
+    if not value:
+        return None
+    value = str(value).strip().casefold()
+    return value if "@" in value else None
+
+
+def _key(author):
+    return tuple(getattr(author, field) for field in AUTHOR_FIELDS)
+
+
+# Being the core author is a role in one article, not part of who someone is
+_PERSON = [index for index, field in enumerate(AUTHOR_FIELDS) if field != "coreauthor"]
+
+
+class AuthorRegistry:
+    """Distinct authors with ORCID and email indexes and a string pool."""
+
+    def __init__(self, source=None):
+        self.source = source
+        self.authors = []  # One record per distinct person, in the order first seen
+        self.by_orcid = {}  # normalized ORCID -> Author (latest seen)
+        self.by_email = {}  # normalized email -> Author (latest seen)
+        self.added = 0  # Records passed to add(), repeats included
+        self._records = {}  # field values -> Author
+        self._people = set()  # field values but coreauthor
+        self._strings = {}
+        self._spellings = {}  # (ORCID, field) -> {value: set of sources}
+        self._email_orcids = {}  # normalized email -> {ORCID: set of sources}
+
+    def intern(self, value):
+        """The registry's copy of the string value, so repeats share one object."""
+        if not isinstance(value, str):
+            return value
+        return self._strings.setdefault(value, value)
+
+    def add(self, author, source=None):
+        """Register author and return the registry's record for it.
+
+        An author identical to one already registered gives back that record;
+        otherwise a copy with interned strings is kept. Records are shared,
+        so copy one before editing it. source (a file name, say) is only
+        used to report conflicts.
+        """
+        self.added += 1
+        key = tuple(self.intern(value) for value in _key(author))
+        record = self._records.get(key)
+        if record is None:
+            record = self._records[key] = Author(**dict(zip(AUTHOR_FIELDS, key)))
+            person = tuple(key[index] for index in _PERSON)
+            if person not in self._people:
+                self._people.add(person)
+                self.authors.append(record)
+        orcid = normalize_orcid(record.orcid)
+        email = normalize_email(record.email)
+        if orcid is not None:
+            self.by_orcid[orcid] = record
+            for field in IDENTITY_FIELDS:
+                value = getattr(record, field).strip()
+                if value:
+                    spellings = self._spellings.setdefault((orcid, field), {})
+                    spellings.setdefault(value, set()).add(source)
+        if email is not None:
+            self.by_email[email] = record
+            if orcid is not None:
+                self._email_orcids.setdefault(email, {}).setdefault(orcid, set()).add(source)
+        return record
+
+    def add_form(self, form, source=None):
+        """Register a form's authors, replacing them with the registry's records."""
+        form.authors[:] = [self.add(author, source) for author in form.authors]
+        return form
+
+    def add_row(self, attributes, values, source=None):
+        """Register one author column of a workbook ('Author(s)' tags in
+        attributes); returns the values with their strings interned."""
+        values = tuple(self.intern(value) for value in values)
+        fields = {}
+        for tag, value in zip(attributes, values):
+            field = _TAG_FIELDS.get(tag)
+            if field == "coreauthor":
+                fields[field] = str(value or "").strip().casefold() in _YES
+            elif field is not None:
+                fields[field] = "" if value is None else str(value)
+        self.add(Author(**fields), source)
+        return values
+
+    def add_table(self, author_table, source=None):
+        """add_row() for every author of a read_workbook() author table."""
+        attributes, authors = author_table
+        attributes = [self.intern(attribute) for attribute in attributes]
+        return attributes, [self.add_row(attributes, values, source) for values in authors]
+
+    def lookup(self, key):
+        """The author with this ORCID or email (any spelling), or None."""
+        orcid = normalize_orcid(key)
+        if orcid is not None:
+            return self.by_orcid.get(orcid)
+        email = normalize_email(key)
+        return self.by_email.get(email) if email is not None else None
+
+    def conflicts(self):
+        """AuthorConflicts for ORCIDs registered with different names or
+        emails, and for emails registered under different ORCIDs."""
+        found = [AuthorConflict(orcid, field, spellings)
+                 for (orcid, field), spellings in self._spellings.items()
+                 if len(spellings) > 1]
+        found.extend(AuthorConflict(email, "orcid", orcids)
+                     for email, orcids in self._email_orcids.items() if len(orcids) > 1)
+        return found
+
+    def stats(self):
+        return {
+            "records": self.added,
+            "distinct": len(self.authors),
+            "orcids": len(self.by_orcid),
+            "emails": len(self.by_email),
+            "strings": len(self._strings),
+            "conflicts": len(self.conflicts()),
+        }
+
+    def __len__(self):
+        return len(self.authors)
+
+    def __iter__(self):
+        return iter(self.authors)
+
+    def to_dict(self):
+        return {"authors": [author.to_dict() for author in self.authors]}
+
+    @classmethod
+    def from_file(cls, path):
+        with open(path, encoding="utf-8") as file:
+            data = json.load(file)
+        registry = cls(source=os.path.abspath(path))
+        for values in data.get("authors", []):
+            registry.add(Author(**values), path)
+        return registry
+
+    def save(self, path=None):
+        path = path or self.source
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        data = json.dumps(self.to_dict(), ensure_ascii=False, indent=1)
+        write_output(path, data.encode("utf-8"))
+        self.source = os.path.abspath(path)
+        return path
+
+
+def load_registry(path=DEFAULT_REGISTRY):
+    """The registry saved at path, or an empty one (to be saved there) if
+    there is no such file."""
+    try:
+        return AuthorRegistry.from_file(path)
+    except FileNotFoundError:
+        return AuthorRegistry(source=os.path.abspath(path))
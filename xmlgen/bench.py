@@ -0,0 +1,493 @@
+"""Micro-benchmarks for the conversion engine.
+
+    python -m xmlgen.bench readers [workbook.xlsx ...] [--repeat N]
+    python -m xmlgen.bench authors [--authors 500] [--repeat N]
+    python -m xmlgen.bench pretty [--authors 200] [--abstract-words 5000]
+    python -m xmlgen.bench persian [--cells 200] [--abstract-words 5000]
+    python -m xmlgen.bench issue [--articles 40] [--authors 5]
+    python -m xmlgen.bench suite [--scales small,medium,large] [--save-baseline]
+    python -m xmlgen.bench generate DIR [--workbooks 100] [--authors 5] ...
+
+With no workbooks the bundled ``Version 2/TemplateFinal.xlsx`` is used.
+
+``suite`` times the two end-to-end paths, V2.2's workbook conversion and
+V1's form save, on synthetic articles (see xmlgen.synthetic) at several
+scales. Every case runs in a fresh process so its peak RSS is its own.
+Throughput and peak RSS are compared with the stored baseline and the
+suite exits non-zero if any case got slower or bigger than the tolerance
+allows. Baselines are machine specific; re-record with --save-baseline.
+"""
+
+import argparse
+import gc
+import json
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+
+from .synthetic import AUTHOR_TAGS
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TEMPLATE = os.path.join(ROOT, "Version 2", "TemplateFinal.xlsx")
+BASELINE = os.path.join(ROOT, "benchmarks", "baseline.json")
+
+# Synthetic article sizes per scale
+SCALES = {
+    "small": {"authors": 3, "abstract_words": 150, "workbooks": 60},
+    "medium": {"authors": 30, "abstract_words": 1500, "workbooks": 20},
+    "large": {"authors": 300, "abstract_words": 15000, "workbooks": 4},
+}
+PATHS = ("v2.2", "v1")
+
+
+def measure(func, repeat):
+    """Return (best seconds per call, peak traced bytes) for func()."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+
+    # Tracing slows the code down, so peak memory gets its own run
+    gc.collect()
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return best, peak
+
+
+def report(name, seconds, peak, extra=""):
+    print(f"{name:<28} {seconds * 1000:9.2f} ms {peak / 1024:10.0f} KiB  {extra}")
+
+
+def bench_readers(args):
+    from .converter import convert_workbook
+    from .readers import BACKENDS
+
+    workbooks = args.workbooks or [TEMPLATE]
+    print(f"{'backend':<28} {'per workbook':>12} {'peak memory':>14}")
+    for backend in BACKENDS:
+        # The first call pays for importing the backend's dependencies
+        start = time.perf_counter()
+        convert_workbook(workbooks[0], backend)
+        first = time.perf_counter() - start
+
+        def run():
+            for path in workbooks:
+                convert_workbook(path, backend)
+
+        seconds, peak = measure(run, args.repeat)
+        report(backend, seconds / len(workbooks), peak,
+               f"(first call incl. imports {first * 1000:.0f} ms)")
+
+
+AUTHOR_ATTRIBUTES = list(AUTHOR_TAGS)
+
+
+def write_author_workbook(path, authors):
+    """Write a TemplateFinal-shaped workbook with the given number of authors."""
+    import openpyxl
+
+    book = openpyxl.Workbook(write_only=True)
+    for sheet in ("Journal", "Article"):
+        rows = book.create_sheet(sheet)
+        rows.append(["Title", "Header row"])
+        for index in range(10):
+            rows.append([f"{sheet}_Field_{index}", f"value {index}" if index % 3 else None])
+
+    rows = book.create_sheet("Author(s)")
+    rows.append([None] + [f"Author {number}" for number in range(1, authors + 1)])
+    for attribute in AUTHOR_ATTRIBUTES:
+        # Leave some cells empty so the empty-tag path is exercised too
+        rows.append([attribute] + [None if number % 7 == 0 else f"{attribute} {number}"
+                                   for number in range(1, authors + 1)])
+    book.save(path)
+
+
+def convert_iterrows(path):
+    """The original V2.2 conversion: one iterrows pass per author column."""
+    import pandas as pd
+    from lxml import etree
+
+    xl = pd.ExcelFile(path)
+    journal_df = xl.parse("Journal")
+    article_df = xl.parse("Article")
+    author_df = xl.parse("Author(s)")
+    root = etree.Element("article")
+    journal_element = etree.SubElement(root, "journal")
+    for _, row in journal_df.iterrows():
+        sub_element = etree.SubElement(journal_element, row.iloc[0])
+        sub_element.text = str(row.iloc[1]) if pd.notna(row.iloc[1]) else " "
+    article_element = etree.SubElement(root, "article_info")
+    for _, row in article_df.iterrows():
+        sub_element = etree.SubElement(article_element, row.iloc[0])
+        sub_element.text = str(row.iloc[1]) if pd.notna(row.iloc[1]) else " "
+    authors_element = etree.SubElement(root, "author_list")
+    for col in author_df.columns[1:]:
+        author_element = etree.SubElement(authors_element, "author")
+        for index, row in author_df.iterrows():
+            attribute = author_df.iloc[index, 0]
+            sub_element = etree.SubElement(author_element, attribute)
+            sub_element.text = row[col] if pd.notna(row[col]) else " "
+    return etree.tostring(root, pretty_print=True, xml_declaration=True, encoding="UTF-8")
+
+
+def bench_authors(args):
+    from .converter import convert_workbook
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "authors.xlsx")
+        write_author_workbook(path, args.authors)
+
+        expected = convert_iterrows(path)
+        candidates = {
+            "iterrows (original)": lambda: convert_iterrows(path),
+            "pandas": lambda: convert_workbook(path, "pandas"),
+            "openpyxl": lambda: convert_workbook(path, "openpyxl"),
+        }
+        print(f"{args.authors} authors x {len(AUTHOR_ATTRIBUTES)} attributes")
+        failed = False
+        for name, func in candidates.items():
+            identical = func() == expected
+            failed = failed or not identical
+            seconds, peak = measure(func, args.repeat)
+            report(name, seconds, peak, "identical" if identical else "OUTPUT DIFFERS")
+    return 1 if failed else 0
+
+
+def build_form_tree(authors, abstract_words):
+    """Build a V1-shaped <journal> tree with long abstracts and many authors."""
+    import xml.etree.ElementTree as ET
+
+    root = ET.Element("journal")
+    for key in ("title", "title_fa", "short_title", "journal_id_issn", "volume", "number"):
+        ET.SubElement(root, key).text = f"{key} value"
+    ET.SubElement(root, "journal_id_pii").text = ""
+    article = ET.SubElement(root, "article")
+    ET.SubElement(article, "article_title").text = "A <long> & winding title"
+    ET.SubElement(article, "abstract").text = " ".join(["word"] * abstract_words)
+    ET.SubElement(article, "abstract_fa").text = " ".join(["واژه"] * abstract_words)
+    author_list = ET.SubElement(root, "author_list")
+    for number in range(authors):
+        author = ET.SubElement(author_list, "author")
+        for attribute in AUTHOR_ATTRIBUTES:
+            ET.SubElement(author, attribute.lower()).text = f"{attribute} {number}"
+    return root
+
+
+def bench_pretty(args):
+    from .pretty import PRETTY_METHODS, pretty_xml
+
+    print(f"{args.authors} authors, {args.abstract_words}-word abstracts")
+    for method in PRETTY_METHODS:
+        # pretty_xml indents in place, so every run gets a fresh tree
+        seconds, peak = measure(
+            lambda: pretty_xml(build_form_tree(args.authors, args.abstract_words), method),
+            args.repeat)
+        build_seconds, _ = measure(
+            lambda: build_form_tree(args.authors, args.abstract_words), args.repeat)
+        report(method, seconds - build_seconds, peak)
+
+
+def unnormalized_text(rng, count):
+    """count Persian words spelled the way submissions spell them: Arabic yeh
+    and kaf, Arabic-Indic digits, double spaces and stray ZWNJs."""
+    from .synthetic import words
+
+    text = words(rng, count, 1).replace("ی", "ي").replace("ک", "ك")
+    pieces = []
+    for word in text.split(" "):
+        roll = rng.random()
+        if roll < 0.05:
+            word += " \u200c"
+        elif roll < 0.1:
+            word = "".join(chr(0x0660 + int(digit)) for digit in str(rng.randrange(10 ** 4)))
+        pieces.append(word)
+    return "  ".join(pieces)
+
+
+def normalize_naive(text):
+    """Normalization the way it is usually first written: one translate per
+    character class and regexes compiled on every call."""
+    import re
+
+    text = text.translate(str.maketrans({"ي": "ی", "ى": "ی", "ك": "ک", "\ufeff": None}))
+    text = text.translate(str.maketrans({chr(0x0660 + digit): chr(0x06f0 + digit)
+                                         for digit in range(10)}))
+    text = re.sub(r"[\t\u00a0\u2000-\u200a\u202f\u205f\u3000]", " ", text)
+    text = re.sub(r"[ \u200c]*[ ][ \u200c]*", " ", text)
+    text = re.sub(r"\u200c{2,}", "\u200c", text)
+    return re.sub(r"(?m)^[ \u200c]+|[ \u200c]+$", "", text)
+
+
+def bench_persian(args):
+    import random
+
+    from .persian import normalize, normalize_column
+
+    rng = random.Random(args.seed)
+    shapes = {
+        f"{args.cells} abstracts of {args.abstract_words} words":
+            [unnormalized_text(rng, args.abstract_words) for _ in range(args.cells)],
+        f"{args.cells * 50} name cells":
+            [unnormalized_text(rng, 2) for _ in range(args.cells * 50)],
+    }
+    failed = False
+    for shape, cells in shapes.items():
+        print(shape)
+        expected = normalize_column(cells)
+        candidates = {
+            "naive, per cell": lambda: [normalize_naive(cell) or None for cell in cells],
+            "precompiled, per cell": lambda: [normalize(cell) or None for cell in cells],
+            "precompiled, column-wise": lambda: normalize_column(cells),
+        }
+        for name, func in candidates.items():
+            identical = func() == expected
+            failed = failed or not identical
+            seconds, peak = measure(func, args.repeat)
+            report(name, seconds, peak, "identical" if identical else "OUTPUT DIFFERS")
+    return 1 if failed else 0
+
+
+def bench_issue(args):
+    from .converter import convert_file
+    from .issues import convert_issue, pack_workbooks
+    from .synthetic import article_values, write_workbook
+
+    with tempfile.TemporaryDirectory() as directory:
+        # One issue: every article has the first one's journal fields
+        articles = [article_values(args.seed + number, authors=args.authors,
+                                   abstract_words=args.abstract_words)
+                    for number in range(args.articles)]
+        sources = [write_workbook(os.path.join(directory, f"article_{number:03d}.xlsx"),
+                                  articles[0][0], article, authors)
+                   for number, (_, article, authors) in enumerate(articles)]
+        issue = pack_workbooks(sources, os.path.join(directory, "issue.xlsx"))
+        workbooks_dir = os.path.join(directory, "workbooks")
+        issue_dir = os.path.join(directory, "issue")
+        os.makedirs(workbooks_dir)
+
+        def workbooks():
+            for source in sources:
+                convert_file(source, os.path.join(workbooks_dir, os.path.basename(source)[:-5]
+                                                  + ".xml"))
+
+        def issue_workbook():
+            convert_issue(issue, issue_dir)
+
+        workbooks()
+        issue_workbook()
+        identical = all(
+            open(os.path.join(workbooks_dir, name), "rb").read()
+            == open(os.path.join(issue_dir, name), "rb").read()
+            for name in os.listdir(workbooks_dir))
+        print(f"{args.articles} articles of {args.authors} authors")
+        for name, func in (("one workbook per article", workbooks),
+                           ("issue workbook", issue_workbook)):
+            seconds, peak = measure(func, args.repeat)
+            report(name, seconds, peak, "" if identical else "OUTPUT DIFFERS")
+    return 0 if identical else 1
+
+
+def _run_case(path, scale, persian, seed, repeat, directory):
+    """Time one end-to-end path on one scale; runs in a fresh process."""
+    from .profiling import _peak_rss_kib
+
+    sizes = dict(SCALES[scale])
+    count = sizes.pop("workbooks")
+    output_dir = os.path.join(directory, f"{path}-{scale}")
+    os.makedirs(output_dir, exist_ok=True)
+    if path == "v2.2":
+        from .converter import convert_file
+
+        sources = sorted(os.path.join(directory, scale, name)
+                         for name in os.listdir(os.path.join(directory, scale)))
+        jobs = [(source, os.path.join(output_dir, os.path.basename(source)[:-5] + ".xml"))
+                for source in sources]
+
+        def run():
+            for source, output in jobs:
+                result = convert_file(source, output)
+                if not result.ok:
+                    raise RuntimeError(result.error)
+    else:
+        from .model import save_form
+        from .synthetic import make_forms
+
+        forms = make_forms(count, seed, persian=persian, **sizes)
+        outputs = [os.path.join(output_dir, f"article_{number:05d}.xml")
+                   for number in range(count)]
+
+        def run():
+            for form, output in zip(forms, outputs):
+                save_form(form, output)
+
+    run()  # Warm up imports and the file system
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        best = min(best, time.perf_counter() - start)
+    written = sum(os.path.getsize(os.path.join(output_dir, name))
+                  for name in os.listdir(output_dir))
+    return {"seconds": round(best, 4), "files": count,
+            "files_per_s": round(count / best, 2),
+            "mib_per_s": round(written / best / (1024 * 1024), 3),
+            "peak_rss_kib": _peak_rss_kib()}
+
+
+def compare(results, baseline, tolerance, rss_tolerance):
+    """Return a list of regression messages, empty if none."""
+    regressions = []
+    for case, result in results.items():
+        base = baseline.get(case)
+        if base is None:
+            continue
+        if result["files_per_s"] < base["files_per_s"] / (1 + tolerance):
+            regressions.append(f"{case}: {result['files_per_s']} files/s, baseline "
+                               f"{base['files_per_s']} (more than {tolerance:.0%} slower)")
+        if (result["peak_rss_kib"] and base.get("peak_rss_kib")
+                and result["peak_rss_kib"] > base["peak_rss_kib"] * (1 + rss_tolerance)):
+            regressions.append(f"{case}: peak RSS {result['peak_rss_kib']} KiB, baseline "
+                               f"{base['peak_rss_kib']} KiB (more than {rss_tolerance:.0%} "
+                               f"larger)")
+    return regressions
+
+
+def bench_suite(args):
+    from .synthetic import write_workbooks
+
+    scales = args.scales.split(",")
+    unknown = set(scales).difference(SCALES)
+    if unknown:
+        print(f"Unknown scale(s): {', '.join(sorted(unknown))}", file=sys.stderr)
+        return 2
+
+    results = {}
+    spawn = multiprocessing.get_context("spawn")
+    print(f"{'case':<16} {'files/s':>10} {'MiB/s':>8} {'peak RSS':>12}")
+    with tempfile.TemporaryDirectory() as directory:
+        for scale in scales:
+            sizes = dict(SCALES[scale])
+            count = sizes.pop("workbooks")
+            write_workbooks(os.path.join(directory, scale), count, args.seed,
+                            persian=args.persian, **sizes)
+            for path in PATHS:
+                with ProcessPoolExecutor(max_workers=1, mp_context=spawn) as executor:
+                    result = executor.submit(_run_case, path, scale, args.persian, args.seed,
+                                             args.repeat, directory).result()
+                case = f"{path}/{scale}"
+                results[case] = result
+                print(f"{case:<16} {result['files_per_s']:10.2f} {result['mib_per_s']:8.2f} "
+                      f"{result['peak_rss_kib'] or 0:>8} KiB")
+
+    if args.save_baseline:
+        stored = {}
+        if os.path.exists(args.baseline):
+            with open(args.baseline, encoding="utf-8") as file:
+                stored = json.load(file)
+        stored.update(results)
+        os.makedirs(os.path.dirname(os.path.abspath(args.baseline)), exist_ok=True)
+        with open(args.baseline, "w", encoding="utf-8") as file:
+            json.dump(stored, file, indent=2, sort_keys=True)
+            file.write("\n")
+        print(f"Baseline saved to {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"No baseline at {args.baseline}; record one with --save-baseline")
+        return 0
+    with open(args.baseline, encoding="utf-8") as file:
+        baseline = json.load(file)
+    regressions = compare(results, baseline, args.tolerance, args.rss_tolerance)
+    for message in regressions:
+        print(f"REGRESSION {message}", file=sys.stderr)
+    if not regressions:
+        print(f"No regressions against {args.baseline}")
+    return 1 if regressions else 0
+
+
+def bench_generate(args):
+    from .synthetic import write_workbooks
+
+    paths = write_workbooks(args.directory, args.workbooks, args.seed, authors=args.authors,
+                            abstract_words=args.abstract_words, persian=args.persian)
+    print(f"Wrote {len(paths)} workbooks to {args.directory}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m xmlgen.bench")
+    benches = parser.add_subparsers(dest="bench", required=True)
+
+    readers = benches.add_parser("readers", help="compare the workbook reader backends")
+    readers.add_argument("workbooks", nargs="*")
+    readers.add_argument("--repeat", type=int, default=20)
+    readers.set_defaults(func=bench_readers)
+
+    authors = benches.add_parser("authors", help="time the author block on a wide sheet")
+    authors.add_argument("--authors", type=int, default=500)
+    authors.add_argument("--repeat", type=int, default=3)
+    authors.set_defaults(func=bench_authors)
+
+    pretty = benches.add_parser("pretty", help="compare the form app's pretty-printers")
+    pretty.add_argument("--authors", type=int, default=200)
+    pretty.add_argument("--abstract-words", type=int, default=5000)
+    pretty.add_argument("--repeat", type=int, default=5)
+    pretty.set_defaults(func=bench_pretty)
+
+    persian = benches.add_parser("persian", help="time Persian normalization per cell and "
+                                                 "column-wise")
+    persian.add_argument("--cells", type=int, default=200)
+    persian.add_argument("--abstract-words", type=int, default=5000)
+    persian.add_argument("--seed", type=int, default=0)
+    persian.add_argument("--repeat", type=int, default=5)
+    persian.set_defaults(func=bench_persian)
+
+    issue = benches.add_parser("issue", help="compare one workbook per article with one "
+                                             "issue workbook")
+    issue.add_argument("--articles", type=int, default=40)
+    issue.add_argument("--authors", type=int, default=5)
+    issue.add_argument("--abstract-words", type=int, default=250)
+    issue.add_argument("--seed", type=int, default=0)
+    issue.add_argument("--repeat", type=int, default=5)
+    issue.set_defaults(func=bench_issue)
+
+    suite = benches.add_parser("suite", help="time the V1 and V2.2 paths against a baseline")
+    suite.add_argument("--scales", default=",".join(SCALES),
+                       help="comma-separated scales to run (default: %(default)s)")
+    suite.add_argument("--persian", type=float, default=0.5,
+                       help="share of Persian words in free text (default: %(default)s)")
+    suite.add_argument("--seed", type=int, default=0)
+    suite.add_argument("--repeat", type=int, default=5)
+    suite.add_argument("--baseline", default=BASELINE,
+                       help="baseline file (default: benchmarks/baseline.json)")
+    suite.add_argument("--save-baseline", action="store_true",
+                       help="record this run as the baseline instead of comparing")
+    suite.add_argument("--tolerance", type=float, default=0.25,
+                       help="allowed throughput loss as a fraction (default: %(default)s)")
+    suite.add_argument("--rss-tolerance", type=float, default=0.25,
+                       help="allowed peak RSS growth as a fraction (default: %(default)s)")
+    suite.set_defaults(func=bench_suite)
+
+    generate = benches.add_parser("generate", help="write synthetic TemplateFinal-style workbooks")
+    generate.add_argument("directory")
+    generate.add_argument("--workbooks", type=int, default=100)
+    generate.add_argument("--authors", type=int, default=5)
+    generate.add_argument("--abstract-words", type=int, default=250)
+    generate.add_argument("--persian", type=float, default=0.5)
+    generate.add_argument("--seed", type=int, default=0)
+    generate.set_defaults(func=bench_generate)
+
+    args = parser.parse_args(argv)
+    return args.func(args) or 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,221 @@
+"""Write many XML documents into one zip or tar archive.
+
+On network shares and slow disks, creating tens of thousands of small
+files costs far more than converting them. An ArchiveWriter streams the
+documents into a single archive instead, through one large write buffer:
+
+    with ArchiveWriter("issue.zip", manifest=True) as archive:
+        archive.add("article_00001.xml", xml)
+
+Member names are derived from the workbook name (write_archive) or the
+article title (write_forms), made safe for any file system, and numbered
+``-2``, ``-3``, ... on collisions in the order documents are added.
+Timestamps and permissions are fixed, so the same documents give a
+byte-identical archive. With manifest=True a ``manifest.json`` listing
+every member's source, size and SHA-256 is added last.
+
+The archive is written to a temporary file and moved into place when
+closed, like write_output does for single files.
+"""
+
+import gzip
+import hashlib
+import io
+import json
+import lzma
+import os
+import re
+import tarfile
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+
+from .converter import ConversionResult, convert_workbook
+from .model import default_file_name, form_xml
+from .pool import bounded_map
+from .pretty import DEFAULT_PRETTY_METHOD
+from .readers import DEFAULT_BACKEND
+
+# Archive suffix -> (kind, compression)
+FORMATS = {
+    ".zip": ("zip", "deflate"),
+    ".tar": ("tar", None),
+    ".tar.gz": ("tar", "gz"),
+    ".tgz": ("tar", "gz"),
+    ".tar.xz": ("tar", "xz"),
+}
+MANIFEST_NAME = "manifest.json"
+# Bytes collected before anything reaches the disk
+BUFFER_SIZE = 4 * 1024 * 1024
+# Longest member file name, extension included
+MAX_NAME = 120
+# Every member gets the same time stamp, for reproducible archives
+ZIP_DATE_TIME = (1980, 1, 1, 0, 0, 0)
+
+
+def archive_format(path):
+    """(kind, compression) for an archive path, by its suffix; ValueError if unknown."""
+    lower = path.lower()
+    for suffix in sorted(FORMATS, key=len, reverse=True):
+        if lower.endswith(suffix):
+            return FORMATS[suffix]
+    raise ValueError(f"{path}: archives must end in one of {', '.join(FORMATS)}")
+
+
+def _safe_part(part):
+    stem, extension = os.path.splitext(part)
+    stem = re.sub(r"[^\w.-]+", "_", stem).strip("._") or "untitled"
+    return stem[:MAX_NAME - len(extension)] + extension
+
+
+def member_name(name, extension=".xml"):
+    """A safe, relative member path for name (a title or a relative path)."""
+    parts = [part for part in re.split(r"[\\/]+", name) if part not in ("", ".", "..")]
+    if not parts:
+        parts = ["untitled"]
+    if not parts[-1].lower().endswith(extension):
+        parts[-1] += extension
+    return "/".join(_safe_part(part) for part in parts)
+
+
+class ArchiveWriter:
+    """Add documents to a zip or tar archive; use as a context manager."""
+
+    def __init__(self, path, manifest=False, compresslevel=None):
+        self.path = path
+        self.kind, self.compression = archive_format(path)
+        self.manifest = [] if manifest else None
+        self.compresslevel = compresslevel
+        self.count = 0
+        self._names = set()  # casefolded, so the archive also extracts on Windows
+        self._temp_path = None
+        self._file = None
+        self._stream = None  # The compressor between a tar archive and the file
+        self._archive = None
+
+    def __enter__(self):
+        directory, name = os.path.split(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._temp_path = os.path.join(directory, f".{name}.{os.getpid()}.tmp")
+        self._file = open(self._temp_path, "wb", buffering=BUFFER_SIZE)
+        if self.kind == "zip":
+            self._archive = zipfile.ZipFile(self._file, "w", zipfile.ZIP_DEFLATED)
+            return self
+        # tarfile's own gzip header would carry the current time and file name
+        if self.compression == "gz":
+            self._stream = gzip.GzipFile("", "wb", 6 if self.compresslevel is None
+                                         else self.compresslevel, self._file, mtime=0)
+        elif self.compression == "xz":
+            self._stream = lzma.LZMAFile(self._file, "wb", preset=self.compresslevel)
+        self._archive = tarfile.open(fileobj=self._stream or self._file, mode="w",
+                                     format=tarfile.PAX_FORMAT)
+        return self
+
+    def __exit__(self, exc_type, *exc_info):
+        try:
+            if exc_type is None and self.manifest is not None:
+                data = json.dumps({"algorithm": "sha256", "members": self.manifest},
+                                  ensure_ascii=False, indent=2).encode("utf-8")
+                self._write(MANIFEST_NAME, data)
+            self._archive.close()
+            if self._stream is not None:
+                self._stream.close()
+            self._file.close()
+            if exc_type is None:
+                os.replace(self._temp_path, self.path)
+        finally:
+            self._file.close()
+            if os.path.exists(self._temp_path):
+                os.unlink(self._temp_path)
+
+    def _unique(self, name):
+        stem, extension = os.path.splitext(name)
+        candidate, number = name, 1
+        while candidate.casefold() in self._names or candidate == MANIFEST_NAME:
+            number += 1
+            candidate = f"{stem}-{number}{extension}"
+        self._names.add(candidate.casefold())
+        return candidate
+
+    def _write(self, name, data):
+        if self.kind == "zip":
+            info = zipfile.ZipInfo(name, ZIP_DATE_TIME)
+            info.compress_type = zipfile.ZIP_DEFLATED
+            info.external_attr = 0o644 << 16
+            self._archive.writestr(info, data, compresslevel=self.compresslevel)
+        else:
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            info.mode = 0o644
+            info.mtime = 0
+            self._archive.addfile(info, io.BytesIO(data))
+
+    def add(self, name, data, source=None):
+        """Add data (bytes) as a member named after name; returns the member name."""
+        name = self._unique(member_name(name))
+        self._write(name, data)
+        if self.manifest is not None:
+            self.manifest.append({"name": name, "source": source, "bytes": len(data),
+                                  "sha256": hashlib.sha256(data).hexdigest()})
+        self.count += 1
+        return name
+
+
+def _xml_job(args):
+    source, name, backend, plan, journal_rows, normalize_fa, schema, complete_dates = args
+    start = time.perf_counter()
+    try:
+        xml = convert_workbook(source, backend, plan, journal_rows=journal_rows,
+                               normalize_fa=normalize_fa, schema=schema,
+                               complete_dates=complete_dates)
+        error = None
+    except Exception as e:
+        xml, error = None, f"{type(e).__name__}: {e}"
+    return source, name, xml, error, time.perf_counter() - start
+
+
+def write_archive(jobs, output, workers=None, backend=DEFAULT_BACKEND, plan=None,
+                  journal_rows=None, manifest=False, normalize_fa=False, schema=None,
+                  complete_dates=False):
+    """Convert (workbook, name) jobs into one archive at output.
+
+    name is the member's path inside the archive, e.g. the workbook's path
+    relative to the input folder (see collect_jobs). Workbooks are converted
+    on a process pool (workers=1 converts them in this process) and added
+    in job order; failures are left out and reported in the returned list
+    of ConversionResult, one per job.
+    """
+    work = ((source, name, backend, plan, journal_rows, normalize_fa, schema, complete_dates)
+            for source, name in jobs)
+    results = []
+    with ArchiveWriter(output, manifest) as archive:
+        if workers == 1:
+            converted = map(_xml_job, work)
+            executor = None
+        else:
+            executor = ProcessPoolExecutor(max_workers=workers)
+            window = (workers or os.cpu_count() or 1) * 2
+            converted = bounded_map(executor, _xml_job, work, window)
+        try:
+            for source, name, xml, error, seconds in converted:
+                if error is None:
+                    archive.add(name, xml, source)
+                results.append(ConversionResult(source, output, error is None, error, seconds))
+        finally:
+            if executor is not None:
+                executor.shutdown()
+    return results
+
+
+def write_forms(forms, output, method=DEFAULT_PRETTY_METHOD, manifest=False):
+    """Write the form app's XML for each ArticleForm into one archive.
+
+    Members are named after the article titles, as the form app names its
+    files. Returns the member names in form order.
+    """
+    with ArchiveWriter(output, manifest) as archive:
+        # A slash in a title is not a folder
+        return [archive.add(re.sub(r"[\\/]", "_", default_file_name(form)),
+                            form_xml(form, method).encode("utf-8"))
+                for form in forms]
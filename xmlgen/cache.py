@@ -0,0 +1,149 @@
+"""Persistent cache of generated XML, keyed by workbook content.
+
+The key is a SHA-256 of the workbook bytes together with CONVERTER_VERSION
+and the reader backend, so an unchanged workbook converts to a cache hit
+and any change to the workbook or the converter misses.
+
+Cached documents are stored as immutable ``<key>.xml`` blobs, which worker
+processes read and write directly. The LRU order, the size bound and the
+hit/miss counters live in ``index.json`` and are only updated by the
+process that owns the OutputCache, once a batch has finished.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+
+# Bump whenever the XML produced for an unchanged workbook changes
+CONVERTER_VERSION = "5"
+
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+INDEX_NAME = "index.json"
+
+
+def cache_key(source, *salt):
+    """Hash the workbook at source together with the converter version and salt."""
+    digest = hashlib.sha256()
+    for part in (CONVERTER_VERSION,) + salt:
+        digest.update(str(part).encode("utf-8") + b"\0")
+    with open(source, "rb") as file:
+        for chunk in iter(lambda: file.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _blob_path(directory, key):
+    return os.path.join(directory, key[:2], key + ".xml")
+
+
+def read_blob(directory, key):
+    """Return the cached document for key, or None."""
+    try:
+        with open(_blob_path(directory, key), "rb") as file:
+            return file.read()
+    except FileNotFoundError:
+        return None
+
+
+def write_blob(directory, key, data):
+    """Store data under key; safe to call from several processes at once."""
+    path = _blob_path(directory, key)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    handle, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    try:
+        with os.fdopen(handle, "wb") as file:
+            file.write(data)
+        os.replace(temp_path, path)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+
+
+class OutputCache:
+    """Size-bounded LRU index over the blobs in directory."""
+
+    def __init__(self, directory, max_bytes=DEFAULT_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.entries = {}  # key -> size, least recently used first
+        self.hits = 0
+        self.misses = 0
+        self._load()
+
+    def _load(self):
+        try:
+            with open(os.path.join(self.directory, INDEX_NAME), encoding="utf-8") as file:
+                index = json.load(file)
+        except FileNotFoundError:
+            return
+        self.entries = {key: size for key, size in index.get("entries", [])}
+        self.hits = index.get("hits", 0)
+        self.misses = index.get("misses", 0)
+
+    def save(self):
+        os.makedirs(self.directory, exist_ok=True)
+        index = {"hits": self.hits, "misses": self.misses,
+                 "entries": [[key, size] for key, size in self.entries.items()]}
+        handle, temp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        with os.fdopen(handle, "w", encoding="utf-8") as file:
+            json.dump(index, file)
+        os.replace(temp_path, os.path.join(self.directory, INDEX_NAME))
+
+    @property
+    def size(self):
+        return sum(self.entries.values())
+
+    def get(self, key):
+        data = read_blob(self.directory, key)
+        self.record(key, data is not None, len(data) if data is not None else 0)
+        return data
+
+    def put(self, key, data):
+        write_blob(self.directory, key, data)
+        self.record(key, False, len(data), count=False)
+
+    def record(self, key, hit, size, count=True):
+        """Note a lookup of key (made here or by a worker) and enforce the size bound."""
+        if count:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+        if size:
+            self.entries.pop(key, None)
+            self.entries[key] = size  # Most recently used goes last
+            self.evict()
+
+    def evict(self):
+        total = self.size
+        while total > self.max_bytes and self.entries:
+            key = next(iter(self.entries))
+            total -= self.entries.pop(key)
+            self._remove_blob(key)
+
+    def invalidate(self, keys=None):
+        """Drop the given keys, or every entry when keys is None. Returns the count."""
+        if keys is None:
+            keys = list(self.entries)
+            # Also sweep blobs a crashed run wrote but never indexed
+            for dirpath, _, filenames in os.walk(self.directory):
+                keys.extend(name[:-4] for name in filenames if name.endswith(".xml"))
+        removed = 0
+        for key in set(keys):
+            self.entries.pop(key, None)
+            removed += self._remove_blob(key)
+        return removed
+
+    def _remove_blob(self, key):
+        try:
+            os.remove(_blob_path(self.directory, key))
+        except FileNotFoundError:
+            return 0
+        return 1
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {"entries": len(self.entries), "bytes": self.size, "max_bytes": self.max_bytes,
+                "hits": self.hits, "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else None}
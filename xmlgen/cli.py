@@ -0,0 +1,559 @@
+"""Command line entry point: ``python -m xmlgen convert archive/ -o xml/``."""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+
+from .authors import AuthorRegistry, load_registry
+from .bundle import archive_format, write_archive
+from .cache import DEFAULT_MAX_BYTES, OutputCache, cache_key
+from .converter import ConversionResult, _cache_salt, collect_jobs, convert_many
+from .importer import FormDocument, import_archive, iter_documents
+from .issues import IssueWorkbookError, convert_issue, pack_workbooks
+from .readers import BACKENDS, DEFAULT_BACKEND, StreamingWorkbook
+from .service import (DEFAULT_HOST, DEFAULT_PORT, DEFAULT_QUEUE_PER_WORKER, ConversionService,
+                      serve)
+from .journals import DEFAULT_PROFILES, journal_rows, load_store
+from .profiling import ProfileOptions
+from .schema import SchemaError, bundled_schemas, load_schema
+from .template import DEFAULT_TEMPLATE, TemplateError, load_plan
+from .validate import describe, validate_workbooks
+from .watch import DEFAULT_INTERVAL, DEFAULT_SETTLE, Watcher, run_watcher
+from .writer import write_issue
+
+
+def cmd_convert(args):
+    jobs = collect_jobs(args.inputs, args.output_dir, recursive=not args.no_recursive)
+    if not jobs:
+        print("No .xlsx workbooks found.", file=sys.stderr)
+        return 1
+
+    cache = OutputCache(args.cache, args.cache_size * 1024 * 1024) if args.cache else None
+    plan = _load_plan(args.template, args.cache)
+    journal = _journal_rows(args)
+    start = time.perf_counter()
+    rejected, invalid, report = [], set(), None
+    if args.validate:
+        # Every workbook is checked before any XML is written
+        report = validate_workbooks([source for source, _ in jobs], workers=args.workers,
+                                    backend=args.backend, plan=plan, journal_rows=journal,
+                                    fail_fast=args.validate == "fail-fast")
+        _report_validation(report, args.validation_report)
+        if args.validate == "fail-fast" and not report.ok:
+            return 1
+        invalid = set(report.invalid_sources())
+        rejected = [ConversionResult(source, args.issue or args.archive or target, False,
+                                     "failed validation", 0.0)
+                    for source, target in jobs if source in invalid]
+        jobs = [job for job in jobs if job[0] not in invalid]
+    if args.archive:
+        # Members are named like the XML files convert -o would write
+        members = [(source, os.path.relpath(output))
+                   for source, output in collect_jobs(args.inputs, os.curdir,
+                                                      recursive=not args.no_recursive)
+                   if source not in invalid]
+        results = write_archive(members, args.archive, workers=args.workers,
+                                backend=args.backend, plan=plan, journal_rows=journal,
+                                manifest=args.manifest, normalize_fa=args.normalize_fa,
+                                schema=args.schema, complete_dates=args.complete_dates)
+    elif args.issue:
+        results = write_issue([source for source, _ in jobs], args.issue,
+                              workers=args.workers, backend=args.backend, plan=plan,
+                              journal_rows=journal, normalize_fa=args.normalize_fa,
+                              complete_dates=args.complete_dates)
+    else:
+        results = convert_many(jobs, workers=args.workers, backend=args.backend, cache=cache,
+                               plan=plan, profile=_profile_options(args), journal_rows=journal,
+                               normalize_fa=args.normalize_fa, schema=args.schema,
+                               incremental=args.incremental, complete_dates=args.complete_dates)
+    results = rejected + results
+    elapsed = time.perf_counter() - start
+    failed = [result for result in results if not result.ok]
+
+    if args.json:
+        summary = {
+            "converted": len(results) - len(failed),
+            "failed": len(failed),
+            "seconds": round(elapsed, 3),
+            "files": [result._asdict() for result in results],
+        }
+        if cache:
+            summary["cache"] = cache.stats()
+        if report is not None:
+            summary["validation"] = report.to_dict()
+        json.dump(summary, sys.stdout, ensure_ascii=False, indent=2)
+        print()
+    else:
+        for result in results:
+            if result.ok:
+                status = "CACHED" if result.cached else "SAME" if result.unchanged else "OK"
+                print(f"{status:<8}{result.source} -> {result.output}")
+            else:
+                print(f"FAILED  {result.source}: {result.error}")
+        print(f"Converted {len(results) - len(failed)} of {len(results)} workbooks "
+              f"({len(failed)} failed) in {elapsed:.2f}s")
+        if cache:
+            print(f"Cache: {sum(result.cached for result in results)} served from cache, "
+                  f"{cache.hits} hits / {cache.misses} misses overall")
+    return 1 if failed else 0
+
+
+def _report_validation(report, path):
+    """Write the report as JSON to path, if given, and list its problems on stderr."""
+    if path:
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump(report.to_dict(), file, ensure_ascii=False, indent=2, default=str)
+            file.write("\n")
+    for problem in report.problems:
+        print(f"INVALID {problem.source}: {describe(problem)}", file=sys.stderr)
+    if report.stopped:
+        print(f"Stopped at the first invalid workbook ({len(report.checked)} checked); "
+              f"nothing was written.", file=sys.stderr)
+
+
+def _journal_rows(args):
+    if not args.journal:
+        return None
+    try:
+        store = load_store(args.journals)
+    except (OSError, ValueError) as e:  # Includes JournalStoreError and bad JSON
+        sys.exit(f"Cannot load journal profiles: {e}")
+    found = store.find(args.journal)
+    if found is None:
+        sys.exit(f"No journal profile for {args.journal!r} in {store.source} "
+                 f"(known: {', '.join(label for label, _ in store)})")
+    return journal_rows(found[1])
+
+
+def _add_journal_arguments(parser):
+    parser.add_argument("--journal", metavar="KEY",
+                        help="take the journal fields from this profile (ISSN, online ISSN, "
+                             "short title or label) instead of each workbook's Journal sheet")
+    parser.add_argument("--journals", metavar="FILE", default=DEFAULT_PROFILES,
+                        help="journal profile file (default: journals.json)")
+
+
+def _add_normalize_argument(parser):
+    parser.add_argument("--normalize-fa", action="store_true",
+                        help="normalize the Persian (_FA) fields: Persian yeh and kaf, "
+                             "Persian digits, single spaces and ZWNJs")
+
+
+def _add_dates_argument(parser):
+    parser.add_argument("--complete-dates", action="store_true",
+                        help="check the Pub_Date_Jalali and Pub_Date_Gregorian rows of the "
+                             "Article sheet and fill in the missing calendar")
+
+
+def _add_incremental_argument(parser):
+    parser.add_argument("--incremental", action="store_true",
+                        help="rebuild only the sections of existing XML files whose rows "
+                             "changed, and leave unchanged files alone")
+
+
+def _profile_options(args):
+    if not (args.timings or args.profile or args.trace_memory):
+        return None
+    return ProfileOptions(args.timings, args.profile, args.trace_memory)
+
+
+def _add_profile_arguments(parser):
+    parser.add_argument("--timings", metavar="FILE",
+                        help="append per-stage wall/CPU time and peak memory of every "
+                             "conversion to this JSON-lines file")
+    parser.add_argument("--profile", metavar="DIR",
+                        help="also write a cProfile dump per conversion into DIR")
+    parser.add_argument("--trace-memory", action="store_true",
+                        help="measure per-stage peak memory with tracemalloc (slower)")
+
+
+def _load_plan(template, cache_dir=None):
+    if not template:
+        return None
+    try:
+        return load_plan(template, cache_dir)
+    except TemplateError as e:
+        sys.exit(str(e))
+
+
+def cmd_watch(args):
+    cache = OutputCache(args.cache, args.cache_size * 1024 * 1024) if args.cache else None
+    watcher = Watcher(args.input_dir, args.output_dir, workers=args.workers,
+                      settle=args.settle, interval=args.interval, backend=args.backend,
+                      plan=_load_plan(args.template, args.cache), cache=cache,
+                      stats_file=args.stats, recursive=not args.no_recursive,
+                      use_events=not args.poll, profile=_profile_options(args),
+                      journal_rows=_journal_rows(args), normalize_fa=args.normalize_fa,
+                      incremental=args.incremental, complete_dates=args.complete_dates)
+    return run_watcher(watcher)
+
+
+def cmd_issue(args):
+    start = time.perf_counter()
+    results = convert_issue(args.workbook, args.output_dir, args.combined,
+                            journal_rows=_journal_rows(args), normalize_fa=args.normalize_fa,
+                            schema=args.schema, incremental=args.incremental,
+                            validate=args.validate, complete_dates=args.complete_dates)
+    elapsed = time.perf_counter() - start
+    failed = [result for result in results if not result.ok]
+    if args.json:
+        json.dump({"converted": len(results) - len(failed), "failed": len(failed),
+                   "seconds": round(elapsed, 3),
+                   "files": [result._asdict() for result in results]},
+                  sys.stdout, ensure_ascii=False, indent=2)
+        print()
+    else:
+        for result in results:
+            if result.ok:
+                status = "SAME" if result.unchanged else "OK"
+                print(f"{status:<8}{result.source} -> {result.output}")
+            else:
+                print(f"FAILED  {result.source}: {result.error}")
+        print(f"Converted {len(results) - len(failed)} of {len(results)} articles "
+              f"({len(failed)} failed) in {elapsed:.2f}s")
+    return 1 if failed else 0
+
+
+def cmd_pack(args):
+    output = os.path.abspath(args.output)
+    # Articles are named like the XML files convert -o would write
+    jobs = [(source, os.path.splitext(os.path.relpath(xml_path))[0].replace(os.sep, "/"))
+            for source, xml_path in collect_jobs(args.inputs, os.curdir,
+                                                 recursive=not args.no_recursive)
+            if os.path.abspath(source) != output]
+    if not jobs:
+        print("No .xlsx workbooks found.", file=sys.stderr)
+        return 1
+    try:
+        pack_workbooks([source for source, _ in jobs], args.output,
+                       [article_id for _, article_id in jobs], backend=args.backend)
+    except IssueWorkbookError as e:
+        sys.exit(str(e))
+    print(f"Packed {len(jobs)} workbooks into {args.output}")
+    return 0
+
+
+def cmd_import(args):
+    start = time.perf_counter()
+    paths = import_archive(args.source, args.output_dir, args.format)
+    print(f"Wrote {len(paths)} {'form JSON files' if args.format == 'json' else 'workbooks'} "
+          f"to {args.output_dir} in {time.perf_counter() - start:.2f}s")
+    return 0 if paths else 1
+
+
+def _conflict_dict(conflict):
+    return {"key": conflict.key, "field": conflict.field,
+            "values": {value: sorted(map(str, sources))
+                       for value, sources in conflict.values.items()}}
+
+
+def cmd_authors(args):
+    registry = load_registry(args.registry) if args.registry else AuthorRegistry()
+    xml_files = [path for path in args.inputs if path.lower().endswith(".xml")]
+    workbooks = [source for source, _ in
+                 collect_jobs([path for path in args.inputs if path not in xml_files])]
+    failed = 0
+    for path in workbooks:
+        try:
+            with StreamingWorkbook(path) as book:
+                registry.add_table(book.author_table(), path)
+        except Exception as e:
+            failed += 1
+            print(f"FAILED  {path}: {type(e).__name__}: {e}", file=sys.stderr)
+    for path in xml_files:
+        try:
+            for document in iter_documents(path):
+                if isinstance(document, FormDocument):
+                    registry.add_form(document.form, path)
+                else:
+                    registry.add_table(document.authors, path)
+        except Exception as e:
+            failed += 1
+            print(f"FAILED  {path}: {type(e).__name__}: {e}", file=sys.stderr)
+    if args.registry:
+        registry.save(args.registry)
+
+    conflicts = registry.conflicts()
+    if args.json:
+        json.dump({"stats": registry.stats(), "failed": failed,
+                   "conflicts": [_conflict_dict(conflict) for conflict in conflicts]},
+                  sys.stdout, ensure_ascii=False, indent=2)
+        print()
+    else:
+        for conflict in conflicts:
+            print(f"CONFLICT {conflict.key} {conflict.field}:")
+            for value, sources in conflict.values.items():
+                print(f"    {value!r} in {', '.join(sorted(map(str, sources)))}")
+        stats = registry.stats()
+        print(f"{stats['records']} author records, {stats['distinct']} distinct authors "
+              f"({stats['orcids']} ORCIDs, {stats['emails']} emails), "
+              f"{len(conflicts)} conflicts, {failed} files failed")
+    return 1 if conflicts or failed else 0
+
+
+def cmd_serve(args):
+    try:
+        store = load_store(args.journals)
+    except FileNotFoundError:
+        store = None  # ?journal= then answers 400
+    except (OSError, ValueError) as e:
+        sys.exit(f"Cannot load journal profiles: {e}")
+    service = ConversionService(args.host, args.port, workers=args.workers, queue=args.queue,
+                                backend=args.backend, plan=_load_plan(args.template),
+                                journals=store, normalize_fa=args.normalize_fa,
+                                complete_dates=args.complete_dates)
+    try:
+        return asyncio.run(serve(service))
+    except KeyboardInterrupt:  # No signal handlers on Windows
+        return 0
+
+
+def cmd_cache(args):
+    cache = OutputCache(args.directory)
+    if args.action == "invalidate":
+        if args.workbooks:
+            # A workbook may be cached once per reader backend, per template, per
+            # journal profile, with and without Persian normalization, per
+            # output layout and with and without completed dates
+            plan = _load_plan(args.template, args.directory)
+            journals = [None] + ([_journal_rows(args)] if args.journal else [])
+            schemas = [None] + bundled_schemas() + ([args.schema] if args.schema else [])
+            variants = [(journal, normalize_fa, schema, complete_dates) for journal in journals
+                        for normalize_fa in (False, True) for schema in schemas
+                        for complete_dates in (False, True)]
+            salts = [_cache_salt(backend, None, *variant)
+                     for backend in BACKENDS for variant in variants]
+            if plan is not None:
+                salts.extend(_cache_salt(None, plan, *variant) for variant in variants)
+            keys = [cache_key(path, *salt) for path in args.workbooks for salt in salts]
+        else:
+            keys = None
+        removed = cache.invalidate(keys)
+        cache.save()
+        print(f"Removed {removed} cached document(s)")
+    else:
+        json.dump(cache.stats(), sys.stdout, indent=2)
+        print()
+    return 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="xmlgen", description="Excel to XML converter")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    convert = commands.add_parser("convert", help="convert workbooks to XML")
+    convert.add_argument("inputs", nargs="+", help="workbooks or directories of workbooks")
+    convert.add_argument("-o", "--output-dir",
+                         help="write XML here instead of next to each workbook")
+    convert.add_argument("--issue", metavar="FILE",
+                         help="write all articles into this single <issue> document")
+    convert.add_argument("--archive", metavar="FILE",
+                         help="write the XML files into this .zip, .tar, .tar.gz or .tar.xz "
+                              "archive instead of the file system")
+    convert.add_argument("--manifest", action="store_true",
+                         help="add manifest.json with every member's source and SHA-256 "
+                              "to the archive")
+    convert.add_argument("-j", "--workers", type=int, default=None,
+                         help="number of worker processes (default: one per core)")
+    convert.add_argument("--backend", choices=BACKENDS, default=DEFAULT_BACKEND,
+                         help="workbook reader (default: %(default)s)")
+    convert.add_argument("--template", nargs="?", const=DEFAULT_TEMPLATE, metavar="XLSX",
+                         help="convert with the layout compiled from this template and reject "
+                              "workbooks that differ (default: Version 2/TemplateFinal.xlsx)")
+    convert.add_argument("--no-recursive", action="store_true",
+                         help="do not descend into subdirectories")
+    convert.add_argument("--json", action="store_true",
+                         help="print the summary as JSON")
+    convert.add_argument("--cache", metavar="DIR",
+                         help="reuse the XML of unchanged workbooks from this cache directory")
+    convert.add_argument("--cache-size", metavar="MB", type=int,
+                         default=DEFAULT_MAX_BYTES // (1024 * 1024),
+                         help="evict least recently used documents above this size "
+                              "(default: %(default)s)")
+    convert.add_argument("--schema", metavar="NAME|FILE",
+                         help="write this output layout: a bundled schema (v1, v2) or a schema "
+                              "file (default: v2, see xmlgen.schema)")
+    convert.add_argument("--validate", choices=("continue", "fail-fast"),
+                         help="check ISSNs, DOIs, ORCIDs and emails of all workbooks first; "
+                              "continue converts the valid ones, fail-fast writes nothing if "
+                              "any is invalid")
+    convert.add_argument("--validation-report", metavar="FILE",
+                         help="write the problems found by --validate to FILE as JSON")
+    _add_journal_arguments(convert)
+    _add_normalize_argument(convert)
+    _add_dates_argument(convert)
+    _add_incremental_argument(convert)
+    _add_profile_arguments(convert)
+    convert.set_defaults(func=cmd_convert)
+
+    watch = commands.add_parser("watch", help="convert workbooks as they appear in a folder")
+    watch.add_argument("input_dir", help="folder to watch for .xlsx workbooks")
+    watch.add_argument("-o", "--output-dir", required=True, help="write XML here")
+    watch.add_argument("-j", "--workers", type=int, default=None,
+                       help="number of worker processes (default: one per core)")
+    watch.add_argument("--settle", type=float, default=DEFAULT_SETTLE, metavar="SECONDS",
+                       help="convert a workbook once it has not changed for this long "
+                            "(default: %(default)s)")
+    watch.add_argument("--interval", type=float, default=DEFAULT_INTERVAL, metavar="SECONDS",
+                       help="seconds between scans when polling (default: %(default)s)")
+    watch.add_argument("--poll", action="store_true",
+                       help="poll even if watchdog is installed")
+    watch.add_argument("--stats", metavar="FILE",
+                       help="keep throughput and latency counters in this JSON file")
+    watch.add_argument("--backend", choices=BACKENDS, default=DEFAULT_BACKEND,
+                       help="workbook reader (default: %(default)s)")
+    watch.add_argument("--template", nargs="?", const=DEFAULT_TEMPLATE, metavar="XLSX",
+                       help="convert with the layout compiled from this template")
+    watch.add_argument("--no-recursive", action="store_true",
+                       help="do not watch subdirectories")
+    watch.add_argument("--cache", metavar="DIR",
+                       help="reuse the XML of unchanged workbooks from this cache directory")
+    watch.add_argument("--cache-size", metavar="MB", type=int,
+                       default=DEFAULT_MAX_BYTES // (1024 * 1024),
+                       help="evict least recently used documents above this size "
+                            "(default: %(default)s)")
+    _add_journal_arguments(watch)
+    _add_normalize_argument(watch)
+    _add_dates_argument(watch)
+    _add_incremental_argument(watch)
+    _add_profile_arguments(watch)
+    watch.set_defaults(func=cmd_watch)
+
+    issue = commands.add_parser("issue", help="convert an issue workbook, one row per article")
+    issue.add_argument("workbook", help="workbook with Journal, Articles and Authors sheets")
+    issue.add_argument("-o", "--output-dir",
+                       help="write one XML file per article here, named after its Article_ID")
+    issue.add_argument("--combined", metavar="FILE",
+                       help="write all articles into this single <issue> document")
+    issue.add_argument("--schema", metavar="NAME|FILE",
+                       help="layout of the per-article files (default: v2, see xmlgen.schema)")
+    issue.add_argument("--validate", action="store_true",
+                       help="do not write articles with a bad ISSN, DOI, ORCID or email")
+    issue.add_argument("--json", action="store_true",
+                       help="print the summary as JSON")
+    _add_journal_arguments(issue)
+    _add_normalize_argument(issue)
+    _add_dates_argument(issue)
+    _add_incremental_argument(issue)
+    issue.set_defaults(func=cmd_issue)
+
+    pack = commands.add_parser("pack", help="put TemplateFinal workbooks into one issue workbook")
+    pack.add_argument("inputs", nargs="+", help="workbooks or directories of workbooks")
+    pack.add_argument("-o", "--output", required=True, help="issue workbook to write")
+    pack.add_argument("--backend", choices=BACKENDS, default=DEFAULT_BACKEND,
+                      help="workbook reader (default: %(default)s)")
+    pack.add_argument("--no-recursive", action="store_true",
+                      help="do not descend into subdirectories")
+    pack.set_defaults(func=cmd_pack)
+
+    importer = commands.add_parser("import", help="turn generated XML back into workbooks")
+    importer.add_argument("source", help="V1 or V2 XML file, or an <issue> archive of them")
+    importer.add_argument("-o", "--output-dir", required=True,
+                          help="write one file per article here")
+    importer.add_argument("--format", choices=("xlsx", "json"), default="xlsx",
+                          help="TemplateFinal-style workbooks or the form app's JSON "
+                               "(default: %(default)s)")
+    importer.set_defaults(func=cmd_import)
+
+    authors = commands.add_parser("authors",
+                                  help="index the authors of workbooks and XML files and "
+                                       "report conflicting ORCIDs")
+    authors.add_argument("inputs", nargs="+",
+                         help="workbooks, directories of workbooks or generated XML files")
+    authors.add_argument("--registry", metavar="FILE",
+                         help="add to this registry file and save it (e.g. the form app's "
+                              "~/.xmlgen/authors.json)")
+    authors.add_argument("--json", action="store_true",
+                         help="print the counts and conflicts as JSON")
+    authors.set_defaults(func=cmd_authors)
+
+    server = commands.add_parser("serve", help="convert over HTTP for other programs")
+    server.add_argument("--host", default=DEFAULT_HOST,
+                        help="address to listen on (default: %(default)s)")
+    server.add_argument("--port", type=int, default=DEFAULT_PORT,
+                        help="port to listen on (default: %(default)s)")
+    server.add_argument("-j", "--workers", type=int, default=None,
+                        help="number of worker processes (default: one per core)")
+    server.add_argument("--queue", type=int, default=None, metavar="N",
+                        help="conversions that may wait for a worker before requests are "
+                             f"turned away with 503 (default: {DEFAULT_QUEUE_PER_WORKER} "
+                             "per worker)")
+    server.add_argument("--backend", choices=BACKENDS, default=DEFAULT_BACKEND,
+                        help="workbook reader (default: %(default)s)")
+    server.add_argument("--template", nargs="?", const=DEFAULT_TEMPLATE, metavar="XLSX",
+                        help="convert with the layout compiled from this template")
+    server.add_argument("--journals", metavar="FILE", default=DEFAULT_PROFILES,
+                        help="journal profiles for ?journal= (default: journals.json)")
+    _add_normalize_argument(server)
+    _add_dates_argument(server)
+    server.set_defaults(func=cmd_serve)
+
+    cache = commands.add_parser("cache", help="inspect or invalidate an output cache")
+    cache.add_argument("action", choices=("stats", "invalidate"))
+    cache.add_argument("directory", help="cache directory")
+    cache.add_argument("workbooks", nargs="*",
+                       help="only invalidate these workbooks (default: everything)")
+    cache.add_argument("--template", nargs="?", const=DEFAULT_TEMPLATE, metavar="XLSX",
+                       help="also drop the workbooks' entries converted with this template")
+    cache.add_argument("--schema", metavar="FILE",
+                       help="also drop the workbooks' entries written with this schema file "
+                            "(those of the bundled schemas always are)")
+    _add_journal_arguments(cache)
+    cache.set_defaults(func=cmd_cache)
+    return parser
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.command == "convert":
+        bundled = "--issue" if args.issue else "--archive" if args.archive else None
+        if args.issue and args.archive:
+            parser.error("--issue and --archive cannot be combined")
+        if bundled and args.cache:
+            parser.error(f"--cache cannot be combined with {bundled}")
+        if bundled and args.incremental:
+            parser.error(f"--incremental cannot be combined with {bundled}")
+        if args.cache and args.incremental:
+            parser.error("--cache cannot be combined with --incremental")
+        if bundled and _profile_options(args):
+            parser.error(f"--timings, --profile and --trace-memory cannot be combined with "
+                         f"{bundled}")
+        if args.manifest and not args.archive:
+            parser.error("--manifest needs --archive")
+        if args.schema and args.issue:
+            parser.error("--schema cannot be combined with --issue")
+        if args.schema:
+            try:
+                load_schema(args.schema)
+            except SchemaError as e:
+                parser.error(str(e))
+        if args.validation_report and not args.validate:
+            parser.error("--validation-report needs --validate")
+        if args.archive:
+            try:
+                archive_format(args.archive)
+            except ValueError as e:
+                parser.error(str(e))
+    if args.command == "watch" and args.cache and args.incremental:
+        parser.error("--cache cannot be combined with --incremental")
+    if args.command == "cache" and args.schema:
+        try:
+            load_schema(args.schema)
+        except SchemaError as e:
+            parser.error(str(e))
+    if args.command == "issue":
+        if not (args.output_dir or args.combined):
+            parser.error("issue needs -o, --combined or both")
+        for option in ("schema", "incremental"):
+            if getattr(args, option) and not args.output_dir:
+                parser.error(f"--{option} applies to the files written with -o")
+        if args.schema:
+            try:
+                load_schema(args.schema)
+            except SchemaError as e:
+                parser.error(str(e))
+    return args.func(args)
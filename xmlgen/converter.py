@@ -0,0 +1,291 @@
+"""Convert TemplateFinal.xlsx-style workbooks into article XML.
+
+The workbook layout is the one used by ``Version 2/TemplateFinal.xlsx``:
+
+* 'Journal' and 'Article' hold one tag per row, tag name in column A and
+  value in column B.
+* 'Author(s)' holds one author per column, with the tag names in the
+  first column.
+"""
+
+import json
+import os
+import time
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+from lxml import etree
+
+from .cache import cache_key, read_blob, write_blob
+from .dates import fill_date_rows, fill_dates
+from .incremental import write_incremental
+from .jobs import Cancelled
+from .output import write_output
+from .persian import normalize_rows
+from .profiling import profile_call
+from .readers import (ARTICLE_SHEET, DEFAULT_BACKEND, JOURNAL_SHEET, StreamingWorkbook,
+                      read_workbook)
+from .schema import WORKBOOK_SCHEMA, load_schema, row_sections
+from .template import read_with_plan
+from .validate import describe, validate_rows
+
+# Text the workbook layout (schemas/v2.json) writes into tags whose cell is empty
+EMPTY_TEXT = " "
+
+# cached tells whether the XML came from the output cache; cache_key is the
+# workbook's key in it (None when no cache was used); unchanged that an
+# incremental conversion left the file as it was
+ConversionResult = namedtuple("ConversionResult",
+                              "source output ok error seconds cached cache_key unchanged",
+                              defaults=(False, None, False))
+
+
+def build_tree(journal_rows, article_rows, author_table):
+    """Build the <article> element tree from the rows returned by read_workbook
+    (schemas/v2.json)."""
+    return load_schema(WORKBOOK_SCHEMA).build(row_sections(journal_rows, article_rows,
+                                                           author_table))
+
+
+def serialize(root):
+    return etree.tostring(root, pretty_print=True, xml_declaration=True, encoding="UTF-8")
+
+
+def _no_progress(stage):
+    pass
+
+
+def read_rows(source, backend=DEFAULT_BACKEND, plan=None, journal_rows=None,
+              normalize_fa=False, complete_dates=False):
+    """The rows convert_workbook builds the XML of source from: read_workbook's,
+    with journal_rows, normalize_fa and complete_dates applied."""
+    rows = read_with_plan(source, plan) if plan is not None else read_workbook(source, backend)
+    if journal_rows is not None:
+        rows = (journal_rows,) + tuple(rows[1:])
+    if normalize_fa:
+        rows = normalize_rows(*rows)
+    if complete_dates:
+        rows = fill_dates(*rows)
+    return rows
+
+
+def convert_workbook(source, backend=DEFAULT_BACKEND, plan=None, progress=None,
+                     journal_rows=None, normalize_fa=False, schema=None, complete_dates=False):
+    """Convert one workbook and return the XML document as bytes.
+
+    With a TemplatePlan (see xmlgen.template) the workbook is read by
+    lookups against the compiled layout instead of its own tag column, and
+    backend is ignored. progress, if given, is called with "read", "build"
+    and "serialize" as each stage starts (see xmlgen.jobs). journal_rows,
+    e.g. from a journal profile (see xmlgen.journals), replaces the rows of
+    the workbook's 'Journal' sheet. With normalize_fa the Persian (_FA)
+    fields are normalized, see xmlgen.persian. With complete_dates the
+    Pub_Date_Jalali / Pub_Date_Gregorian rows of the 'Article' sheet are
+    checked and completed, see xmlgen.dates.fill_date_rows.
+    schema names the output layout (see xmlgen.schema); the default is the
+    V2.2 layout.
+    """
+    layout = load_schema(schema or WORKBOOK_SCHEMA)
+    progress = progress or _no_progress
+    progress("read")
+    # Normalizing works on whole columns, so those rows can't be streamed
+    if plan is None and backend == "openpyxl" and not normalize_fa:
+        with StreamingWorkbook(source) as book:
+            author_table = book.author_table()
+            # The Journal and Article rows are streamed while the tree is
+            # built, unless the few Article rows are needed first for their dates
+            article_rows = book.pairs(ARTICLE_SHEET)
+            if complete_dates:
+                article_rows = fill_date_rows(article_rows)
+            progress("build")
+            if journal_rows is None:
+                journal_rows = book.pairs(JOURNAL_SHEET)
+            root = layout.build(row_sections(journal_rows, article_rows, author_table))
+        progress("serialize")
+        return layout.serialize(root)
+    rows = read_rows(source, backend, plan, journal_rows, normalize_fa, complete_dates)
+    progress("build")
+    root = layout.build(row_sections(*rows))
+    progress("serialize")
+    return layout.serialize(root)
+
+
+def convert_file(source, output, backend=DEFAULT_BACKEND, cache_dir=None, plan=None,
+                 progress=None, journal_rows=None, normalize_fa=False, schema=None,
+                 incremental=False, validate=False, complete_dates=False):
+    """Convert source into the XML file output and report how it went.
+
+    With cache_dir, an unchanged workbook is served from the output cache
+    there (see xmlgen.cache) without being read or converted again.
+    progress, journal_rows, normalize_fa, schema and complete_dates are passed
+    to convert_workbook and progress is also called with "write". With
+    incremental only the sections of output whose rows changed since the
+    last incremental conversion are rebuilt, see xmlgen.incremental;
+    cache_dir is then not used. With validate the identifiers of the rows read for the conversion are checked
+    (see xmlgen.validate) and a workbook with a problem fails without
+    output being written; cache_dir is not used either.
+
+    Errors are captured in the returned ConversionResult rather than raised,
+    so one bad workbook does not stop a batch. Cancelled from progress is
+    the exception; it propagates and nothing is written.
+    """
+    start = time.perf_counter()
+    key = xml = None
+    try:
+        if incremental or validate:
+            if progress:
+                progress("read")
+            rows = read_rows(source, backend, plan, journal_rows, normalize_fa,
+                             complete_dates)
+            problems = validate_rows(*rows, source=source) if validate else []
+            if problems:
+                return ConversionResult(source, output, False, "failed validation: " +
+                                        "; ".join(map(describe, problems)),
+                                        time.perf_counter() - start)
+            if progress:
+                progress("build")
+            layout = load_schema(schema or WORKBOOK_SCHEMA)
+            if incremental:
+                result = write_incremental(layout, row_sections(*rows), output)
+                return ConversionResult(source, output, True, None,
+                                        time.perf_counter() - start,
+                                        unchanged=not result.written)
+            root = layout.build(row_sections(*rows))
+            if progress:
+                progress("serialize")
+            xml = layout.serialize(root)
+        elif cache_dir:
+            key = cache_key(source, *_cache_salt(backend, plan, journal_rows, normalize_fa,
+                                                 schema, complete_dates))
+            xml = read_blob(cache_dir, key)
+        cached = key is not None and xml is not None
+        if xml is None:
+            xml = convert_workbook(source, backend, plan, progress, journal_rows, normalize_fa,
+                                   schema, complete_dates)
+            if cache_dir:
+                write_blob(cache_dir, key, xml)
+        if progress:
+            progress("write")
+        write_output(output, xml)
+    except Cancelled:
+        raise
+    except Exception as e:
+        return ConversionResult(source, output, False, f"{type(e).__name__}: {e}",
+                                time.perf_counter() - start, False, key)
+    return ConversionResult(source, output, True, None, time.perf_counter() - start, cached, key)
+
+
+def _cache_salt(backend, plan, journal_rows=None, normalize_fa=False, schema=None,
+                complete_dates=False):
+    # Everything besides the workbook itself that decides the output
+    salt = (backend,) if plan is None else ("plan", plan.fingerprint)
+    if journal_rows is not None:
+        salt += ("journal", json.dumps(journal_rows, ensure_ascii=False))
+    if normalize_fa:
+        salt += ("normalize_fa",)
+    if schema is not None:
+        salt += ("schema", load_schema(schema).fingerprint)
+    if complete_dates:
+        salt += ("complete_dates",)
+    return salt
+
+
+def _is_workbook(name):
+    # Skip the lock files Excel leaves next to open workbooks
+    return name.lower().endswith(".xlsx") and not name.startswith("~$")
+
+
+def find_workbooks(directory, recursive=True):
+    """Yield the .xlsx files under directory in a stable order."""
+    if recursive:
+        for dirpath, dirnames, filenames in os.walk(directory):
+            dirnames.sort()
+            for name in sorted(filenames):
+                if _is_workbook(name):
+                    yield os.path.join(dirpath, name)
+    else:
+        for name in sorted(os.listdir(directory)):
+            path = os.path.join(directory, name)
+            if _is_workbook(name) and os.path.isfile(path):
+                yield path
+
+
+def collect_jobs(inputs, output_dir=None, recursive=True):
+    """Expand files and directories into a list of (workbook, xml_path) jobs.
+
+    Without output_dir each XML file is written next to its workbook. With
+    output_dir, workbooks found inside a directory keep their relative
+    location so same-named workbooks from different folders do not collide.
+    """
+    jobs = []
+    for item in inputs:
+        if os.path.isdir(item):
+            pairs = [(path, os.path.relpath(path, item))
+                     for path in find_workbooks(item, recursive)]
+        else:
+            pairs = [(item, os.path.basename(item))]
+        for path, relative in pairs:
+            xml_name = os.path.splitext(relative)[0] + ".xml"
+            if output_dir:
+                output = os.path.join(output_dir, xml_name)
+            else:
+                output = os.path.splitext(path)[0] + ".xml"
+            jobs.append((path, output))
+    return jobs
+
+
+def _run_job(job, backend=DEFAULT_BACKEND, cache_dir=None, plan=None, profile=None,
+             journal_rows=None, normalize_fa=False, schema=None, incremental=False,
+             complete_dates=False):
+    source, output = job
+    parent = os.path.dirname(output)
+    if parent:
+        os.makedirs(parent, exist_ok=True)
+    if profile is not None:
+        return profile_call(convert_file, source, output, backend, cache_dir, plan,
+                            options=profile, label=source, journal_rows=journal_rows,
+                            normalize_fa=normalize_fa, schema=schema, incremental=incremental,
+                            complete_dates=complete_dates)
+    return convert_file(source, output, backend, cache_dir, plan, journal_rows=journal_rows,
+                        normalize_fa=normalize_fa, schema=schema, incremental=incremental,
+                        complete_dates=complete_dates)
+
+
+def convert_many(jobs, workers=None, backend=DEFAULT_BACKEND, cache=None, plan=None,
+                 profile=None, journal_rows=None, normalize_fa=False, schema=None,
+                 incremental=False, complete_dates=False):
+    """Convert (workbook, xml_path) jobs across a process pool.
+
+    workers is the pool size (None lets the executor pick one per core);
+    workers=1 converts in the calling process. cache is an optional
+    OutputCache; its index and counters are updated and saved once the
+    batch is done. plan is an optional TemplatePlan to convert with and
+    profile optional ProfileOptions to time each conversion with (see
+    xmlgen.profiling). journal_rows replaces every workbook's 'Journal'
+    sheet, see xmlgen.journals.journal_rows, and normalize_fa normalizes the
+    Persian fields, see xmlgen.persian. schema names the output layout, see
+    xmlgen.schema. With incremental only the changed sections of existing
+    outputs are rebuilt, see xmlgen.incremental, and complete_dates
+    completes the publication dates, see xmlgen.dates. Returns one
+    ConversionResult per job, in job order.
+    """
+    jobs = list(jobs)
+    run = partial(_run_job, backend=backend, cache_dir=cache.directory if cache else None,
+                  plan=plan, profile=profile, journal_rows=journal_rows,
+                  normalize_fa=normalize_fa, schema=schema, incremental=incremental,
+                  complete_dates=complete_dates)
+    if workers == 1 or len(jobs) <= 1:
+        results = [run(job) for job in jobs]
+    else:
+        # Hand jobs out in chunks so tiny workbooks don't drown in IPC overhead
+        chunksize = max(1, len(jobs) // ((workers or os.cpu_count() or 1) * 4))
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(run, jobs, chunksize=chunksize))
+
+    if cache is not None:
+        for result in results:
+            if result.ok and result.cache_key:
+                cache.record(result.cache_key, result.cached, os.path.getsize(result.output))
+        cache.save()
+    return results
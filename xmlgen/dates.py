@@ -0,0 +1,241 @@
+"""Jalali and Gregorian publication dates.
+
+Indexers want every publication date in both calendars. Dates are checked
+(year in range, month 1-12, day within the month) and the missing calendar
+is filled in.
+
+Both calendars are mapped to day numbers (date.toordinal(): 1 is
+0001-01-01 Gregorian). The day number of 1 Farvardin of every supported
+Jalali year is computed once at import, so converting a date is a table
+lookup plus the fixed month offsets, whichever way it goes. Leap years
+follow the 33-year break table of the arithmetic used by the Iranian
+calendar authorities (as in the widely used jalaali library).
+
+    >>> jalali_to_gregorian(1403, 1, 1)
+    (2024, 3, 20)
+"""
+
+import bisect
+import datetime
+import re
+
+from .model import PubDate
+
+JALALI, GREGORIAN = CALENDARS = ("jalali", "gregorian")
+
+# Supported Jalali years (Gregorian 1821 to 2222)
+FIRST_YEAR, LAST_YEAR = 1200, 1600
+
+# Farvardin..Shahrivar have 31 days, Mehr..Bahman 30, Esfand 29 (30 in leap years)
+_MONTH_LENGTHS = (31,) * 6 + (30,) * 5 + (29,)
+MONTH_OFFSETS = tuple(sum(_MONTH_LENGTHS[:month]) for month in range(12))
+
+# Jalali years in which the 33-year leap cycle restarts
+_BREAKS = (-61, 9, 38, 199, 426, 686, 756, 818, 1111, 1181, 1210, 1635, 2060, 2097, 2192,
+           2262, 2324, 2394, 2456, 3178)
+
+
+class DateError(ValueError):
+    """A date is not a valid date of its calendar, or out of range."""
+
+
+def _march_day(year):
+    """Day of March on which Jalali year starts (the jalaali jalCal algorithm)."""
+    gregorian_year = year + 621
+    leap_jalali = -14
+    previous = _BREAKS[0]
+    jump = 0
+    for current in _BREAKS[1:]:
+        jump = current - previous
+        if year < current:
+            break
+        leap_jalali += jump // 33 * 8 + jump % 33 // 4
+        previous = current
+    n = year - previous
+    leap_jalali += n // 33 * 8 + (n % 33 + 3) // 4
+    if jump % 33 == 4 and jump - n == 4:
+        leap_jalali += 1
+    leap_gregorian = gregorian_year // 4 - (gregorian_year // 100 + 1) * 3 // 4 - 150
+    return 20 + leap_jalali - leap_gregorian
+
+
+# Day number of 1 Farvardin for FIRST_YEAR..LAST_YEAR + 1 (the extra one ends LAST_YEAR)
+YEAR_STARTS = tuple(datetime.date(year + 621, 3, _march_day(year)).toordinal()
+                    for year in range(FIRST_YEAR, LAST_YEAR + 2))
+FIRST_DAY, END_DAY = YEAR_STARTS[0], YEAR_STARTS[-1]  # END_DAY is one past the last
+
+
+def is_leap(year):
+    """True if Jalali year has a 30th of Esfand."""
+    _check_year(year)
+    index = year - FIRST_YEAR
+    return YEAR_STARTS[index + 1] - YEAR_STARTS[index] == 366
+
+
+def _check_year(year):
+    if not FIRST_YEAR <= year <= LAST_YEAR:
+        raise DateError(f"Jalali year {year} is outside {FIRST_YEAR}-{LAST_YEAR}")
+
+
+def jalali_to_ordinal(year, month, day):
+    _check_year(year)
+    if not 1 <= month <= 12:
+        raise DateError(f"{year}/{month}/{day}: month must be 1-12")
+    length = _MONTH_LENGTHS[month - 1] + (month == 12 and is_leap(year))
+    if not 1 <= day <= length:
+        raise DateError(f"{year}/{month}/{day}: day must be 1-{length}")
+    return YEAR_STARTS[year - FIRST_YEAR] + MONTH_OFFSETS[month - 1] + day - 1
+
+
+def ordinal_to_jalali(number):
+    if not FIRST_DAY <= number < END_DAY:
+        raise DateError(f"day {number} is outside Jalali {FIRST_YEAR}-{LAST_YEAR}")
+    index = bisect.bisect_right(YEAR_STARTS, number) - 1
+    day_of_year = number - YEAR_STARTS[index]
+    month = bisect.bisect_right(MONTH_OFFSETS, day_of_year)
+    return FIRST_YEAR + index, month, day_of_year - MONTH_OFFSETS[month - 1] + 1
+
+
+def gregorian_to_ordinal(year, month, day):
+    try:
+        number = datetime.date(year, month, day).toordinal()
+    except ValueError as e:
+        raise DateError(f"{year}-{month}-{day}: {e}") from None
+    if not FIRST_DAY <= number < END_DAY:
+        raise DateError(f"{year}-{month}-{day} is outside the supported range")
+    return number
+
+
+def ordinal_to_gregorian(number):
+    date = datetime.date.fromordinal(number)
+    return date.year, date.month, date.day
+
+
+def to_ordinal(calendar, year, month, day):
+    if calendar == JALALI:
+        return jalali_to_ordinal(year, month, day)
+    if calendar == GREGORIAN:
+        return gregorian_to_ordinal(year, month, day)
+    raise DateError(f"unknown calendar {calendar!r}, expected one of {', '.join(CALENDARS)}")
+
+
+def from_ordinal(calendar, number):
+    return ordinal_to_jalali(number) if calendar == JALALI else ordinal_to_gregorian(number)
+
+
+def jalali_to_gregorian(year, month, day):
+    return ordinal_to_gregorian(jalali_to_ordinal(year, month, day))
+
+
+def gregorian_to_jalali(year, month, day):
+    return ordinal_to_jalali(gregorian_to_ordinal(year, month, day))
+
+
+def other_calendar(calendar):
+    return GREGORIAN if calendar == JALALI else JALALI
+
+
+def _number(value, name):
+    # int() reads Persian and Arabic-Indic digits as well
+    try:
+        return int(str(value).strip())
+    except ValueError:
+        raise DateError(f"{name} {value!r} is not a number") from None
+
+
+def complete_pub_dates(pub_dates):
+    """Check the jalali and gregorian PubDates and add the missing counterparts.
+
+    Returns a new list: every dated PubDate, each followed by its date in the
+    other calendar unless that is already in the list. Other types (e.g.
+    epublish) and empty rows are kept as they are. Raises DateError naming
+    the first invalid date.
+    """
+    dated = []  # (PubDate, calendar, day number)
+    present = set()
+    for date in pub_dates:
+        calendar = date.type.strip().lower()
+        if calendar not in CALENDARS or not (date.year or date.month or date.day):
+            dated.append((date, None, None))
+            continue
+        try:
+            number = to_ordinal(calendar, _number(date.year, "year"),
+                                _number(date.month, "month"), _number(date.day, "day"))
+        except DateError as e:
+            raise DateError(f"{calendar} date: {e}") from None
+        dated.append((date, calendar, number))
+        present.add((calendar, number))
+
+    completed = []
+    for date, calendar, number in dated:
+        completed.append(date)
+        if calendar is None:
+            continue
+        counterpart = other_calendar(calendar)
+        if (counterpart, number) not in present:
+            year, month, day = from_ordinal(counterpart, number)
+            completed.append(PubDate(type=counterpart, year=str(year), month=str(month),
+                                     day=str(day)))
+            present.add((counterpart, number))
+    return completed
+
+
+# Workbook rows carrying publication dates, see fill_date_rows
+DATE_TAGS = {JALALI: "Pub_Date_Jalali", GREGORIAN: "Pub_Date_Gregorian"}
+_TAG_CALENDARS = {tag: calendar for calendar, tag in DATE_TAGS.items()}
+_DATE_TEXT = re.compile(r"^\s*(\d{1,4})\s*[-/.]\s*(\d{1,2})\s*[-/.]\s*(\d{1,2})\s*$")
+
+
+def parse_date(calendar, value):
+    """The day number of a workbook cell: a date, or Y-M-D / Y/M/D text."""
+    if isinstance(value, (datetime.date, datetime.datetime)):
+        if calendar != GREGORIAN:
+            raise DateError(f"{value}: a spreadsheet date can only be Gregorian")
+        return gregorian_to_ordinal(value.year, value.month, value.day)
+    match = _DATE_TEXT.match(str(value))
+    if match is None:
+        raise DateError(f"{value!r} is not a {calendar} date like 1403/01/15")
+    return to_ordinal(calendar, *(int(part) for part in match.groups()))
+
+
+def format_date(calendar, number):
+    return "%04d-%02d-%02d" % from_ordinal(calendar, number)
+
+
+def fill_date_rows(rows):
+    """Check the Pub_Date_Jalali / Pub_Date_Gregorian rows of a key/value
+    sheet and fill in the missing calendar.
+
+    Both rows are rewritten as YYYY-MM-DD. A missing counterpart row is
+    added right after the given one; an empty one is filled in. Sheets
+    without date rows come back unchanged. Raises DateError for a bad date
+    or two rows that disagree.
+    """
+    rows = list(rows)
+    found = {}  # calendar -> (index, day number or None)
+    for index, (tag, value) in enumerate(rows):
+        calendar = _TAG_CALENDARS.get(tag)
+        if calendar is not None:
+            number = None if value is None or str(value).strip() == "" else \
+                parse_date(calendar, value)
+            found[calendar] = (index, number)
+    numbers = {number for _, number in found.values() if number is not None}
+    if not numbers:
+        return rows
+    if len(numbers) > 1:
+        raise DateError(f"{rows[found[JALALI][0]][1]} (Jalali) and "
+                        f"{rows[found[GREGORIAN][0]][1]} (Gregorian) are different days")
+    number = numbers.pop()
+    for calendar in CALENDARS:
+        if calendar in found:
+            rows[found[calendar][0]] = (DATE_TAGS[calendar], format_date(calendar, number))
+    for calendar in CALENDARS:
+        if calendar not in found:
+            given = found[other_calendar(calendar)][0]
+            rows.insert(given + 1, (DATE_TAGS[calendar], format_date(calendar, number)))
+    return rows
+
+
+def fill_dates(journal_rows, article_rows, author_table):
+    """fill_date_rows() for the Article sheet of what read_workbook returns."""
+    return journal_rows, fill_date_rows(article_rows), author_table
@@ -0,0 +1,216 @@
+"""Read generated XML back into forms or TemplateFinal-shaped workbooks.
+
+Both layouts are recognised, also inside an archive such as the ``<issue>``
+documents written by ``convert --issue``:
+
+* V1 (form app): a ``<journal>`` element holding the journal fields,
+  ``<pubdate>`` elements, ``<article>`` and ``<author_list>``.
+* V2 (workbook converter): an ``<article>`` element holding ``<journal>``,
+  ``<article_info>`` and ``<author_list>``, with the workbook's tag names.
+
+Documents are read with ``iterparse``; every article is handed out and then
+cleared from the tree, so memory stays flat however large the archive is.
+
+    for document in iter_documents("issue.xml"):
+        form = document.to_form()
+"""
+
+import os
+
+from lxml import etree
+
+from .converter import EMPTY_TEXT
+from .model import (ARTICLE_FIELD_TAGS, ARTICLE_FIELDS, ARTICLE_TAGS, AUTHOR_FIELD_TAGS,
+                    AUTHOR_FIELDS, AUTHOR_TAGS, JOURNAL_FIELD_TAGS, JOURNAL_FIELDS, JOURNAL_TAGS,
+                    Article, ArticleForm, Author, Journal, PubDate)
+from .readers import ARTICLE_SHEET, AUTHOR_SHEET, JOURNAL_SHEET
+
+# Workbook tag -> form field
+JOURNAL_TAG_FIELDS = {tag: field for field, tag in JOURNAL_FIELD_TAGS.items()}
+ARTICLE_TAG_FIELDS = {tag: field for field, tag in ARTICLE_FIELD_TAGS.items()}
+AUTHOR_TAG_FIELDS = {tag: field for field, tag in AUTHOR_FIELD_TAGS.items()}
+
+_YES = ("yes", "y", "true", "1")
+
+
+def _leaf_text(element):
+    return element.text or ""
+
+
+def _cell(element):
+    # Empty cells are written as a single space; read them back as empty
+    text = element.text
+    return None if text is None or text == EMPTY_TEXT else text
+
+
+class FormDocument:
+    """An article in the V1 layout; holds an ArticleForm."""
+
+    __slots__ = ("form",)
+
+    def __init__(self, form):
+        self.form = form
+
+    @classmethod
+    def from_element(cls, root):
+        form = ArticleForm()
+        for child in root:
+            if child.tag in JOURNAL_FIELDS:
+                setattr(form.journal, child.tag, _leaf_text(child))
+            elif child.tag == "pubdate":
+                form.pub_dates.append(PubDate(**{element.tag: _leaf_text(element)
+                                                 for element in child
+                                                 if element.tag in PubDate.FIELDS}))
+            elif child.tag == "article":
+                form.article.update({element.tag: _leaf_text(element) for element in child
+                                     if element.tag in ARTICLE_FIELDS})
+            elif child.tag == "author_list":
+                for element in child:
+                    values = {item.tag: _leaf_text(item) for item in element
+                              if item.tag in AUTHOR_FIELDS}
+                    values["coreauthor"] = values.get("coreauthor", "").casefold() in _YES
+                    form.authors.append(Author(**values))
+        return cls(form)
+
+    def to_form(self):
+        return self.form
+
+    def sheets(self):
+        """(journal rows, article rows, author rows) as they go into a workbook,
+        header rows included. Publication dates have no place there."""
+        form = self.form
+        journal = [(tag, getattr(form.journal, field) or None)
+                   for field, tag in JOURNAL_FIELD_TAGS.items()]
+        article = [(tag, getattr(form.article, ARTICLE_TAG_FIELDS[tag]) or None)
+                   for tag in ARTICLE_TAGS]
+        authors = [[None] + [f"Author {number}" for number in range(1, len(form.authors) + 1)]]
+        for field, tag in AUTHOR_FIELD_TAGS.items():
+            if field == "coreauthor":
+                authors.append([tag] + ["Yes" if author.coreauthor else "No"
+                                        for author in form.authors])
+            else:
+                authors.append([tag] + [getattr(author, field) or None
+                                        for author in form.authors])
+        return journal, article, authors
+
+
+class TableDocument:
+    """An article in the V2 layout; holds the rows read_workbook would return."""
+
+    __slots__ = ("journal", "article", "authors")
+
+    def __init__(self, journal, article, authors):
+        self.journal = journal  # [(tag, value)]
+        self.article = article  # [(tag, value)]
+        self.authors = authors  # ([attribute], [(value, ...) per author])
+
+    @classmethod
+    def from_element(cls, root):
+        journal, article, attributes, authors = [], [], None, []
+        for child in root:
+            if child.tag == "journal":
+                journal = [(element.tag, _cell(element)) for element in child]
+            elif child.tag == "article_info":
+                article = [(element.tag, _cell(element)) for element in child]
+            elif child.tag == "author_list":
+                for element in child:
+                    if attributes is None:
+                        attributes = [item.tag for item in element]
+                    authors.append(tuple(_cell(item) for item in element))
+        return cls(journal, article, (attributes or list(AUTHOR_TAGS), authors))
+
+    def to_form(self):
+        """The article as an ArticleForm; tags the form has no field for are dropped."""
+        journal = Journal(**{JOURNAL_TAG_FIELDS[tag]: value or "" for tag, value in self.journal
+                             if tag in JOURNAL_TAG_FIELDS})
+        article = Article(**{ARTICLE_TAG_FIELDS[tag]: value or "" for tag, value in self.article
+                             if tag in ARTICLE_TAG_FIELDS})
+        form = ArticleForm(journal, [], article)
+        attributes, authors = self.authors
+        for values in authors:
+            author = {AUTHOR_TAG_FIELDS[tag]: value or "" for tag, value in zip(attributes, values)
+                      if tag in AUTHOR_TAG_FIELDS}
+            author["coreauthor"] = author.get("coreauthor", "").strip().casefold() in _YES
+            form.authors.append(Author(**author))
+        return form
+
+    def sheets(self):
+        """(journal rows, article rows, author rows) as they go into a workbook.
+
+        The converter treats the first row of every sheet as its header, so
+        the rows it wrote out get an empty header row back in front of them.
+        """
+        attributes, authors = self.authors
+        author_rows = [[None] + [f"Author {number}" for number in range(1, len(authors) + 1)]]
+        for index, attribute in enumerate(attributes):
+            author_rows.append([attribute] + [values[index] for values in authors])
+        return ([(JOURNAL_TAGS[0], None)] + self.journal,
+                [(ARTICLE_TAGS[0], None)] + self.article, author_rows)
+
+
+def _is_document(element):
+    # V1 has an <article> inside <journal>, V2 a <journal> inside <article>
+    parent = element.getparent()
+    if element.tag == "journal":
+        return parent is None or parent.tag != "article"
+    return parent is None or parent.tag != "journal"
+
+
+def iter_documents(source):
+    """Yield a FormDocument or TableDocument for every article in source."""
+    for _, element in etree.iterparse(source, events=("end",), tag=("journal", "article"),
+                                      huge_tree=True):
+        if not _is_document(element):
+            continue
+        if element.tag == "journal":
+            yield FormDocument.from_element(element)
+        else:
+            yield TableDocument.from_element(element)
+        # Drop the article and everything before it
+        element.clear()
+        parent = element.getparent()
+        if parent is not None:
+            while element.getprevious() is not None:
+                del parent[0]
+
+
+def load_form(source):
+    """Return the first article in source as an ArticleForm."""
+    for document in iter_documents(source):
+        return document.to_form()
+    raise ValueError(f"{source} contains no article")
+
+
+def write_workbook(path, journal_rows, article_rows, author_rows):
+    """Write TemplateFinal-shaped sheets; every sheet's first row is its header."""
+    import openpyxl
+
+    book = openpyxl.Workbook(write_only=True)
+    for sheet, rows in ((JOURNAL_SHEET, journal_rows), (ARTICLE_SHEET, article_rows),
+                        (AUTHOR_SHEET, author_rows)):
+        worksheet = book.create_sheet(sheet)
+        for row in rows:
+            worksheet.append(list(row))
+    book.save(path)
+    return path
+
+
+def import_archive(source, output_dir, format="xlsx"):
+    """Write every article in source to output_dir as a workbook or form JSON.
+
+    Files are numbered in document order (article_00001.xlsx, ...). Returns
+    the paths written.
+    """
+    import json
+
+    os.makedirs(output_dir, exist_ok=True)
+    paths = []
+    for number, document in enumerate(iter_documents(source), start=1):
+        path = os.path.join(output_dir, f"article_{number:05d}.{format}")
+        if format == "json":
+            with open(path, "w", encoding="utf-8") as file:
+                json.dump(document.to_form().to_dict(), file, ensure_ascii=False, indent=2)
+        else:
+            write_workbook(path, *document.sheets())
+        paths.append(path)
+    return paths
@@ -0,0 +1,201 @@
+"""Regenerate only the sections of an XML file whose data changed.
+
+A document written by a schema (see xmlgen.schema) is a run of units, each
+the serialized XML of one section record: the journal block, the article
+block, each publication date, each author. write_incremental() stores a
+fingerprint and the byte range of every unit in a sidecar file next to the
+XML (``.<name>.xml.sections``). On the next run a unit whose fingerprint
+is unchanged is copied from the old file's bytes; only the others are
+built and serialized. The file is rewritten only if the result differs.
+
+Units are matched by fingerprint, not position, so inserting or removing
+an author rebuilds nothing else. Fixing one affiliation costs one author's
+worth of XML, plus hashing the field values and reading the old file.
+
+The sidecar is ignored, and everything rebuilt, when the schema changed or
+the XML no longer has the bytes it describes (edited by hand, written by
+another tool). Splicing needs the indentation of the schema's own
+serializer, so the form app's default minidom pretty printing always
+rebuilds the whole document.
+
+With newline="\r\n" every line ends that way, as text written by the form
+app on Windows does.
+"""
+
+import hashlib
+import json
+import os
+from collections import namedtuple
+
+from .output import write_output
+from .pretty import DEFAULT_PRETTY_METHOD, INDENT
+
+# Bump when the sidecar format or the unit serialization changes
+SIDECAR_VERSION = 1
+
+# written is False when the file already had the right content; units and
+# rebuilt count the units in the document and those that were serialized
+IncrementalResult = namedtuple("IncrementalResult", "path written units rebuilt")
+
+
+def sidecar_path(path):
+    directory, name = os.path.split(path)
+    return os.path.join(directory, f".{name}.sections")
+
+
+def _fingerprint(pairs):
+    # repr() would be simpler but scans Persian text character by character;
+    # values that aren't text are marked so None and "None" differ
+    text = "\x1f".join(f"{name}\x1e{value}" if type(value) is str else f"{name}\x1e\x00{value!r}"
+                       for name, value in pairs)
+    return hashlib.blake2b(text.encode("utf-8", "surrogatepass"), digest_size=16).hexdigest()
+
+
+class _Serializer:
+    """Serializes units exactly as the schema's serializer lays them out."""
+
+    def __init__(self, schema):
+        etree = schema.etree
+        self.Element = etree.Element
+        if schema.library == "lxml":
+            self.space = "  "
+            self._indent = lambda element, level: etree.indent(element, space="  ", level=level)
+            self._tostring = lambda element: etree.tostring(element, encoding="UTF-8")
+        else:
+            self.space = INDENT
+            self._indent = lambda element, level: etree.indent(element, space=INDENT, level=level)
+            self._tostring = lambda element: etree.tostring(element, "unicode").encode("utf-8")
+        # The declaration is whatever the serializer writes before the root
+        self.empty = schema.serialize(self.Element(schema.root), "indent")
+        root = f"<{schema.root}".encode("utf-8")
+        self.prolog = self.empty[:self.empty.rindex(root)]
+        self.open = f"<{schema.root}>\n".encode("utf-8")
+        self.close = f"</{schema.root}>\n".encode("utf-8")
+
+    def element(self, element, level):
+        """element and its children, on their own lines at level."""
+        self._indent(element, level)
+        element.tail = "\n"
+        return self.space.encode("utf-8") * level + self._tostring(element)
+
+    def line(self, text, level):
+        return (self.space * level + text + "\n").encode("utf-8")
+
+
+# Schema fingerprint -> _Serializer
+_serializers = {}
+
+
+def _serializer(schema):
+    serializer = _serializers.get(schema.fingerprint)
+    if serializer is None:
+        serializer = _serializers[schema.fingerprint] = _Serializer(schema)
+    return serializer
+
+
+def _previous(path, schema, method, newline):
+    """The old file's bytes (None if there is no file) and
+    {(node, fingerprint): (start, end)} of the units that can be reused."""
+    try:
+        with open(path, "rb") as file:
+            data = file.read()
+    except OSError:
+        return None, {}
+    try:
+        with open(sidecar_path(path), encoding="utf-8") as file:
+            sidecar = json.load(file)
+    except (OSError, ValueError):
+        return data, {}
+    if (sidecar.get("version") != SIDECAR_VERSION or sidecar.get("schema") != schema.fingerprint
+            or sidecar.get("method") != method or sidecar.get("newline") != newline
+            or sidecar.get("sha256") != hashlib.sha256(data).hexdigest()):
+        return data, {}
+    return data, {(node, fingerprint): (start, end)
+                  for node, fingerprint, start, end in sidecar.get("units", [])}
+
+
+def write_incremental(schema, sections, path, method=DEFAULT_PRETTY_METHOD, newline="\n"):
+    """Write the document for sections (see xmlgen.schema) to path, reusing
+    the unchanged units of the previous run; returns an IncrementalResult."""
+    if newline == "\n":
+        def encode(data):
+            return data
+    else:
+        end = newline.encode("ascii")
+
+        def encode(data):
+            return data.replace(b"\n", end)
+
+    if schema.library != "lxml" and method != "indent":
+        data = encode(schema.render(sections, method))
+        try:
+            with open(path, "rb") as file:
+                written = file.read() != data
+        except OSError:
+            written = True
+        if written:
+            write_output(path, data)
+        return IncrementalResult(path, written, 1, 1)
+
+    serializer = _serializer(schema)
+    old, reusable = _previous(path, schema, method, newline)
+    start = encode(serializer.prolog + serializer.open)
+    parts = [start]
+    size = len(start)
+    units, rebuilt = [], 0
+    for node, (section, element, item, fill) in enumerate(schema.nodes):
+        records = sections.get(section, ())
+        records = [list(pairs) for pairs in records] if item is not None else [list(records)]
+        level = 1
+        if item is not None and element is not None:
+            if not records:
+                fragment = encode(serializer.element(serializer.Element(element), 1))
+                parts.append(fragment)
+                size += len(fragment)
+                continue
+            fragment = encode(serializer.line(f"<{element}>", 1))
+            parts.append(fragment)
+            size += len(fragment)
+            level = 2
+        for pairs in records:
+            fingerprint = _fingerprint(pairs)
+            span = reusable.get((node, fingerprint))
+            if span is not None:
+                fragment = old[span[0]:span[1]]
+            else:
+                if item is not None:
+                    parent = serializer.Element(item)
+                    fill(parent, pairs)
+                    fragment = encode(serializer.element(parent, level))
+                elif element is not None:
+                    parent = serializer.Element(element)
+                    fill(parent, pairs)
+                    fragment = encode(serializer.element(parent, level))
+                else:
+                    # The fields go straight into the root, one line each
+                    parent = serializer.Element(schema.root)
+                    fill(parent, pairs)
+                    fragment = encode(b"".join(serializer.element(child, level)
+                                               for child in parent))
+                rebuilt += 1
+            units.append((node, fingerprint, size, size + len(fragment)))
+            parts.append(fragment)
+            size += len(fragment)
+        if item is not None and element is not None:
+            fragment = encode(serializer.line(f"</{element}>", 1))
+            parts.append(fragment)
+            size += len(fragment)
+
+    if size == len(start):
+        data = encode(serializer.empty)  # An empty root is written as <root/>
+    else:
+        parts.append(encode(serializer.close))
+        data = b"".join(parts)
+    written = data != old
+    if written:
+        write_output(path, data)
+    sidecar = {"version": SIDECAR_VERSION, "schema": schema.fingerprint, "method": method,
+               "newline": newline, "sha256": hashlib.sha256(data).hexdigest(), "units": units}
+    if written or rebuilt or not reusable:
+        write_output(sidecar_path(path), json.dumps(sidecar).encode("utf-8"))
+    return IncrementalResult(path, written, len(units), rebuilt)
@@ -0,0 +1,260 @@
+"""Issue workbooks: every article of an issue in one workbook.
+
+TemplateFinal.xlsx holds one article, so an issue of 40 papers is 40
+workbooks, each opened and parsed on its own. An issue workbook holds them
+all:
+
+* 'Journal': the journal fields, one tag per row as in TemplateFinal.xlsx,
+  shared by every article.
+* 'Articles': a header row with Article_ID and the article tags, then one
+  row per article.
+* 'Authors': a header row with Article_ID and the author tags, then one row
+  per author, in order, with the ID of the article.
+
+read_issue() reads the workbook once and takes each sheet column by column:
+the _FA columns of the whole issue are normalized in one pass each, and
+the authors are grouped under their articles by the Article_ID column and
+go through an AuthorRegistry, so an author (and an affiliation) that
+appears in several articles is held once (see xmlgen.authors).
+convert_issue() then writes one XML file per article, named after its ID,
+and/or one <issue> document like convert --issue. pack_workbooks() turns
+TemplateFinal workbooks into an issue workbook.
+"""
+
+import os
+import time
+from collections import namedtuple
+from contextlib import nullcontext
+
+from .authors import AuthorRegistry
+from .bundle import member_name
+from .converter import ConversionResult, build_tree
+from .dates import fill_dates
+from .incremental import write_incremental
+from .jobs import Cancelled
+from .output import write_output
+from .persian import is_persian_field, normalize_column, normalize_pairs
+from .readers import DEFAULT_BACKEND, JOURNAL_SHEET, StreamingWorkbook, read_workbook
+from .schema import WORKBOOK_SCHEMA, load_schema, row_sections
+from .validate import describe, validate_rows
+from .writer import IssueWriter
+
+ARTICLES_SHEET = "Articles"
+AUTHORS_SHEET = "Authors"
+ARTICLE_ID = "Article_ID"
+
+# rows is what read_workbook returns for a single-article workbook
+IssueArticle = namedtuple("IssueArticle", "article_id rows")
+
+
+class IssueWorkbookError(ValueError):
+    """A workbook is not a well-formed issue workbook."""
+
+
+def _article_id(value):
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)  # Typed as 12, read back as 12.0
+    return "" if value is None else str(value).strip()
+
+
+def _split_ids(sheet, names, columns):
+    """The Article_ID column of a sheet as text, and the other columns."""
+    if ARTICLE_ID not in names:
+        raise IssueWorkbookError(f"the '{sheet}' sheet has no {ARTICLE_ID} column")
+    index = names.index(ARTICLE_ID)
+    ids = [_article_id(value) for value in columns[index]]
+    if "" in ids:
+        raise IssueWorkbookError(f"record {ids.index('') + 1} of the '{sheet}' sheet has no "
+                                 f"{ARTICLE_ID}")
+    return ids, names[:index] + names[index + 1:], columns[:index] + columns[index + 1:]
+
+
+def _normalize_columns(names, columns):
+    return [normalize_column(column) if is_persian_field(name) else column
+            for name, column in zip(names, columns)]
+
+
+def _records(columns, count):
+    # Back from columns to one tuple per row
+    return list(zip(*columns)) if columns else [()] * count
+
+
+def is_issue_workbook(source):
+    """Whether source has the 'Articles' sheet of an issue workbook."""
+    with StreamingWorkbook(source) as book:
+        return ARTICLES_SHEET in book.sheetnames
+
+
+def read_issue(source, journal_rows=None, normalize_fa=False, registry=None):
+    """Read an issue workbook into one IssueArticle per article, in sheet order.
+
+    journal_rows, e.g. from a journal profile, replaces the 'Journal' sheet;
+    with normalize_fa the Persian (_FA) fields are normalized. The author
+    rows are interned by registry, a new AuthorRegistry unless one is given
+    to collect the authors (and conflicts) of several issues. Raises
+    IssueWorkbookError for a missing sheet or Article_ID column, a repeated
+    article ID or an author of an article that is not listed.
+    """
+    with StreamingWorkbook(source) as book:
+        required = [ARTICLES_SHEET, AUTHORS_SHEET] + [JOURNAL_SHEET] * (journal_rows is None)
+        missing = [sheet for sheet in required if sheet not in book.sheetnames]
+        if missing:
+            raise IssueWorkbookError(f"not an issue workbook, no '{missing[0]}' sheet")
+        if journal_rows is None:
+            journal_rows = list(book.pairs(JOURNAL_SHEET))
+        article_ids, tags, article_columns = _split_ids(ARTICLES_SHEET,
+                                                        *book.table(ARTICLES_SHEET))
+        author_ids, attributes, author_columns = _split_ids(AUTHORS_SHEET,
+                                                            *book.table(AUTHORS_SHEET))
+    if normalize_fa:
+        journal_rows = normalize_pairs(journal_rows)
+        article_columns = _normalize_columns(tags, article_columns)
+        author_columns = _normalize_columns(attributes, author_columns)
+
+    positions = {}
+    for position, article_id in enumerate(article_ids):
+        if positions.setdefault(article_id, position) != position:
+            raise IssueWorkbookError(f"article {article_id!r} is listed twice in the "
+                                     f"'{ARTICLES_SHEET}' sheet")
+    registry = AuthorRegistry() if registry is None else registry
+    attributes = [registry.intern(attribute) for attribute in attributes]
+    authors = [[] for _ in article_ids]
+    for article_id, values in zip(author_ids, _records(author_columns, len(author_ids))):
+        position = positions.get(article_id)
+        if position is None:
+            raise IssueWorkbookError(f"the '{AUTHORS_SHEET}' sheet has an author of article "
+                                     f"{article_id!r}, which is not in '{ARTICLES_SHEET}'")
+        authors[position].append(registry.add_row(attributes, values,
+                                                  f"{source}#{article_id}"))
+    return [IssueArticle(article_id, (journal_rows, list(zip(tags, values)),
+                                      (attributes, article_authors)))
+            for article_id, values, article_authors
+            in zip(article_ids, _records(article_columns, len(article_ids)), authors)]
+
+
+def article_path(output_dir, article_id):
+    """Where convert_issue writes the XML of an article."""
+    return os.path.join(output_dir, *member_name(article_id).split("/"))
+
+
+def _no_progress(stage):
+    pass
+
+
+def convert_issue(source, output_dir=None, combined=None, journal_rows=None,
+                  normalize_fa=False, schema=None, incremental=False, validate=False,
+                  progress=None, complete_dates=False, registry=None):
+    """Convert every article of an issue workbook and report how each went.
+
+    With output_dir each article is written to article_path(output_dir, ID)
+    in the layout named by schema, rebuilding only the changed sections with
+    incremental (see xmlgen.incremental). With combined all articles go into
+    that one <issue> document, as with writer.write_issue. journal_rows and
+    normalize_fa and registry are as for read_issue. With validate an article with a bad
+    identifier fails and is not written (see xmlgen.validate), and with
+    complete_dates its publication dates are completed (see xmlgen.dates).
+    progress is called with "read", then "build" for each article.
+
+    Returns one ConversionResult per article, whose source is
+    "<workbook>#<article ID>"; a workbook that can't be read gives a single
+    failed result instead.
+    """
+    if output_dir is None and combined is None:
+        raise ValueError("convert_issue needs output_dir, combined or both")
+    progress = progress or _no_progress
+    start = time.perf_counter()
+    progress("read")
+    try:
+        articles = read_issue(source, journal_rows, normalize_fa, registry)
+    except Exception as e:
+        return [ConversionResult(source, output_dir or combined, False,
+                                 f"{type(e).__name__}: {e}", time.perf_counter() - start)]
+    layout = load_schema(schema or WORKBOOK_SCHEMA)
+    for path in (output_dir, combined and os.path.dirname(combined)):
+        if path:
+            os.makedirs(path, exist_ok=True)
+    # Every article gets its share of the one read
+    read_seconds = (time.perf_counter() - start) / max(1, len(articles))
+
+    results = []
+    with IssueWriter(combined) if combined else nullcontext() as issue:
+        for article_id, rows in articles:
+            progress("build")
+            started = time.perf_counter()
+            label = f"{source}#{article_id}"
+            output = article_path(output_dir, article_id) if output_dir else combined
+            error, unchanged = None, False
+            try:
+                if complete_dates:
+                    rows = fill_dates(*rows)
+                problems = validate_rows(*rows, source=label) if validate else []
+                if problems:
+                    error = "failed validation: " + "; ".join(map(describe, problems))
+                else:
+                    if output_dir:
+                        os.makedirs(os.path.dirname(output), exist_ok=True)
+                        if incremental:
+                            unchanged = not write_incremental(layout, row_sections(*rows),
+                                                              output).written
+                        else:
+                            write_output(output, layout.render(row_sections(*rows)))
+                    if issue is not None:
+                        issue.write(build_tree(*rows))
+            except Cancelled:
+                raise
+            except Exception as e:
+                error = f"{type(e).__name__}: {e}"
+            results.append(ConversionResult(label, output, error is None, error,
+                                            read_seconds + time.perf_counter() - started,
+                                            unchanged=unchanged))
+    return results
+
+
+def _union(lists):
+    """The names of all lists, in order of first appearance."""
+    return list(dict.fromkeys(name for names in lists for name in names))
+
+
+def pack_workbooks(sources, output, article_ids=None, backend=DEFAULT_BACKEND):
+    """Write TemplateFinal-shaped workbooks into one issue workbook at output.
+
+    article_ids gives each source's article ID; by default it is the
+    workbook's file name without .xlsx. The journal fields are taken from
+    the first workbook and must be the same in all of them. Returns output.
+    """
+    import openpyxl
+
+    sources = list(sources)
+    if article_ids is None:
+        article_ids = [os.path.splitext(os.path.basename(source))[0] for source in sources]
+    if len(set(article_ids)) != len(article_ids):
+        raise IssueWorkbookError("every article needs its own ID")
+    journal_rows, articles, authors = None, [], []
+    for source, article_id in zip(sources, article_ids):
+        journal, article_rows, (attributes, values) = read_workbook(source, backend)
+        if journal_rows is None:
+            journal_rows = journal
+        elif journal != journal_rows:
+            raise IssueWorkbookError(f"{source}: the journal fields differ from those of "
+                                     f"{sources[0]}")
+        article = dict(article_rows)
+        if len(article) != len(article_rows):
+            raise IssueWorkbookError(f"{source}: a tag appears twice on the 'Article' sheet")
+        articles.append((article_id, article))
+        authors.extend((article_id, dict(zip(attributes, author))) for author in values)
+
+    tags = _union(article for _, article in articles)
+    attributes = _union(author for _, author in authors)
+    book = openpyxl.Workbook(write_only=True)
+    sheet = book.create_sheet(JOURNAL_SHEET)
+    sheet.append(["Tag", "Value"])
+    for row in journal_rows or ():
+        sheet.append(list(row))
+    for name, columns, records in ((ARTICLES_SHEET, tags, articles),
+                                   (AUTHORS_SHEET, attributes, authors)):
+        sheet = book.create_sheet(name)
+        sheet.append([ARTICLE_ID] + columns)
+        for article_id, values in records:
+            sheet.append([article_id] + [values.get(column) for column in columns])
+    book.save(output)
+    return output
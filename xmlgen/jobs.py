@@ -0,0 +1,155 @@
+"""Background conversion queue for the Tk apps.
+
+Tk must only be touched from the thread running mainloop, so conversions run
+on one worker thread and report back through a thread-safe queue that the Tk
+thread drains with ``root.after``. A job is a function taking a ``progress``
+keyword argument; it calls ``progress(stage)`` as it enters each of STAGES,
+which is also where a requested cancel takes effect.
+
+Cancelling is cooperative: nothing interrupts a stage that is under way. A
+cancel that arrives during "write", the last stage, is too late and the
+file is still written (the job ends DONE); the same goes for an
+incremental conversion, which reports no stage after "build", and for the
+articles of an issue converted before the cancel.
+
+This module only uses the standard library so the apps can import it while
+their window is still starting up.
+"""
+
+import queue
+import threading
+
+STAGES = ("read", "build", "serialize", "write")
+
+# How often the Tk thread checks for updates while jobs are outstanding
+POLL_MS = 50
+
+QUEUED, RUNNING, DONE, FAILED, CANCELLED = "queued", "running", "done", "failed", "cancelled"
+
+
+class Cancelled(Exception):
+    """Raised from a progress callback once the job has been cancelled."""
+
+
+class Job:
+    """One submitted conversion. state, stage, result and error are only
+    meant to be read from the Tk thread, in the listener."""
+
+    __slots__ = ("name", "func", "args", "state", "stage", "result", "error", "_cancel")
+
+    def __init__(self, name, func, args):
+        self.name = name
+        self.func = func
+        self.args = args
+        self.state = QUEUED
+        self.stage = None
+        self.result = None
+        self.error = None
+        self._cancel = threading.Event()
+
+    @property
+    def cancelled(self):
+        return self._cancel.is_set()
+
+    def cancel(self):
+        self._cancel.set()
+
+    def check(self):
+        if self._cancel.is_set():
+            raise Cancelled(self.name)
+
+    def __repr__(self):
+        return f"Job({self.name!r}, {self.state})"
+
+
+class JobQueue:
+    """Run submitted jobs one after another on a worker thread.
+
+    listener(job, state, stage) is called on the Tk thread for every change:
+    state is one of QUEUED, RUNNING, DONE, FAILED or CANCELLED and stage the
+    STAGES entry the job is in (None until it starts).
+    """
+
+    def __init__(self, root, listener, poll_ms=POLL_MS):
+        self.root = root
+        self.listener = listener
+        self.poll_ms = poll_ms
+        self.jobs = []  # Submitted and not yet finished, oldest first
+        self._pending = queue.Queue()
+        self._updates = queue.Queue()
+        self._worker = None
+        self._polling = False
+
+    def submit(self, name, func, *args):
+        """Queue func(*args, progress=callback) and return its Job."""
+        job = Job(name, func, args)
+        self.jobs.append(job)
+        self._pending.put(job)
+        if self._worker is None:
+            self._worker = threading.Thread(target=self._run, name="xmlgen-jobs", daemon=True)
+            self._worker.start()
+        self._notify(job, QUEUED, None)
+        return job
+
+    def cancel(self, job=None):
+        """Cancel job, or the oldest unfinished job. Returns the job or None."""
+        if job is None:
+            job = self.jobs[0] if self.jobs else None
+        if job is not None:
+            job.cancel()
+        return job
+
+    def cancel_all(self):
+        for job in self.jobs:
+            job.cancel()
+
+    @property
+    def waiting(self):
+        """Number of submitted jobs that have not started yet."""
+        return sum(job.state == QUEUED for job in self.jobs)
+
+    def _run(self):
+        while True:
+            job = self._pending.get()
+            if job.cancelled:
+                self._updates.put((job, CANCELLED, None, None, None))
+                continue
+
+            def progress(stage, job=job):
+                job.check()
+                self._updates.put((job, RUNNING, stage, None, None))
+
+            self._updates.put((job, RUNNING, None, None, None))
+            try:
+                result = job.func(*job.args, progress=progress)
+            except Cancelled:
+                self._updates.put((job, CANCELLED, None, None, None))
+            except Exception as e:
+                self._updates.put((job, FAILED, None, None, f"{type(e).__name__}: {e}"))
+            else:
+                self._updates.put((job, DONE, None, result, None))
+
+    def _notify(self, job, state, stage):
+        self.listener(job, state, stage)
+        if not self._polling:
+            self._polling = True
+            self.root.after(self.poll_ms, self._poll)
+
+    def _poll(self):
+        # Runs on the Tk thread
+        while True:
+            try:
+                job, state, stage, result, error = self._updates.get_nowait()
+            except queue.Empty:
+                break
+            job.state = state
+            if stage is not None:
+                job.stage = stage
+            if state in (DONE, FAILED, CANCELLED):
+                job.result, job.error = result, error
+                self.jobs.remove(job)
+            self.listener(job, state, job.stage)
+        if self.jobs:
+            self.root.after(self.poll_ms, self._poll)
+        else:
+            self._polling = False
@@ -0,0 +1,109 @@
+"""Journal profiles: the journal-level fields of every journal we publish.
+
+Profiles live in ``journals.json`` next to V1.py as a list of objects with
+the form app's journal fields (see model.JOURNAL_FIELDS; missing fields are
+empty) and a ``label`` for menus. A JournalStore indexes them by ISSN,
+online ISSN, short title and label, so a journal can be looked up by any of
+them, with hyphens, spaces and case ignored.
+"""
+
+import json
+import os
+import re
+
+from .model import JOURNAL_FIELD_TAGS, Journal
+
+DEFAULT_PROFILES = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                "journals.json")
+
+
+class JournalStoreError(ValueError):
+    """The profile file is malformed or two profiles claim the same key."""
+
+
+def _normalize(key):
+    return re.sub(r"[\s\-]+", "", key).casefold()
+
+
+class JournalStore:
+    """Journal profiles indexed by ISSN, online ISSN, short title and label."""
+
+    def __init__(self, profiles=(), source=None):
+        self.profiles = []  # (label, Journal) in file order
+        self.source = source
+        self._index = {}  # normalized key -> (label, Journal)
+        self._found = {}  # memoized find() results by the key as given
+        for label, journal in profiles:
+            self.add(label, journal)
+
+    def add(self, label, journal):
+        # One profile may spell the same key twice, e.g. label "JIDS" and short title "Jids"
+        keys = dict.fromkeys(_normalize(key) for key in (
+            journal.journal_id_issn, journal.journal_id_issn_online, journal.short_title, label)
+            if key)
+        for key in filter(None, keys):
+            other = self._index.get(key)
+            if other is not None:
+                raise JournalStoreError(f"{label!r} and {other[0]!r} both use the key {key!r}")
+            self._index[key] = (label, journal)
+        self.profiles.append((label, journal))
+        self._found.clear()
+
+    def find(self, key):
+        """Return (label, Journal) for an ISSN, short title or label, or None."""
+        try:
+            return self._found[key]
+        except KeyError:
+            found = self._found[key] = self._index.get(_normalize(key))
+            return found
+
+    def get(self, key):
+        """Return the Journal for key; raises KeyError if there is none."""
+        found = self.find(key)
+        if found is None:
+            raise KeyError(key)
+        return found[1]
+
+    def __len__(self):
+        return len(self.profiles)
+
+    def __iter__(self):
+        return iter(self.profiles)
+
+    @classmethod
+    def from_file(cls, path):
+        with open(path, encoding="utf-8") as file:
+            data = json.load(file)
+        profiles = []
+        for number, values in enumerate(data.get("journals", []), start=1):
+            values = dict(values)
+            label = values.pop("label", None)
+            try:
+                journal = Journal(**values)
+            except TypeError as e:
+                raise JournalStoreError(f"{path}: journal {number}: {e}") from None
+            profiles.append((label or journal.short_title or f"Journal {number}", journal))
+        return cls(profiles, source=os.path.abspath(path))
+
+
+_stores = {}
+
+
+def load_store(path=DEFAULT_PROFILES):
+    """Return the JournalStore for path, re-reading it only when it changes."""
+    path = os.path.abspath(path)
+    stamp = os.stat(path).st_mtime_ns
+    cached = _stores.get(path)
+    if cached is None or cached[0] != stamp:
+        cached = _stores[path] = (stamp, JournalStore.from_file(path))
+    return cached[1]
+
+
+def journal_rows(journal):
+    """The (tag, value) rows a workbook's 'Journal' sheet would hold for journal.
+
+    Every field is included, Journal_Title too, although a workbook loses it
+    as the header row of the sheet: the XML then holds the whole profile and
+    imports back into the same Journal. Empty fields become empty cells.
+    """
+    return [(tag, getattr(journal, field) or None) for field, tag in JOURNAL_FIELD_TAGS.items()]
@@ -0,0 +1,25 @@
+"""Latency figures for the stats of the watch daemon and the HTTP service.
+
+Both keep their last LATENCY_WINDOW latencies in a deque and report them
+with latency_summary(). No conversion dependencies are imported here.
+"""
+
+# Latencies kept for the percentiles
+LATENCY_WINDOW = 1000
+
+
+def percentile(ordered, fraction):
+    """The value at fraction (0-1) of the sorted list ordered, or None if empty."""
+    if not ordered:
+        return None
+    return round(ordered[min(len(ordered) - 1, int(len(ordered) * fraction))], 3)
+
+
+def latency_summary(latencies, fractions=(0.5, 0.95)):
+    """Mean, percentiles (as "p50", "p95", ...) and max of latencies in seconds."""
+    ordered = sorted(latencies)
+    summary = {"mean": round(sum(ordered) / len(ordered), 3) if ordered else None}
+    for fraction in fractions:
+        summary[f"p{round(fraction * 100)}"] = percentile(ordered, fraction)
+    summary["max"] = round(ordered[-1], 3) if ordered else None
+    return summary
@@ -0,0 +1,195 @@
+"""Data model behind the form app (V1.py).
+
+The records hold plain strings (and a bool for ``coreauthor``) so an article
+can be filled, defaulted, cleared and turned into XML without any Tk
+widgets. The form app binds its widgets to these records; batch code builds
+them directly, e.g. from JSON with ArticleForm.from_dict.
+"""
+
+import os
+
+from .incremental import write_incremental
+from .pretty import DEFAULT_PRETTY_METHOD, pretty_xml
+from .schema import FORM_SCHEMA, form_sections, load_schema
+
+JOURNAL_FIELDS = (
+    "title", "title_fa", "short_title", "subject", "web_url",
+    "journal_hbi_system_id", "journal_hbi_system_user",
+    "journal_id_issn", "journal_id_issn_online", "journal_id_pii", "journal_id_doi",
+    "journal_id_iranmedex", "journal_id_magiran", "journal_id_sid", "journal_id_nlai",
+    "journal_id_science", "language", "volume", "number",
+)
+PUBDATE_FIELDS = ("type", "year", "month", "day")
+ARTICLE_FIELDS = (
+    "article_title", "article_title_fa", "subject_fa", "subject",
+    "content_type_fa", "content_type", "start_page", "end_page", "web_url",
+    "keywords", "keywords_fa", "abstract", "abstract_fa",
+)
+AUTHOR_FIELDS = (
+    "first_name", "middle_name", "last_name", "suffix",
+    "first_name_fa", "middle_name_fa", "last_name_fa", "suffix_fa",
+    "email", "code", "orcid", "coreauthor", "affiliation", "affiliation_fa",
+)
+
+# Tag rows of the V2 workbook (TemplateFinal.xlsx plus the abstracts); the
+# first row of each sheet is its header
+JOURNAL_TAGS = (
+    "Journal_Title", "Journal_Title_FA", "Short_Title", "Subject", "Web_URL",
+    "Journal_HBI_System_ID", "Journal_HBI_System_User", "Journal_ISSN", "Journal_ISSN_Online",
+    "Journal_ID_PII", "Journal_DOI", "Journal_ID_IranMedex", "Journal_ID_Magiran",
+    "Journal_ID_SID", "Journal_ID_NLAI", "Journal_ID_Science", "Language", "Volume", "Number",
+)
+ARTICLE_TAGS = (
+    "Article_Title", "Articl_Title_FA", "Subject", "Subject_FA", "Content_Type",
+    "Content_Type_FA", "Start_Page", "End_Page", "Web_URL", "Keywords", "Keywords_FA",
+    "Abstract", "Abstract_FA",
+)
+AUTHOR_TAGS = (
+    "First_Name", "Middle_Name", "Last_Name", "Suffix",
+    "First_Name_FA", "Middle_Name_FA", "Last_Name_FA", "Suffix_FA",
+    "Email", "Code", "ORCID", "Core_Author_Yes_No", "Affiliation", "Affiliation_FA",
+)
+
+# Form field -> workbook tag
+JOURNAL_FIELD_TAGS = dict(zip(JOURNAL_FIELDS, JOURNAL_TAGS))
+ARTICLE_FIELD_TAGS = dict(zip(ARTICLE_FIELDS, (
+    "Article_Title", "Articl_Title_FA", "Subject_FA", "Subject", "Content_Type_FA",
+    "Content_Type", "Start_Page", "End_Page", "Web_URL", "Keywords", "Keywords_FA",
+    "Abstract", "Abstract_FA",
+)))
+AUTHOR_FIELD_TAGS = dict(zip(AUTHOR_FIELDS, AUTHOR_TAGS))
+
+
+class Record:
+    """Base for the fixed-field records; subclasses set FIELDS and __slots__."""
+
+    __slots__ = ()
+    FIELDS = ()
+
+    def __init__(self, **values):
+        for field in self.FIELDS:
+            setattr(self, field, values.pop(field, self.default(field)))
+        if values:
+            raise TypeError(f"{type(self).__name__} has no field(s) {', '.join(values)}")
+
+    def default(self, field):
+        return ""
+
+    def clear(self):
+        for field in self.FIELDS:
+            setattr(self, field, self.default(field))
+
+    def update(self, values):
+        for field, value in values.items():
+            if field not in self.FIELDS:
+                raise KeyError(field)
+            setattr(self, field, value)
+
+    def to_dict(self):
+        return {field: getattr(self, field) for field in self.FIELDS}
+
+    def copy(self):
+        return type(self)(**self.to_dict())
+
+    def __eq__(self, other):
+        return type(self) is type(other) and self.to_dict() == other.to_dict()
+
+    def __repr__(self):
+        values = ", ".join(f"{field}={getattr(self, field)!r}" for field in self.FIELDS
+                           if getattr(self, field) != self.default(field))
+        return f"{type(self).__name__}({values})"
+
+
+class Journal(Record):
+    __slots__ = FIELDS = JOURNAL_FIELDS
+
+
+class PubDate(Record):
+    __slots__ = FIELDS = PUBDATE_FIELDS
+
+
+class Article(Record):
+    __slots__ = FIELDS = ARTICLE_FIELDS
+
+
+class Author(Record):
+    __slots__ = FIELDS = AUTHOR_FIELDS
+
+    def default(self, field):
+        return False if field == "coreauthor" else ""
+
+
+class ArticleForm:
+    """Everything one save of the form app turns into XML."""
+
+    __slots__ = ("journal", "pub_dates", "article", "authors")
+
+    def __init__(self, journal=None, pub_dates=None, article=None, authors=None):
+        self.journal = journal or Journal()
+        self.pub_dates = pub_dates or []
+        self.article = article or Article()
+        self.authors = authors or []
+
+    def clear(self):
+        """Reset the journal, article and author fields; publication dates stay."""
+        self.journal.clear()
+        self.article.clear()
+        self.authors.clear()
+
+    def copy(self):
+        return ArticleForm(self.journal.copy(), [date.copy() for date in self.pub_dates],
+                           self.article.copy(), [author.copy() for author in self.authors])
+
+    def to_dict(self):
+        return {
+            "journal": self.journal.to_dict(),
+            "pub_dates": [date.to_dict() for date in self.pub_dates],
+            "article": self.article.to_dict(),
+            "authors": [author.to_dict() for author in self.authors],
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(Journal(**data.get("journal", {})),
+                   [PubDate(**date) for date in data.get("pub_dates", [])],
+                   Article(**data.get("article", {})),
+                   [Author(**author) for author in data.get("authors", [])])
+
+
+def build_form_tree(form):
+    """Build the form app's <journal> element tree for form (schemas/v1.json)."""
+    return load_schema(FORM_SCHEMA).build(form_sections(form))
+
+
+def form_xml(form, method=DEFAULT_PRETTY_METHOD):
+    """Return the indented XML document for form as a string."""
+    return pretty_xml(build_form_tree(form), method)
+
+
+def save_form(form, path, method=DEFAULT_PRETTY_METHOD, progress=None, incremental=False):
+    """Write the XML document for form to path.
+
+    progress, if given, is called with "build", "serialize" and "write" as
+    each stage starts (see xmlgen.jobs). With incremental only the sections
+    that changed since the last save to path are rebuilt, see
+    xmlgen.incremental.
+    """
+    if progress:
+        progress("build")
+    if incremental:
+        write_incremental(load_schema(FORM_SCHEMA), form_sections(form), path, method,
+                          newline=os.linesep)
+        return path
+    root = build_form_tree(form)
+    if progress:
+        progress("serialize")
+    xml = pretty_xml(root, method)
+    if progress:
+        progress("write")
+    with open(path, "w", encoding="utf-8") as file:
+        file.write(xml)
+    return path
+
+
+def default_file_name(form):
+    return form.article.article_title or "Untitled_Article"
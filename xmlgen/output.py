@@ -0,0 +1,26 @@
+"""Writing output files atomically.
+
+Kept free of the conversion dependencies, so the form app and the author
+registry can use it without loading lxml or the workbook readers.
+"""
+
+import os
+
+
+def temp_path(path):
+    """A hidden file next to path to write it in before os.replace()."""
+    directory, name = os.path.split(path)
+    return os.path.join(directory, f".{name}.{os.getpid()}.tmp")
+
+
+def write_output(path, data):
+    """Write data to path atomically, so readers never see a partial file."""
+    partial = temp_path(path)
+    try:
+        with open(partial, "wb") as file:
+            file.write(data)
+        os.replace(partial, path)
+    except BaseException:
+        if os.path.exists(partial):
+            os.unlink(partial)
+        raise
@@ -0,0 +1,145 @@
+"""Normalize the Persian (``_fa``) fields before they go into XML.
+
+Submissions mix Arabic and Persian code points for the same letters, carry
+stray zero-width non-joiners (ZWNJ) and odd spaces, and write numbers with
+Arabic-Indic digits, so indexers see one title as several strings.
+normalize() makes them one:
+
+* Arabic yeh (ي, ى) and kaf (ك) become Persian yeh (ی) and keheh (ک),
+* Arabic-Indic digits (٠-٩) become Persian digits (۰-۹),
+* no-break and other Unicode spaces and tabs become plain spaces, and runs
+  of them one space; a byte order mark is dropped,
+* runs of ZWNJ become one, and a ZWNJ next to a space or at the start or
+  end of a line is dropped.
+
+The replacement table and regexes are built once, at import. Only fields
+whose name ends in ``_fa`` (``_FA`` for workbook tags) are touched.
+Characters are replaced with str.replace, skipped when absent, rather than
+str.translate, which is several times slower on Persian text; the regexes
+can only start matching at a space or ZWNJ. ``python -m xmlgen.bench
+persian`` compares the variants.
+
+normalize_rows() works on what read_workbook returns, a column at a time:
+the short Persian values of a sheet are joined into strings of up to CHUNK
+characters, normalized a string at a time and split again, so a sheet of
+names costs a few calls instead of one per cell. Values longer than
+JOIN_LIMIT, abstracts say, gain nothing from joining and go on their own,
+as does a value that holds the separator itself.
+"""
+
+import re
+
+# Joins the values of a column; XML cannot hold it, so cells rarely do
+SEPARATOR = "\x1e"
+# Characters joined per pass
+CHUNK = 64 * 1024
+# Values at least this long are normalized on their own
+JOIN_LIMIT = 1024
+
+_CHARACTERS = {
+    "ي": "ی",  # ARABIC LETTER YEH
+    "ى": "ی",  # ARABIC LETTER ALEF MAKSURA
+    "ك": "ک",  # ARABIC LETTER KAF
+    "\ufeff": None,  # BYTE ORDER MARK
+    "\t": " ",
+    "\u00a0": " ",
+    "\u202f": " ",
+    "\u205f": " ",
+    "\u3000": " ",
+}
+_CHARACTERS.update((chr(code), " ") for code in range(0x2000, 0x200b))  # EN QUAD .. HAIR SPACE
+_CHARACTERS.update((chr(0x0660 + digit), chr(0x06f0 + digit)) for digit in range(10))
+REPLACEMENTS = tuple((old, new or "") for old, new in _CHARACTERS.items())
+
+# Any run of spaces and ZWNJs with a space in it is one space
+_GAPS = re.compile(r"(?:\u200c+ | )[ \u200c]*")
+_ZWNJS = re.compile(r"\u200c{2,}")
+# Spaces and ZWNJs at the end or start of a line
+_EDGES = re.compile(r"[ \u200c]+(?=\n)|(?<=\n)[ \u200c]+")
+_TRIM = " \u200c"
+
+
+def is_persian_field(name):
+    return isinstance(name, str) and name.lower().endswith("_fa")
+
+
+def normalize(text):
+    """text with its Persian letters, digits, spaces and ZWNJs normalized.
+    Values that are not strings (numbers, None) are returned as they are."""
+    if not isinstance(text, str):
+        return text
+    for old, new in REPLACEMENTS:
+        if old in text:
+            text = text.replace(old, new)
+    text = _GAPS.sub(" ", text)
+    if "\u200c\u200c" in text:
+        text = _ZWNJS.sub("\u200c", text)
+    if "\n" in text:
+        text = _EDGES.sub("", text)
+    return text.strip(_TRIM)
+
+
+def normalize_column(values):
+    """normalize() every value of a column in one pass; returns a list.
+    Values left empty become None, i.e. empty cells."""
+    values = list(values)
+    chunk, size = [], 0
+    for index, value in enumerate(values):
+        if not isinstance(value, str):
+            continue
+        if len(value) >= JOIN_LIMIT or SEPARATOR in value:
+            values[index] = normalize(value) or None
+            continue
+        chunk.append(index)
+        size += len(value) + 1
+        if size >= CHUNK:
+            _normalize_chunk(values, chunk)
+            chunk, size = [], 0
+    if chunk:
+        _normalize_chunk(values, chunk)
+    return values
+
+
+def _normalize_chunk(values, indexes):
+    joined = normalize(SEPARATOR.join(values[index] for index in indexes))
+    for index, value in zip(indexes, joined.split(SEPARATOR)):
+        values[index] = value.strip(_TRIM) or None
+
+
+def normalize_pairs(rows):
+    """Normalize the values of the _FA rows of a key/value sheet."""
+    rows = list(rows)
+    indexes = [index for index, (tag, _) in enumerate(rows) if is_persian_field(tag)]
+    for index, value in zip(indexes, normalize_column(rows[index][1] for index in indexes)):
+        rows[index] = (rows[index][0], value)
+    return rows
+
+
+def normalize_authors(author_table):
+    """Normalize the _FA attributes of every author in a read_workbook()
+    author table, all authors' values in one pass."""
+    attributes, authors = author_table
+    columns = [index for index, attribute in enumerate(attributes) if is_persian_field(attribute)]
+    if not columns or not authors:
+        return attributes, list(authors)
+    authors = [list(values) for values in authors]
+    cells = [(author, index) for author in authors for index in columns if index < len(author)]
+    for (author, index), value in zip(cells, normalize_column(author[index]
+                                                              for author, index in cells)):
+        author[index] = value
+    return attributes, [tuple(values) for values in authors]
+
+
+def normalize_rows(journal_rows, article_rows, author_table):
+    """normalize the Persian fields of what read_workbook returns."""
+    return (normalize_pairs(journal_rows), normalize_pairs(article_rows),
+            normalize_authors(author_table))
+
+
+def normalize_form(form):
+    """Normalize the _fa fields of an ArticleForm in place and return it."""
+    for record in [form.journal, form.article] + list(form.authors):
+        for field in record.FIELDS:
+            if is_persian_field(field):
+                setattr(record, field, normalize(getattr(record, field)))
+    return form
@@ -0,0 +1,18 @@
+"""Feeding a process pool without queueing the whole batch.
+
+Kept free of the conversion dependencies, so the validation pass can use it
+without loading lxml or the converter.
+"""
+
+from collections import deque
+
+
+def bounded_map(executor, func, items, window):
+    """Like executor.map, but keep at most window results waiting at a time."""
+    pending = deque()
+    for item in items:
+        pending.append(executor.submit(func, item))
+        if len(pending) >= window:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
@@ -0,0 +1,27 @@
+"""Pretty-printing for the xml.etree trees built by the form app (V1.py).
+
+``minidom`` is the original behaviour and the default: serialize, re-parse
+into a DOM and let ``toprettyxml`` indent it, which costs a second full
+document in memory. ``indent`` indents the existing tree in place with
+``ET.indent`` and serializes it once. Both produce the same document apart
+from insignificant whitespace and the spelling of empty elements, which
+``indent`` writes as ``<x />`` rather than ``<x/>``.
+"""
+
+import xml.etree.ElementTree as ET
+
+PRETTY_METHODS = ("minidom", "indent")
+DEFAULT_PRETTY_METHOD = "minidom"
+
+INDENT = "   "
+
+
+def pretty_xml(root, method=DEFAULT_PRETTY_METHOD, indent=INDENT):
+    """Return root as an indented XML document string."""
+    if method == "minidom":
+        from xml.dom import minidom
+        return minidom.parseString(ET.tostring(root)).toprettyxml(indent=indent)
+    if method != "indent":
+        raise ValueError(f"Unknown pretty-print method {method!r}, expected one of {PRETTY_METHODS}")
+    ET.indent(root, space=indent)
+    return '<?xml version="1.0" ?>\n' + ET.tostring(root, encoding="unicode") + "\n"
@@ -0,0 +1,183 @@
+"""Per-stage timing and optional profiling of conversions.
+
+Both generators already report their stages (read, build, serialize, write)
+through a progress callback, see xmlgen.jobs. A StageTimer is such a
+callback: it times each stage until the next one starts, so wrapping a
+conversion in profile_call is all it takes to get
+
+* one JSON line per conversion in a timing log, with wall time, CPU time
+  and peak memory per stage and for the whole file,
+* optionally a cProfile dump per conversion (open with ``python -m pstats``
+  or snakeviz),
+* optionally tracemalloc peaks per stage instead of only the process's
+  peak RSS.
+
+The log is opened in append mode and each line goes out in one write, so
+several worker processes can share it.
+"""
+
+import itertools
+import json
+import os
+import re
+import sys
+import time
+import tracemalloc
+from collections import namedtuple
+from contextlib import contextmanager
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+TIMINGS_FLAG = "--timings"
+PROFILE_FLAG = "--profile"
+TRACE_MEMORY_FLAG = "--trace-memory"
+
+# log: JSON-lines file to append to; profile_dir: where .prof files go;
+# trace_memory: measure per-stage peaks with tracemalloc (slower)
+ProfileOptions = namedtuple("ProfileOptions", "log profile_dir trace_memory",
+                            defaults=(None, None, False))
+
+_dumps = itertools.count()
+
+
+def _peak_rss_kib():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes
+    return peak // 1024 if sys.platform == "darwin" else peak
+
+
+class StageTimer:
+    """Progress callback that times each stage until the next one starts.
+
+    forward, if given, is called with every stage afterwards, so a timer
+    can sit between a conversion and the Tk job queue.
+    """
+
+    def __init__(self, trace_memory=False, forward=None):
+        self.trace_memory = trace_memory
+        self.forward = forward
+        self.stages = []  # dicts in the order the stages ran
+        self._current = None
+
+    def __call__(self, stage):
+        self._close()
+        self._open(stage)
+        if self.forward is not None:
+            self.forward(stage)
+
+    @contextmanager
+    def span(self, name):
+        """Time the enclosed block as stage name."""
+        self(name)
+        try:
+            yield
+        finally:
+            self._close()
+
+    def _open(self, stage):
+        if self.trace_memory and tracemalloc.is_tracing():
+            tracemalloc.reset_peak()
+        self._current = (stage, time.perf_counter(), time.process_time())
+
+    def _close(self):
+        if self._current is None:
+            return
+        stage, wall, cpu = self._current
+        record = {"stage": stage, "wall_s": round(time.perf_counter() - wall, 6),
+                  "cpu_s": round(time.process_time() - cpu, 6)}
+        if self.trace_memory and tracemalloc.is_tracing():
+            record["peak_kib"] = round(tracemalloc.get_traced_memory()[1] / 1024, 1)
+        self.stages.append(record)
+        self._current = None
+
+    def finish(self):
+        self._close()
+        return self.stages
+
+
+def _dump_name(label):
+    name = re.sub(r"[^\w.-]+", "_", os.path.basename(str(label)))
+    return f"{name}-{os.getpid()}-{next(_dumps)}.prof"
+
+
+def write_timing(log, record):
+    """Append record to the JSON-lines file log in a single write."""
+    line = (json.dumps(record, ensure_ascii=False) + "\n").encode("utf-8")
+    handle = os.open(log, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+    try:
+        os.write(handle, line)
+    finally:
+        os.close(handle)
+
+
+def profile_call(func, *args, options, label, progress=None, **kwargs):
+    """Call func(*args, progress=timer, **kwargs) and record its stage timings.
+
+    The record for label is appended to options.log; with options.profile_dir
+    the call also runs under cProfile. Returns what func returns.
+    """
+    timer = StageTimer(options.trace_memory, forward=progress)
+    profiler = None
+    if options.profile_dir:
+        import cProfile  # Only needed when profiling
+        profiler = cProfile.Profile()
+    started_tracing = options.trace_memory and not tracemalloc.is_tracing()
+    if started_tracing:
+        tracemalloc.start()
+
+    wall, cpu = time.perf_counter(), time.process_time()
+    error = None
+    try:
+        if profiler is not None:
+            profiler.enable()
+        try:
+            result = func(*args, progress=timer, **kwargs)
+        except BaseException as e:
+            error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            if profiler is not None:
+                profiler.disable()
+        # convert_file reports failures in its result instead of raising
+        if getattr(result, "ok", True) is False:
+            error = result.error
+        return result
+    finally:
+        record = {"time": time.time(), "file": str(label), "pid": os.getpid(),
+                  "wall_s": round(time.perf_counter() - wall, 6),
+                  "cpu_s": round(time.process_time() - cpu, 6),
+                  "stages": timer.finish()}
+        if started_tracing:
+            # Each stage resets the peak, so the file's peak is the largest of theirs
+            peaks = [stage["peak_kib"] for stage in record["stages"]]
+            peaks.append(round(tracemalloc.get_traced_memory()[1] / 1024, 1))
+            record["peak_kib"] = max(peaks)
+            tracemalloc.stop()
+        record["peak_rss_kib"] = _peak_rss_kib()
+        if error is not None:
+            record["error"] = error
+        if profiler is not None:
+            os.makedirs(options.profile_dir, exist_ok=True)
+            record["profile"] = os.path.join(options.profile_dir, _dump_name(label))
+            profiler.dump_stats(record["profile"])
+        if options.log:
+            write_timing(options.log, record)
+
+
+def options_from_argv(argv=None):
+    """ProfileOptions from --timings=FILE, --profile=DIR and --trace-memory in
+    the apps' command line, or None if none of them was given."""
+    values = {}
+    for arg in sys.argv[1:] if argv is None else argv:
+        if arg.startswith(TIMINGS_FLAG + "="):
+            values["log"] = arg.split("=", 1)[1]
+        elif arg.startswith(PROFILE_FLAG + "="):
+            values["profile_dir"] = arg.split("=", 1)[1]
+        elif arg == TRACE_MEMORY_FLAG:
+            values["trace_memory"] = True
+    return ProfileOptions(**values) if values else None
@@ -0,0 +1,148 @@
+"""Workbook reader backends.
+
+Both backends follow pandas' default ``header=0`` reading of the sheets: the
+first row of every sheet is a header row and is not converted, rows without
+a tag name are skipped, and empty cells come back as None.
+
+* ``openpyxl`` (default) streams the cells in read-only mode and hands
+  (tag, value) pairs straight to the XML builder without building any
+  intermediate table. Values keep the type of their cell.
+* ``pandas`` parses each sheet into a DataFrame first. It is kept as a
+  fallback and is only imported when selected; numeric columns with empty
+  cells come back as floats, as they always have.
+"""
+
+import openpyxl
+
+JOURNAL_SHEET = "Journal"
+ARTICLE_SHEET = "Article"
+AUTHOR_SHEET = "Author(s)"
+
+BACKENDS = ("openpyxl", "pandas")
+DEFAULT_BACKEND = "openpyxl"
+
+
+def _is_empty(value):
+    return value is None or value == ""
+
+
+class StreamingWorkbook:
+    """Read-only view of a workbook that yields cells as they are parsed.
+
+    Use as a context manager so the underlying zip file is closed again; the
+    generators returned by pairs() are only valid while the workbook is open.
+    """
+
+    def __init__(self, source):
+        self._book = openpyxl.load_workbook(source, read_only=True, data_only=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        self._book.close()
+
+    @property
+    def sheetnames(self):
+        return self._book.sheetnames
+
+    def pairs(self, sheet):
+        """Yield (tag, value) for each row of a key/value sheet."""
+        for row in self._book[sheet].iter_rows(min_row=2, max_col=2, values_only=True):
+            if not row or _is_empty(row[0]):
+                continue
+            yield row[0], (row[1] if len(row) > 1 else None)
+
+    def table(self, sheet):
+        """Return (names, columns) for a sheet with one record per row.
+
+        names are the header row's non-empty cells and columns holds one list
+        of values per name, with a value for every row that fills any of them.
+        """
+        rows = self._book[sheet].iter_rows(values_only=True)
+        header = next(rows, ())
+        named = [index for index, name in enumerate(header) if not _is_empty(name)]
+        width = named[-1] + 1 if named else 0
+        records = [row + (None,) * (width - len(row)) for row in rows
+                   if any(not _is_empty(row[index]) for index in named if index < len(row))]
+        columns = [[row[index] for row in records] for index in named]
+        return [header[index] for index in named], columns
+
+    def author_table(self):
+        """Return (attributes, authors) for the 'Author(s)' sheet.
+
+        attributes lists the tag names from the first column and authors holds
+        one tuple of values per author column.
+        """
+        rows = self._book[AUTHOR_SHEET].iter_rows(values_only=True)
+        header = next(rows, ())
+        # Like pandas, a column counts as an author if any row reaches it
+        width = _last_filled(header)
+        records = []
+        for row in rows:
+            width = max(width, _last_filled(row))
+            if row and not _is_empty(row[0]):
+                records.append(row)
+        if not records:
+            return [], [() for _ in range(1, width)]
+
+        # Pad ragged rows, then transpose rows of attributes into author records
+        columns = list(zip(*(row + (None,) * (width - len(row)) for row in records)))
+        return list(columns[0]), columns[1:width]
+
+
+def _last_filled(row):
+    for index in range(len(row) - 1, -1, -1):
+        if row[index] is not None:
+            return index + 1
+    return 0
+
+
+def _read_pandas(source):
+    try:
+        import pandas as pd
+    except ImportError:
+        raise ImportError("The pandas reader backend needs pandas installed") from None
+
+    def value(cell):
+        return None if pd.isna(cell) else cell
+
+    xl = pd.ExcelFile(source)
+    try:
+        journal_df = xl.parse(JOURNAL_SHEET)
+        article_df = xl.parse(ARTICLE_SHEET)
+        author_df = xl.parse(AUTHOR_SHEET)
+    finally:
+        xl.close()
+
+    journal_rows = [(row.iloc[0], value(row.iloc[1])) for _, row in journal_df.iterrows()
+                    if pd.notna(row.iloc[0])]
+    article_rows = [(row.iloc[0], value(row.iloc[1])) for _, row in article_df.iterrows()
+                    if pd.notna(row.iloc[0])]
+
+    # One array for the whole sheet: rows are attributes, columns are authors
+    cells = author_df.to_numpy(dtype=object)
+    cells = cells[pd.notna(cells[:, 0])]
+    cells[pd.isna(cells)] = None
+    attributes = cells[:, 0].tolist()
+    authors = [tuple(values) for values in cells[:, 1:].T.tolist()]
+    return journal_rows, article_rows, (attributes, authors)
+
+
+def read_workbook(source, backend=DEFAULT_BACKEND):
+    """Read a workbook into (journal_rows, article_rows, (attributes, authors)).
+
+    journal_rows and article_rows are lists of (tag, value) pairs. attributes
+    is the list of author tag names and authors holds one tuple of values per
+    author column. source is a path or a binary file object.
+    """
+    if backend == "pandas":
+        return _read_pandas(source)
+    if backend != "openpyxl":
+        raise ValueError(f"Unknown reader backend {backend!r}, expected one of {BACKENDS}")
+    with StreamingWorkbook(source) as book:
+        return (list(book.pairs(JOURNAL_SHEET)), list(book.pairs(ARTICLE_SHEET)),
+                book.author_table())
@@ -0,0 +1,299 @@
+"""Output layouts defined by schema files and compiled into emitters.
+
+Both apps turn the same sections into XML: the journal fields, the
+publication dates, the article fields and the authors. Only the layout
+differs. A schema file describes one layout as JSON:
+
+    {
+      "root": "article",
+      "library": "lxml",
+      "empty": " ",
+      "body": [
+        {"section": "journal", "element": "journal"},
+        {"section": "article", "element": "article_info"},
+        {"section": "authors", "element": "author_list", "item": "author"}
+      ]
+    }
+
+* ``root`` is the document element; ``body`` fills it, in order.
+* ``section`` is one of SECTIONS. Its fields go into ``element`` if given,
+  else straight into the parent. With ``item``, the section is a list of
+  records (pub_dates, authors), each one an ``item`` element.
+* ``fields`` optionally picks the fields to write, in order, as names or
+  ``[element, field]`` pairs to rename them; without it every field is
+  written under its own name: the form's field names for forms, the
+  workbook tags for workbooks.
+* ``empty`` is the text of empty fields, ``booleans`` the text for true
+  and false (the core author field of forms).
+* ``library`` is ``etree`` (xml.etree, indented like the form app) or
+  ``lxml`` (indented like the workbook converter).
+
+load_schema() compiles a schema once into a Schema whose build() is a
+chain of closures picked per node at compile time, so emitting a document
+is plain loops over the sections with no lookups in the schema. The
+bundled ``v1`` and ``v2`` schemas in xmlgen/schemas are the two apps'
+layouts; a new layout is a new file, named by its path.
+"""
+
+import hashlib
+import json
+import os
+import re
+from operator import attrgetter
+
+from .pretty import DEFAULT_PRETTY_METHOD, pretty_xml
+
+SCHEMA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "schemas")
+FORM_SCHEMA = "v1"
+WORKBOOK_SCHEMA = "v2"
+
+SECTIONS = ("journal", "pub_dates", "article", "authors")
+LIBRARIES = ("etree", "lxml")
+_SCHEMA_KEYS = {"description", "root", "library", "empty", "booleans", "body"}
+_NODE_KEYS = {"section", "element", "item", "fields"}
+
+# XML 1.0 element names without namespaces
+_NAME_START = ("A-Z_a-z\u00c0-\u00d6\u00d8-\u00f6\u00f8-\u02ff\u0370-\u037d\u037f-\u1fff"
+               "\u200c-\u200d\u2070-\u218f\u2c00-\u2fef\u3001-\ud7ff\uf900-\ufdcf\ufdf0-\ufffd")
+_NAME_CHAR = _NAME_START + "\\-.0-9\u00b7\u0300-\u036f\u203f-\u2040"
+XML_NAME = re.compile(f"[{_NAME_START}][{_NAME_CHAR}]*\\Z")
+
+
+class SchemaError(ValueError):
+    """A schema file does not describe a layout."""
+
+
+# Record class -> getter of all its field values at once
+_getters = {}
+
+
+def _pairs(record):
+    cls = type(record)
+    getter = _getters.get(cls)
+    if getter is None:
+        getter = _getters[cls] = attrgetter(*cls.FIELDS)
+    return zip(cls.FIELDS, getter(record))
+
+
+def form_sections(form):
+    """The sections of an ArticleForm: (field, value) pairs per record."""
+    return {
+        "journal": _pairs(form.journal),
+        "pub_dates": [_pairs(date) for date in form.pub_dates],
+        "article": _pairs(form.article),
+        "authors": [_pairs(author) for author in form.authors],
+    }
+
+
+def row_sections(journal_rows, article_rows, author_table):
+    """The sections of what read_workbook returns: (tag, value) pairs."""
+    attributes, authors = author_table
+    return {
+        "journal": journal_rows,
+        "article": article_rows,
+        "authors": (zip(attributes, values) for values in authors),
+    }
+
+
+def _text_function(empty, booleans):
+    if booleans is None:
+        def text(value):
+            return empty if value is None else str(value)
+    else:
+        true, false = booleans
+
+        def text(value):
+            if value is None:
+                return empty
+            if value is True:
+                return true
+            if value is False:
+                return false
+            return str(value)
+    return text
+
+
+def _fill_function(fields, SubElement, text):
+    """fill(parent, pairs): one child of parent per field."""
+    # Most values are already text, so text() is only called for the others
+    if fields is None:
+        def fill(parent, pairs):
+            for name, value in pairs:
+                SubElement(parent, name).text = value if type(value) is str else text(value)
+    else:
+        def fill(parent, pairs):
+            values = dict(pairs)
+            for element, field in fields:
+                value = values.get(field)
+                SubElement(parent, element).text = value if type(value) is str else text(value)
+    return fill
+
+
+def _node_function(node, fill, SubElement):
+    """emit(parent, sections) for one body node; the variant is picked here,
+    once, rather than on every document."""
+    section, element, item = node["section"], node.get("element"), node.get("item")
+    if item is None and element is None:
+        def emit(parent, sections):
+            fill(parent, sections.get(section, ()))
+    elif item is None:
+        def emit(parent, sections):
+            fill(SubElement(parent, element), sections.get(section, ()))
+    elif element is None:
+        def emit(parent, sections):
+            for record in sections.get(section, ()):
+                fill(SubElement(parent, item), record)
+    else:
+        def emit(parent, sections):
+            wrapper = SubElement(parent, element)
+            for record in sections.get(section, ()):
+                fill(SubElement(wrapper, item), record)
+    return emit
+
+
+def _check_name(name, where, errors):
+    if not isinstance(name, str) or not XML_NAME.match(name):
+        errors.append(f"{where}: {name!r} is not a valid XML element name")
+
+
+def _check(data):
+    """The problems in schema data, as a list of messages."""
+    if not isinstance(data, dict):
+        return ["a schema is a JSON object"]
+    errors = [f"unknown key {key!r}" for key in data if key not in _SCHEMA_KEYS]
+    _check_name(data.get("root"), "root", errors)
+    if data.get("library", "etree") not in LIBRARIES:
+        errors.append(f"library must be one of {', '.join(LIBRARIES)}")
+    if not isinstance(data.get("empty", ""), str):
+        errors.append("empty must be a string")
+    booleans = data.get("booleans")
+    if booleans is not None and not (isinstance(booleans, list) and len(booleans) == 2
+                                     and all(isinstance(text, str) for text in booleans)):
+        errors.append("booleans must be two strings, for true and false")
+    body = data.get("body")
+    if not isinstance(body, list):
+        return errors + ["body must be a list of nodes"]
+    for number, node in enumerate(body, 1):
+        where = f"body node {number}"
+        if not isinstance(node, dict):
+            errors.append(f"{where}: not an object")
+            continue
+        errors.extend(f"{where}: unknown key {key!r}" for key in node if key not in _NODE_KEYS)
+        if node.get("section") not in SECTIONS:
+            errors.append(f"{where}: section must be one of {', '.join(SECTIONS)}")
+        for key in ("element", "item"):
+            if key in node:
+                _check_name(node[key], f"{where} {key}", errors)
+        fields = node.get("fields")
+        if fields is not None:
+            if not isinstance(fields, list):
+                errors.append(f"{where}: fields must be a list")
+                continue
+            for field in fields:
+                if isinstance(field, list) and len(field) == 2 and isinstance(field[1], str):
+                    _check_name(field[0], f"{where} fields", errors)
+                elif isinstance(field, str):
+                    _check_name(field, f"{where} fields", errors)
+                else:
+                    errors.append(f"{where}: {field!r} is not a name or an [element, field] pair")
+    return errors
+
+
+class Schema:
+    """A compiled layout; build(sections) returns the document element."""
+
+    def __init__(self, data, source=None):
+        errors = _check(data)
+        if errors:
+            raise SchemaError(f"{source or 'schema'}: " + "; ".join(errors))
+        self.source = source
+        self.root = data["root"]
+        self.library = data.get("library", "etree")
+        self.description = data.get("description", "")
+        self.fingerprint = hashlib.sha256(
+            json.dumps(data, sort_keys=True, ensure_ascii=False).encode("utf-8")).hexdigest()
+        if self.library == "lxml":
+            from lxml import etree  # The form app's layout does without lxml
+        else:
+            import xml.etree.ElementTree as etree
+        self.etree = etree
+        self.nodes = []  # (section, element, item, fill) per body node, see xmlgen.incremental
+        self.build = self._compile(data, etree.Element, etree.SubElement)
+
+    def _compile(self, data, Element, SubElement):
+        text = _text_function(data.get("empty", ""), data.get("booleans"))
+        nodes = []
+        for node in data["body"]:
+            fields = node.get("fields")
+            if fields is not None:
+                node = dict(node, fields=[tuple(field) if isinstance(field, list)
+                                          else (field, field) for field in fields])
+            fill = _fill_function(node.get("fields"), SubElement, text)
+            nodes.append(_node_function(node, fill, SubElement))
+            self.nodes.append((node["section"], node.get("element"), node.get("item"), fill))
+        root_name = self.root
+
+        def build(sections):
+            root = Element(root_name)
+            for emit in nodes:
+                emit(root, sections)
+            return root
+        return build
+
+    def serialize(self, root, method=DEFAULT_PRETTY_METHOD):
+        """The document as UTF-8 bytes; method applies to etree schemas."""
+        if self.library == "lxml":
+            return self.etree.tostring(root, pretty_print=True, xml_declaration=True,
+                                       encoding="UTF-8")
+        return pretty_xml(root, method).encode("utf-8")
+
+    def render(self, sections, method=DEFAULT_PRETTY_METHOD):
+        return self.serialize(self.build(sections), method)
+
+    def __repr__(self):
+        return f"Schema({self.source!r}, root={self.root!r})"
+
+
+# path -> (modification time, Schema)
+_schemas = {}
+# bundled name -> Schema; those files only change with the package
+_bundled = {}
+
+
+def schema_path(name):
+    """The file of a bundled schema name (v1, v2) or of a path."""
+    if os.sep not in name and "/" not in name and not name.endswith(".json"):
+        return os.path.join(SCHEMA_DIR, name + ".json")
+    return name
+
+
+def bundled_schemas():
+    return sorted(os.path.splitext(name)[0] for name in os.listdir(SCHEMA_DIR)
+                  if name.endswith(".json"))
+
+
+def load_schema(name):
+    """The compiled Schema for a bundled name or a schema file, compiled
+    again only when the file changes."""
+    schema = _bundled.get(name)
+    if schema is not None:
+        return schema
+    path = schema_path(name)
+    try:
+        mtime = os.stat(path).st_mtime_ns
+    except FileNotFoundError:
+        raise SchemaError(f"no schema {name!r}; bundled ones are "
+                          f"{', '.join(bundled_schemas())}") from None
+    cached = _schemas.get(path)
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
+    with open(path, encoding="utf-8") as file:
+        try:
+            data = json.load(file)
+        except json.JSONDecodeError as e:
+            raise SchemaError(f"{path}: {e}") from None
+    schema = Schema(data, source=path)
+    _schemas[path] = (mtime, schema)
+    if path != name:
+        _bundled[name] = schema
+    return schema
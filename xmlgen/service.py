@@ -0,0 +1,342 @@
+"""A small HTTP service around both generators, for other programs to call.
+
+``python -m xmlgen serve --port 8080`` answers
+
+* ``POST /convert`` with a workbook as the request body: the V2.2 XML for
+  it. ``?journal=KEY`` fills the journal fields from a journal profile
+  (see xmlgen.journals) and ``?complete_dates=1`` completes the
+  publication dates (see xmlgen.dates); ``serve --complete-dates`` makes
+  that the default.
+* ``POST /form`` with the form app's JSON (ArticleForm.to_dict()): the V1
+  XML for it. ``?pretty=indent`` picks the faster indentation (see
+  xmlgen.pretty).
+
+Both take ``?normalize_fa=1`` (or ``0``) to normalize the Persian fields,
+see xmlgen.persian; ``serve --normalize-fa`` makes it the default.
+* ``GET /metrics``: request counts, latency percentiles and queue depth.
+* ``GET /health``
+
+Conversions run on a process pool. At most ``workers + queue`` of them are
+accepted at a time; further requests get 503 with Retry-After straight
+away instead of piling up, so callers can back off. Only the standard
+library is used for the server itself; it speaks plain HTTP/1.1 and is
+meant to sit behind the submission system on a trusted network, not to
+face the internet.
+
+    curl --data-binary @article.xlsx http://localhost:8080/convert
+"""
+
+import asyncio
+import collections
+import io
+import json
+import multiprocessing
+import os
+import signal
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from http import HTTPStatus
+from urllib.parse import parse_qs, urlsplit
+
+from .converter import convert_workbook
+from .journals import journal_rows
+from .metrics import LATENCY_WINDOW, latency_summary
+from .model import ArticleForm, form_xml
+from .persian import normalize_form
+from .pretty import DEFAULT_PRETTY_METHOD, PRETTY_METHODS
+from .readers import DEFAULT_BACKEND
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8080
+# Conversions that may wait for a worker, per worker, before requests get 503
+DEFAULT_QUEUE_PER_WORKER = 2
+# Largest request body accepted
+MAX_BODY = 50 * 1024 * 1024
+# Seconds a client may take to send its request line and headers
+HEADER_TIMEOUT = 30.0
+# Seconds a client may take to send the body once the headers are in
+BODY_TIMEOUT = 60.0
+
+XML_TYPE = "application/xml; charset=utf-8"
+JSON_TYPE = "application/json; charset=utf-8"
+
+
+class HTTPError(Exception):
+    """Answer the request with status and a JSON error message."""
+
+    def __init__(self, status, message=None, headers=()):
+        super().__init__(message or status.phrase)
+        self.status = status
+        self.headers = headers
+
+
+# Run in the worker processes
+
+def _convert_upload(data, backend, plan, journal, normalize_fa, complete_dates):
+    return convert_workbook(io.BytesIO(data), backend, plan, journal_rows=journal,
+                            normalize_fa=normalize_fa, complete_dates=complete_dates)
+
+
+def _form_upload(data, method, normalize_fa):
+    form = ArticleForm.from_dict(data)
+    if normalize_fa:
+        normalize_form(form)
+    return form_xml(form, method).encode("utf-8")
+
+
+class ConversionService:
+    """The HTTP service; start() it on a running event loop, or use serve().
+
+    port=0 binds a free port, available as .port once started.
+    """
+
+    def __init__(self, host=DEFAULT_HOST, port=DEFAULT_PORT, workers=None, queue=None,
+                 backend=DEFAULT_BACKEND, plan=None, journals=None, normalize_fa=False,
+                 complete_dates=False):
+        self.host = host
+        self.port = port
+        self.workers = workers or os.cpu_count() or 1
+        self.queue = self.workers * DEFAULT_QUEUE_PER_WORKER if queue is None else queue
+        self.backend = backend
+        self.plan = plan
+        self.journals = journals  # JournalStore for ?journal=, or None
+        self.normalize_fa = normalize_fa  # Default for ?normalize_fa=
+        self.complete_dates = complete_dates  # Default for ?complete_dates=
+
+        self.pending = 0  # Accepted conversions, running or waiting for a worker
+        self.peak_pending = 0
+        self.counts = collections.Counter()  # Responses by status code
+        self.rejected = 0  # 503s because the pool was full
+        self.latencies = collections.deque(maxlen=LATENCY_WINDOW)
+        self.started = time.time()
+        self._executor = None
+        self._server = None
+
+    @property
+    def limit(self):
+        return self.workers + self.queue
+
+    def _new_pool(self):
+        # Spawned, not forked: a forked worker would inherit the sockets of the
+        # open connections and keep them from closing
+        return ProcessPoolExecutor(max_workers=self.workers,
+                                   mp_context=multiprocessing.get_context("spawn"))
+
+    async def start(self):
+        self._executor = self._new_pool()
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self
+
+    async def close(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+    def stats(self):
+        return {
+            "started": self.started,
+            "uptime_seconds": round(time.time() - self.started, 3),
+            "workers": self.workers,
+            "queue_limit": self.queue,
+            "requests": sum(self.counts.values()),
+            "responses": {str(status): count for status, count in sorted(self.counts.items())},
+            "rejected": self.rejected,
+            "queue_depth": {
+                "pending": self.pending,
+                "running": min(self.pending, self.workers),
+                "waiting": max(0, self.pending - self.workers),
+                "peak": self.peak_pending,
+            },
+            "latency_seconds": latency_summary(self.latencies, (0.5, 0.95, 0.99)),
+        }
+
+    async def _offload(self, func, *args):
+        """Run func(*args) on the pool, or raise 503 if the pool is full."""
+        if self.pending >= self.limit:
+            self.rejected += 1
+            raise HTTPError(HTTPStatus.SERVICE_UNAVAILABLE,
+                            f"{self.pending} conversions in progress, try again later",
+                            (("Retry-After", "1"),))
+        self.pending += 1
+        self.peak_pending = max(self.peak_pending, self.pending)
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, func, *args)
+        except BrokenProcessPool:
+            # A worker died (e.g. out of memory); start a fresh pool for the next request
+            self._executor.shutdown(wait=False)
+            self._executor = self._new_pool()
+            raise HTTPError(HTTPStatus.INTERNAL_SERVER_ERROR, "worker process died")
+        finally:
+            self.pending -= 1
+
+    def _flag(self, query, name):
+        """The ?name= switch of the request, or the service's default for it."""
+        value = query.get(name, [None])[0]
+        if value is None:
+            return getattr(self, name)
+        return value.strip().casefold() in ("1", "yes", "true", "on")
+
+    def _journal(self, query):
+        key = query.get("journal", [None])[0]
+        if not key:
+            return None
+        found = self.journals.find(key) if self.journals is not None else None
+        if found is None:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, f"no journal profile for {key!r}")
+        return journal_rows(found[1])
+
+    async def route(self, method, path, query, body):
+        """Return (status, content type, body bytes) for one request."""
+        if path == "/convert":
+            if method != "POST":
+                raise HTTPError(HTTPStatus.METHOD_NOT_ALLOWED, headers=(("Allow", "POST"),))
+            if not body:
+                raise HTTPError(HTTPStatus.BAD_REQUEST, "send the workbook as the request body")
+            try:
+                xml = await self._offload(_convert_upload, body, self.backend, self.plan,
+                                          self._journal(query),
+                                          self._flag(query, "normalize_fa"),
+                                          self._flag(query, "complete_dates"))
+            except HTTPError:
+                raise
+            except Exception as e:  # Not a workbook, or not one in the template's layout
+                raise HTTPError(HTTPStatus.UNPROCESSABLE_ENTITY, f"{type(e).__name__}: {e}")
+            return HTTPStatus.OK, XML_TYPE, xml
+        if path == "/form":
+            if method != "POST":
+                raise HTTPError(HTTPStatus.METHOD_NOT_ALLOWED, headers=(("Allow", "POST"),))
+            pretty = query.get("pretty", [DEFAULT_PRETTY_METHOD])[0]
+            if pretty not in PRETTY_METHODS:
+                raise HTTPError(HTTPStatus.BAD_REQUEST,
+                                f"pretty must be one of {', '.join(PRETTY_METHODS)}")
+            try:
+                data = json.loads(body)
+                if not isinstance(data, dict):
+                    raise ValueError("expected a JSON object")
+            except ValueError as e:  # Includes JSONDecodeError and bad UTF-8
+                raise HTTPError(HTTPStatus.BAD_REQUEST, f"invalid JSON: {e}")
+            try:
+                xml = await self._offload(_form_upload, data, pretty,
+                                          self._flag(query, "normalize_fa"))
+            except HTTPError:
+                raise
+            except (TypeError, AttributeError) as e:  # Unknown fields or wrong shapes
+                raise HTTPError(HTTPStatus.UNPROCESSABLE_ENTITY, f"{type(e).__name__}: {e}")
+            return HTTPStatus.OK, XML_TYPE, xml
+        if path in ("/metrics", "/health"):
+            if method != "GET":
+                raise HTTPError(HTTPStatus.METHOD_NOT_ALLOWED, headers=(("Allow", "GET"),))
+            data = self.stats() if path == "/metrics" else {"status": "ok"}
+            return HTTPStatus.OK, JSON_TYPE, json.dumps(data, indent=2).encode("utf-8")
+        raise HTTPError(HTTPStatus.NOT_FOUND)
+
+    async def _read_request(self, reader):
+        """Return (method, target, headers, body), or None once the client is done."""
+        try:
+            head = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), HEADER_TIMEOUT)
+        except (asyncio.IncompleteReadError, asyncio.TimeoutError, ConnectionError):
+            return None
+        except asyncio.LimitOverrunError:
+            raise HTTPError(HTTPStatus.REQUEST_HEADER_FIELDS_TOO_LARGE)
+        lines = head.decode("latin-1").split("\r\n")
+        try:
+            method, target, version = lines[0].split(" ")
+        except ValueError:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "malformed request line")
+        headers = {}
+        for line in lines[1:]:
+            if line:
+                name, _, value = line.partition(":")
+                headers[name.strip().lower()] = value.strip()
+        headers[":version"] = version
+        if "chunked" in headers.get("transfer-encoding", "").lower():
+            raise HTTPError(HTTPStatus.LENGTH_REQUIRED, "send a Content-Length")
+        try:
+            length = int(headers.get("content-length", 0))
+        except ValueError:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "bad Content-Length")
+        if length > MAX_BODY:
+            raise HTTPError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE,
+                            f"bodies are limited to {MAX_BODY // (1024 * 1024)} MiB")
+        try:
+            body = await asyncio.wait_for(reader.readexactly(length), BODY_TIMEOUT) \
+                if length else b""
+        except asyncio.TimeoutError:
+            # Don't let a stalled upload hold the connection open forever
+            raise HTTPError(HTTPStatus.REQUEST_TIMEOUT,
+                            f"the body did not arrive within {BODY_TIMEOUT:g} seconds")
+        return method, target, headers, body
+
+    @staticmethod
+    def _keep_alive(headers):
+        connection = headers.get("connection", "").lower()
+        if headers.get(":version") == "HTTP/1.0":
+            return connection == "keep-alive"
+        return connection != "close"
+
+    async def _handle(self, reader, writer):
+        try:
+            while True:
+                start = time.perf_counter()
+                extra = ()
+                keep_alive = False
+                try:
+                    request = await self._read_request(reader)
+                    if request is None:
+                        break
+                    method, target, headers, body = request
+                    keep_alive = self._keep_alive(headers)
+                    url = urlsplit(target)
+                    status, content_type, payload = await self.route(
+                        method, url.path, parse_qs(url.query), body)
+                except HTTPError as e:
+                    status, content_type, extra = e.status, JSON_TYPE, e.headers
+                    payload = json.dumps({"error": str(e)}).encode("utf-8")
+                except asyncio.IncompleteReadError:
+                    break  # Client went away mid-body
+                except Exception as e:
+                    status, content_type = HTTPStatus.INTERNAL_SERVER_ERROR, JSON_TYPE
+                    payload = json.dumps({"error": f"{type(e).__name__}: {e}"}).encode("utf-8")
+                head = [f"HTTP/1.1 {status.value} {status.phrase}",
+                        f"Content-Type: {content_type}",
+                        f"Content-Length: {len(payload)}",
+                        f"Connection: {'keep-alive' if keep_alive else 'close'}"]
+                head.extend(f"{name}: {value}" for name, value in extra)
+                writer.write(("\r\n".join(head) + "\r\n\r\n").encode("latin-1") + payload)
+                await writer.drain()
+                self.counts[status.value] += 1
+                if status != HTTPStatus.SERVICE_UNAVAILABLE:
+                    # Instant rejections would flatter the latencies
+                    self.latencies.append(time.perf_counter() - start)
+                if not keep_alive:
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+
+async def serve(service):
+    """Run service until SIGINT or SIGTERM."""
+    await service.start()
+    print(f"Serving on http://{service.host}:{service.port} "
+          f"({service.workers} workers, queue {service.queue})", flush=True)
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for signum in (signal.SIGINT, getattr(signal, "SIGTERM", None)):
+        try:
+            loop.add_signal_handler(signum, stop.set)
+        except (NotImplementedError, TypeError, ValueError):  # Windows
+            pass
+    try:
+        await stop.wait()
+    finally:
+        await service.close()
+    return 0
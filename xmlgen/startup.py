@@ -0,0 +1,171 @@
+"""Startup helpers for the desktop apps: import timing and background pre-warm.
+
+Run either app with ``--startup-report`` to print how long each module took
+to import and how long it took until the window was first idle, or with
+``--startup-report=FILE`` to append the same numbers to FILE as one JSON
+line (handy for comparing packaged builds). ``--no-prewarm`` turns off the
+background import of the conversion engine.
+
+This module only uses the standard library so it is cheap to import first.
+"""
+
+import importlib
+import json
+import sys
+import threading
+import time
+
+REPORT_FLAG = "--startup-report"
+NO_PREWARM_FLAG = "--no-prewarm"
+
+# Wait this long after the window is idle before pre-warming
+PREWARM_DELAY_MS = 200
+
+
+class _TimedLoader:
+    """Forward everything to the real loader, timing module creation and
+    execution (extension modules do their work in create_module)."""
+
+    def __init__(self, loader, timer, name):
+        self._loader = loader
+        self._timer = timer
+        self._name = name
+
+    def __getattr__(self, attribute):
+        return getattr(self._loader, attribute)
+
+    def create_module(self, spec):
+        self._timer.enter()
+        create = getattr(self._loader, "create_module", None)
+        try:
+            return create(spec) if create is not None else None
+        except BaseException:
+            self._timer.leave(self._name)
+            raise
+
+    def exec_module(self, module):
+        try:
+            self._loader.exec_module(module)
+        finally:
+            self._timer.leave(self._name)
+
+
+class _TimingFinder:
+    """Meta path finder that wraps the loaders found by the finders after it."""
+
+    def __init__(self, timer):
+        self._timer = timer
+
+    def find_spec(self, name, path=None, target=None):
+        if threading.current_thread() is not self._timer.thread:
+            return None
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, "find_spec"):
+                continue
+            spec = finder.find_spec(name, path, target)
+            if spec is not None:
+                if spec.loader is not None and hasattr(spec.loader, "exec_module"):
+                    spec.loader = _TimedLoader(spec.loader, self._timer, name)
+                return spec
+        return None
+
+
+class ImportTimer:
+    """Record the self and cumulative import time of every module loaded
+    by the installing thread while installed."""
+
+    def __init__(self):
+        self.records = []  # (module, self seconds, cumulative seconds)
+        self.thread = threading.current_thread()
+        self._stack = []
+        self._finder = _TimingFinder(self)
+
+    def install(self):
+        sys.meta_path.insert(0, self._finder)
+
+    def uninstall(self):
+        if self._finder in sys.meta_path:
+            sys.meta_path.remove(self._finder)
+
+    def enter(self):
+        # [start time, time spent importing nested modules]
+        self._stack.append([time.perf_counter(), 0.0])
+
+    def leave(self, name):
+        start, nested = self._stack.pop()
+        total = time.perf_counter() - start
+        if self._stack:
+            self._stack[-1][1] += total
+        self.records.append((name, total - nested, total))
+
+    def slowest(self, count=15):
+        return sorted(self.records, key=lambda record: record[1], reverse=True)[:count]
+
+
+class StartupTimer:
+    """Time an app's imports and how long until its window is first idle."""
+
+    def __init__(self, app, output=None, started=None):
+        self.app = app
+        self.output = output
+        self.started = time.perf_counter() if started is None else started
+        self.imports = ImportTimer()
+        self.imports.install()
+
+    @classmethod
+    def from_argv(cls, app, argv=None, started=None):
+        """Return a running StartupTimer if the report flag was given, else None."""
+        for arg in sys.argv[1:] if argv is None else argv:
+            if arg == REPORT_FLAG:
+                return cls(app, None, started)
+            if arg.startswith(REPORT_FLAG + "="):
+                return cls(app, arg.split("=", 1)[1], started)
+        return None
+
+    def watch(self, root):
+        """Finish the report once root's window has been drawn and is idle."""
+        root.after_idle(self.finish)
+
+    def finish(self):
+        self.imports.uninstall()
+        window_seconds = time.perf_counter() - self.started
+        if self.output:
+            report = {
+                "app": self.app,
+                "time": time.time(),
+                "first_window_ms": round(window_seconds * 1000, 1),
+                "imports": [{"module": name, "self_ms": round(own * 1000, 2),
+                             "cumulative_ms": round(total * 1000, 2)}
+                            for name, own, total in self.imports.records],
+            }
+            with open(self.output, "a", encoding="utf-8") as file:
+                file.write(json.dumps(report) + "\n")
+            return
+
+        lines = [f"Startup report for {self.app}",
+                 f"  first window idle after {window_seconds * 1000:8.1f} ms",
+                 f"  {len(self.imports.records)} modules imported, slowest first:",
+                 f"  {'self ms':>9} {'cumul. ms':>9}  module"]
+        for name, own, total in self.imports.slowest():
+            lines.append(f"  {own * 1000:9.1f} {total * 1000:9.1f}  {name}")
+        print("\n".join(lines), file=sys.stderr)
+
+
+def _import_all(modules):
+    for module in modules:
+        try:
+            importlib.import_module(module)
+        except ImportError:
+            pass  # The first real use reports missing dependencies
+
+
+def prewarm(root, modules, argv=None):
+    """Import modules on a background thread shortly after root is idle,
+    so the first conversion does not pay for them."""
+    if NO_PREWARM_FLAG in (sys.argv[1:] if argv is None else argv):
+        return
+
+    def start():
+        threading.Thread(target=_import_all, args=(modules,), name="prewarm", daemon=True).start()
+
+    root.after_idle(lambda: root.after(PREWARM_DELAY_MS, start))
@@ -0,0 +1,138 @@
+"""Synthetic articles for benchmarks, shaped like ``TemplateFinal.xlsx``.
+
+One seeded random article is generated as plain values and then either
+written as a workbook with the template's sheets and tag rows (plus
+Abstract and Abstract_FA rows, which real submissions carry) or turned into
+the form app's ArticleForm. Sizes are configurable: number of authors,
+words per abstract and the share of Persian words in free text.
+"""
+
+import os
+import random
+
+from .model import (ARTICLE_FIELD_TAGS, ARTICLE_TAGS, AUTHOR_FIELD_TAGS, AUTHOR_TAGS,
+                    JOURNAL_FIELD_TAGS, JOURNAL_TAGS, Article, ArticleForm, Author, Journal,
+                    PubDate)
+
+ENGLISH_WORDS = (
+    "clinical", "study", "patients", "results", "analysis", "treatment", "risk", "model",
+    "cohort", "data", "effect", "outcome", "health", "trial", "method", "association",
+    "significant", "group", "disease", "sample", "survey", "care", "factor", "response",
+)
+PERSIAN_WORDS = (
+    "بیمار", "مطالعه", "نتایج", "درمان", "تحلیل", "سلامت", "روش", "گروه",
+    "بیماری", "خطر", "پژوهش", "داده", "اثر", "نمونه", "مراقبت", "عوامل",
+    "کیفیت", "زندگی", "دانشگاه", "پزشکی", "ایران", "تهران", "بررسی", "ارزیابی",
+)
+
+
+def words(rng, count, persian=0.5):
+    """count random words, a share persian of them Persian."""
+    return " ".join(rng.choice(PERSIAN_WORDS if rng.random() < persian else ENGLISH_WORDS)
+                    for _ in range(count))
+
+
+def _orcid(rng):
+    digits = f"{rng.randrange(10 ** 15):015d}"
+    total = 0
+    for digit in digits:
+        total = (total + int(digit)) * 2
+    check = (12 - total % 11) % 11
+    digits += "X" if check == 10 else str(check)
+    return "-".join(digits[i:i + 4] for i in range(0, 16, 4))
+
+
+def article_values(seed=0, authors=3, abstract_words=200, persian=0.5):
+    """One synthetic article as (journal, article, authors) dicts keyed by tag."""
+    rng = random.Random(seed)
+    start_page = rng.randrange(1, 400)
+    journal = {
+        "Journal_Title": "Journal of " + words(rng, 3, 0),
+        "Journal_Title_FA": "مجله " + words(rng, 3, 1),
+        "Short_Title": f"J{seed % 1000}",
+        "Subject": words(rng, 2, persian),
+        "Web_URL": f"https://journal{seed % 100}.example.org",
+        "Journal_HBI_System_ID": str(rng.randrange(10 ** 6)),
+        "Journal_HBI_System_User": f"user{rng.randrange(1000)}",
+        "Journal_ISSN": f"{rng.randrange(10 ** 4):04d}-{rng.randrange(10 ** 4):04d}",
+        "Journal_ISSN_Online": None,
+        "Journal_ID_PII": None,
+        "Journal_DOI": f"10.{rng.randrange(1000, 99999)}/j{seed}",
+        "Journal_ID_IranMedex": None,
+        "Journal_ID_Magiran": str(rng.randrange(10 ** 4)),
+        "Journal_ID_SID": None,
+        "Journal_ID_NLAI": None,
+        "Journal_ID_Science": None,
+        "Language": rng.choice(("en", "fa")),
+        "Volume": rng.randrange(1, 40),
+        "Number": rng.randrange(1, 13),
+    }
+    article = {
+        "Article_Title": words(rng, 10, 0).capitalize(),
+        "Articl_Title_FA": words(rng, 10, 1),
+        "Subject": words(rng, 2, 0),
+        "Subject_FA": words(rng, 2, 1),
+        "Content_Type": "Original Article",
+        "Content_Type_FA": "مقاله پژوهشی",
+        "Start_Page": start_page,
+        "End_Page": start_page + rng.randrange(3, 20),
+        "Web_URL": f"https://journal{seed % 100}.example.org/article/{seed}",
+        "Keywords": ", ".join(words(rng, 2, 0) for _ in range(5)),
+        "Keywords_FA": "، ".join(words(rng, 2, 1) for _ in range(5)),
+        "Abstract": words(rng, abstract_words, persian),
+        "Abstract_FA": words(rng, abstract_words, 1 - persian),
+    }
+    author_rows = []
+    for number in range(authors):
+        first, last = words(rng, 1, 0).title(), words(rng, 1, 0).title()
+        author_rows.append({
+            "First_Name": first, "Middle_Name": None, "Last_Name": last, "Suffix": None,
+            "First_Name_FA": words(rng, 1, 1), "Middle_Name_FA": None,
+            "Last_Name_FA": words(rng, 1, 1), "Suffix_FA": None,
+            "Email": f"{first}.{last}{number}@example.org".lower(),
+            "Code": str(number + 1),
+            "ORCID": _orcid(rng),
+            "Core_Author_Yes_No": "Yes" if number == 0 else "No",
+            "Affiliation": "Department of " + words(rng, 2, 0),
+            "Affiliation_FA": "دانشکده " + words(rng, 2, 1),
+        })
+    return journal, article, author_rows
+
+
+def write_workbook(path, journal, article, authors):
+    """Write article_values() output as a TemplateFinal-shaped workbook."""
+    from .importer import write_workbook
+
+    author_rows = [[None] + [f"Author {number}" for number in range(1, len(authors) + 1)]]
+    author_rows.extend([tag] + [author[tag] for author in authors] for tag in AUTHOR_TAGS)
+    return write_workbook(path, [(tag, journal[tag]) for tag in JOURNAL_TAGS],
+                          [(tag, article[tag]) for tag in ARTICLE_TAGS], author_rows)
+
+
+def write_workbooks(directory, count, seed=0, **sizes):
+    """Write count synthetic workbooks into directory and return their paths."""
+    os.makedirs(directory, exist_ok=True)
+    return [write_workbook(os.path.join(directory, f"article_{seed + number:05d}.xlsx"),
+                           *article_values(seed + number, **sizes))
+            for number in range(count)]
+
+
+def _text(value):
+    return "" if value is None else str(value)
+
+
+def make_form(journal, article, authors):
+    """Turn article_values() output into the form app's ArticleForm."""
+    form = ArticleForm(
+        Journal(**{field: _text(journal[tag]) for field, tag in JOURNAL_FIELD_TAGS.items()}),
+        [PubDate(type="epublish", year="2024", month="1", day="15")],
+        Article(**{field: _text(article[tag]) for field, tag in ARTICLE_FIELD_TAGS.items()}))
+    for author in authors:
+        values = {field: _text(author[tag]) for field, tag in AUTHOR_FIELD_TAGS.items()}
+        values["coreauthor"] = author["Core_Author_Yes_No"] == "Yes"
+        form.authors.append(Author(**values))
+    return form
+
+
+def make_forms(count, seed=0, **sizes):
+    return [make_form(*article_values(seed + number, **sizes)) for number in range(count)]
@@ -0,0 +1,233 @@
+"""Compile TemplateFinal.xlsx into a reusable conversion plan.
+
+The generic converter rediscovers every workbook's layout from its tag
+column. A TemplatePlan fixes that layout once: for each sheet it records
+the tag names (validated as XML names up front), the row each value lives
+in and how the value is coerced to text, taken from the type of the
+template's own value cell. Converting with a plan is then a fingerprint
+check of the workbook's tag column followed by straight row lookups.
+
+Plans are memoized per template content and can be stored as JSON in a
+cache directory, so the template itself is only parsed once.
+"""
+
+import datetime
+import hashlib
+import json
+import os
+
+import openpyxl
+
+from .readers import ARTICLE_SHEET, AUTHOR_SHEET, JOURNAL_SHEET, _last_filled
+from .schema import XML_NAME
+
+DEFAULT_TEMPLATE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                "Version 2", "TemplateFinal.xlsx")
+
+# Bump when the plan format or the compiled coercions change
+PLAN_VERSION = 1
+
+
+class TemplateError(ValueError):
+    """The template cannot be compiled into a plan."""
+
+
+class TemplateMismatchError(ValueError):
+    """A workbook's layout does not match the compiled template."""
+
+
+def _text(value):
+    return str(value)
+
+
+def _number(value):
+    # Whole floats are written without the trailing ".0"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+
+def _date(value):
+    if isinstance(value, datetime.datetime) and value.time() == datetime.time():
+        return value.date().isoformat()
+    if isinstance(value, (datetime.date, datetime.time)):
+        return value.isoformat()
+    return str(value)
+
+
+COERCIONS = {"text": _text, "number": _number, "date": _date}
+
+
+def _coercion_for(value):
+    if isinstance(value, bool):
+        return "text"
+    if isinstance(value, (int, float)):
+        return "number"
+    if isinstance(value, (datetime.date, datetime.time)):
+        return "date"
+    return "text"
+
+
+class TemplatePlan:
+    """Compiled layout of a template.
+
+    journal and article are tuples of (tag, row, coercion) with row the
+    0-based index into the sheet's rows below the header row. authors is
+    the same for the author attributes, whose values are read from every
+    column after the first. labels holds each sheet's expected tag column.
+    """
+
+    __slots__ = ("journal", "article", "authors", "labels", "fingerprint", "source")
+
+    def __init__(self, journal, article, authors, labels, source=None):
+        self.journal = tuple(journal)
+        self.article = tuple(article)
+        self.authors = tuple(authors)
+        self.labels = {sheet: tuple(column) for sheet, column in labels.items()}
+        self.source = source
+        digest = hashlib.sha256(str(PLAN_VERSION).encode("ascii"))
+        for sheet in (JOURNAL_SHEET, ARTICLE_SHEET, AUTHOR_SHEET):
+            digest.update(json.dumps([sheet, self.labels[sheet]], ensure_ascii=False).encode("utf-8"))
+        digest.update(json.dumps([self.journal, self.article, self.authors]).encode("utf-8"))
+        self.fingerprint = digest.hexdigest()[:16]
+
+    def to_dict(self):
+        return {"version": PLAN_VERSION, "source": self.source, "journal": self.journal,
+                "article": self.article, "authors": self.authors, "labels": self.labels}
+
+    @classmethod
+    def from_dict(cls, data):
+        if data.get("version") != PLAN_VERSION:
+            raise TemplateError("Stored plan was compiled by a different version")
+        return cls([tuple(entry) for entry in data["journal"]],
+                   [tuple(entry) for entry in data["article"]],
+                   [tuple(entry) for entry in data["authors"]],
+                   data["labels"], data.get("source"))
+
+    def check(self, sheet, labels):
+        """Raise TemplateMismatchError unless labels is the tag column of sheet."""
+        expected = self.labels[sheet]
+        if labels == expected:
+            return
+        for row, (want, found) in enumerate(zip(expected, labels), start=2):
+            if want != found:
+                raise TemplateMismatchError(
+                    f"'{sheet}' row {row}: expected {want!r}, found {found!r}")
+        raise TemplateMismatchError(
+            f"'{sheet}' has {len(labels)} tag rows, the template has {len(expected)}")
+
+
+def _tag_column(rows):
+    """The first-column labels of rows, without trailing empty rows."""
+    labels = [row[0] if row and row[0] != "" else None for row in rows]
+    while labels and labels[-1] is None:
+        labels.pop()
+    return tuple(labels)
+
+
+def _sheet_rows(book, sheet, max_col=None):
+    return list(book[sheet].iter_rows(min_row=2, max_col=max_col, values_only=True))
+
+
+def _compile_sheet(sheet, rows, value_column, errors):
+    entries = []
+    for index, row in enumerate(rows):
+        tag = row[0] if row else None
+        if tag is None or tag == "":
+            continue
+        if not isinstance(tag, str) or not XML_NAME.match(tag):
+            errors.append(f"'{sheet}' row {index + 2}: {tag!r} is not a valid XML tag name")
+            continue
+        value = row[value_column] if value_column < len(row) else None
+        entries.append((tag, index, _coercion_for(value)))
+    return entries
+
+
+def compile_template(path=DEFAULT_TEMPLATE):
+    """Compile the template at path into a TemplatePlan, validating it."""
+    book = openpyxl.load_workbook(path, read_only=True, data_only=True)
+    try:
+        journal_rows = _sheet_rows(book, JOURNAL_SHEET, 2)
+        article_rows = _sheet_rows(book, ARTICLE_SHEET, 2)
+        author_rows = _sheet_rows(book, AUTHOR_SHEET)
+    finally:
+        book.close()
+
+    errors = []
+    journal = _compile_sheet(JOURNAL_SHEET, journal_rows, 1, errors)
+    article = _compile_sheet(ARTICLE_SHEET, article_rows, 1, errors)
+    # Author values are free text; use the first author column for coercions
+    authors = _compile_sheet(AUTHOR_SHEET, author_rows, 1, errors)
+    if errors:
+        raise TemplateError("Invalid template:\n" + "\n".join(errors))
+
+    labels = {JOURNAL_SHEET: _tag_column(journal_rows), ARTICLE_SHEET: _tag_column(article_rows),
+              AUTHOR_SHEET: _tag_column(author_rows)}
+    return TemplatePlan(journal, article, authors, labels, os.path.abspath(path))
+
+
+_plans = {}
+
+
+def load_plan(path=DEFAULT_TEMPLATE, cache_dir=None):
+    """Return the plan for the template at path, compiling it at most once.
+
+    Plans are memoized per template content in this process and, with
+    cache_dir, stored there as JSON for later runs.
+    """
+    with open(path, "rb") as file:
+        key = hashlib.sha256(file.read()).hexdigest()
+    plan = _plans.get(key)
+    if plan is not None:
+        return plan
+
+    stored = os.path.join(cache_dir, "plans", f"{key}.json") if cache_dir else None
+    if stored and os.path.exists(stored):
+        try:
+            with open(stored, encoding="utf-8") as file:
+                plan = TemplatePlan.from_dict(json.load(file))
+        except (TemplateError, ValueError, KeyError):
+            plan = None  # Recompile below
+    if plan is None:
+        plan = compile_template(path)
+        if stored:
+            os.makedirs(os.path.dirname(stored), exist_ok=True)
+            with open(stored, "w", encoding="utf-8") as file:
+                json.dump(plan.to_dict(), file, ensure_ascii=False)
+    _plans[key] = plan
+    return plan
+
+
+def _lookup(rows, entries, column):
+    for tag, index, coercion in entries:
+        value = rows[index][column] if column < len(rows[index]) else None
+        yield tag, None if value is None else COERCIONS[coercion](value)
+
+
+def read_with_plan(source, plan):
+    """Read a workbook laid out like plan's template.
+
+    Returns the same (journal_rows, article_rows, (attributes, authors))
+    structure as readers.read_workbook, with values already coerced to
+    text. Raises TemplateMismatchError if the tag columns differ.
+    """
+    book = openpyxl.load_workbook(source, read_only=True, data_only=True)
+    try:
+        journal_rows = _sheet_rows(book, JOURNAL_SHEET, 2)
+        article_rows = _sheet_rows(book, ARTICLE_SHEET, 2)
+        author_rows = _sheet_rows(book, AUTHOR_SHEET)
+        header = next(book[AUTHOR_SHEET].iter_rows(max_row=1, values_only=True), ())
+    finally:
+        book.close()
+
+    plan.check(JOURNAL_SHEET, _tag_column(journal_rows))
+    plan.check(ARTICLE_SHEET, _tag_column(article_rows))
+    plan.check(AUTHOR_SHEET, _tag_column(author_rows))
+
+    # Like the generic reader, a column counts as an author if any row reaches it
+    width = max(_last_filled(row) for row in [header] + author_rows)
+    authors = [tuple(_lookup(author_rows, plan.authors, column)) for column in range(1, width)]
+    return (list(_lookup(journal_rows, plan.journal, 1)),
+            list(_lookup(article_rows, plan.article, 1)),
+            ([tag for tag, _, _ in plan.authors], [tuple(value for _, value in author)
+                                                   for author in authors]))
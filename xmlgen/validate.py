@@ -0,0 +1,220 @@
+"""Check the identifiers of a batch before any XML is written.
+
+The journal ISSNs and DOI and the authors' ORCIDs and emails are written
+verbatim, and a bad check digit otherwise only shows when the indexer
+turns the upload down. Checked here:
+
+* ISSN (print and online): NNNN-NNNC with the mod-11 check digit C,
+* ORCID: 16 digits (any spelling normalize_orcid takes) with the
+  ISO 7064 11,2 check digit,
+* DOI: 10.NNNN/suffix, or just the 10.NNNN prefix for a journal,
+* email: one @ and a dotted domain, no spaces.
+
+Empty fields are not checked. The patterns are compiled at import and the
+last CHECK_CACHE_SIZE (kind, value) results are remembered: an issue
+repeats its journal's ISSN in every workbook, so most checks are a cache
+hit, while a long-running watch or serve process stays bounded.
+
+validate_workbooks() reads the batch on a process pool and returns one
+ValidationReport; report.to_dict() is the machine-readable form. With
+fail_fast it stops at the first workbook with a problem.
+"""
+
+import os
+import re
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+
+from .authors import normalize_orcid
+from .model import AUTHOR_FIELD_TAGS, JOURNAL_FIELD_TAGS
+from .pool import bounded_map
+
+# record is the author's number (from 1) for author fields, None otherwise;
+# field is None when the workbook could not be read at all
+Problem = namedtuple("Problem", "source sheet record field value error")
+
+_ISSN = re.compile(r"^(\d{4})-?(\d{3}[\dX])$")
+_DOI = re.compile(r"^10\.\d{4,9}(?:/\S+)?$")
+_DOI_PREFIX = re.compile(r"^(?:https?://(?:dx\.)?doi\.org/|doi:\s*)", re.IGNORECASE)
+_EMAIL = re.compile(r"^[^@\s]+@[^@\s.]+(?:\.[^@\s.]+)+$")
+
+
+def _check_digit(total):
+    digit = total % 11
+    return "X" if digit == 10 else str(digit)
+
+
+def issn_error(value):
+    match = _ISSN.match(value.upper())
+    if match is None:
+        return "not an ISSN (NNNN-NNNN)"
+    digits = match.group(1) + match.group(2)
+    total = sum(int(digit) * weight for digit, weight in zip(digits, range(8, 1, -1)))
+    expected = _check_digit(11 - total % 11)
+    if digits[7] != expected:
+        return f"bad ISSN check digit, expected {expected}"
+    return None
+
+
+def orcid_error(value):
+    orcid = normalize_orcid(value)
+    if orcid is None:
+        return "not an ORCID (0000-0000-0000-0000)"
+    digits = orcid.replace("-", "")
+    total = 0
+    for digit in digits[:15]:
+        total = (total + int(digit)) * 2
+    expected = _check_digit(12 - total % 11)
+    if digits[15] != expected:
+        return f"bad ORCID check digit, expected {expected}"
+    return None
+
+
+def doi_error(value):
+    if _DOI.match(_DOI_PREFIX.sub("", value)) is None:
+        return "not a DOI (10.NNNN/suffix)"
+    return None
+
+
+def email_error(value):
+    return None if _EMAIL.match(value) else "not an email address"
+
+
+CHECKS = {"issn": issn_error, "orcid": orcid_error, "doi": doi_error, "email": email_error}
+
+# Form field -> kind of identifier
+JOURNAL_CHECKS = {"journal_id_issn": "issn", "journal_id_issn_online": "issn",
+                  "journal_id_doi": "doi"}
+AUTHOR_CHECKS = {"orcid": "orcid", "email": "email"}
+# The same for workbook tags
+JOURNAL_TAG_CHECKS = {JOURNAL_FIELD_TAGS[field]: kind for field, kind in JOURNAL_CHECKS.items()}
+AUTHOR_TAG_CHECKS = {AUTHOR_FIELD_TAGS[field]: kind for field, kind in AUTHOR_CHECKS.items()}
+
+# (kind, value) results check() remembers
+CHECK_CACHE_SIZE = 16384
+
+
+@lru_cache(maxsize=CHECK_CACHE_SIZE, typed=True)
+def check(kind, value):
+    """The error in value as an identifier of kind, or None if it is valid
+    or empty."""
+    text = "" if value is None else str(value).strip()
+    return CHECKS[kind](text) if text else None
+
+
+def validate_rows(journal_rows, article_rows, author_table, source=None):
+    """Problems in what read_workbook returns."""
+    problems = []
+    for tag, value in journal_rows:
+        kind = JOURNAL_TAG_CHECKS.get(tag)
+        if kind is not None:
+            error = check(kind, value)
+            if error is not None:
+                problems.append(Problem(source, "Journal", None, tag, value, error))
+    attributes, authors = author_table
+    columns = [(index, attribute, AUTHOR_TAG_CHECKS[attribute])
+               for index, attribute in enumerate(attributes) if attribute in AUTHOR_TAG_CHECKS]
+    for number, values in enumerate(authors, 1):
+        for index, attribute, kind in columns:
+            value = values[index] if index < len(values) else None
+            error = check(kind, value)
+            if error is not None:
+                problems.append(Problem(source, "Author(s)", number, attribute, value, error))
+    return problems
+
+
+def validate_form(form, source=None):
+    """Problems in an ArticleForm; sheet is "journal" or "author"."""
+    problems = []
+    for field, kind in JOURNAL_CHECKS.items():
+        value = getattr(form.journal, field)
+        error = check(kind, value)
+        if error is not None:
+            problems.append(Problem(source, "journal", None, field, value, error))
+    for number, author in enumerate(form.authors, 1):
+        for field, kind in AUTHOR_CHECKS.items():
+            value = getattr(author, field)
+            error = check(kind, value)
+            if error is not None:
+                problems.append(Problem(source, "author", number, field, value, error))
+    return problems
+
+
+def describe(problem):
+    """One line for a person: "ORCID of author 2: '...': bad ORCID check digit"."""
+    if problem.field is None:
+        return problem.error
+    where = problem.field if problem.record is None else \
+        f"{problem.field} of author {problem.record}"
+    return f"{where}: {problem.value!r}: {problem.error}"
+
+
+class ValidationReport:
+    """The problems found in a batch, by workbook."""
+
+    def __init__(self):
+        self.checked = []  # Sources in the order they were checked
+        self.problems = []
+        self.stopped = False  # fail_fast stopped before the end of the batch
+
+    @property
+    def ok(self):
+        return not self.problems
+
+    def invalid_sources(self):
+        return list(dict.fromkeys(problem.source for problem in self.problems))
+
+    def to_dict(self):
+        return {
+            "ok": self.ok,
+            "checked": len(self.checked),
+            "invalid": self.invalid_sources(),
+            "stopped": self.stopped,
+            "problems": [dict(problem._asdict(), value=None if problem.value is None
+                              else str(problem.value)) for problem in self.problems],
+        }
+
+
+def _validate_job(args):
+    # The readers are only needed for batches; the form app checks forms
+    from .readers import read_workbook
+    from .template import read_with_plan
+
+    source, backend, plan, journal_rows = args
+    try:
+        rows = read_with_plan(source, plan) if plan is not None else read_workbook(source, backend)
+    except Exception as e:
+        return source, [Problem(source, None, None, None, None, f"{type(e).__name__}: {e}")]
+    if journal_rows is not None:
+        rows = (journal_rows,) + tuple(rows[1:])
+    return source, validate_rows(*rows, source=source)
+
+
+def validate_workbooks(sources, workers=None, backend="openpyxl", plan=None,
+                       journal_rows=None, fail_fast=False):
+    """Check every workbook in sources and return a ValidationReport.
+
+    Workbooks are read on a process pool (workers=1 reads them in this
+    process); journal_rows and plan are used as convert_workbook would. With
+    fail_fast the workbooks still queued are dropped at the first problem.
+    """
+    report = ValidationReport()
+    work = ((source, backend, plan, journal_rows) for source in sources)
+    if workers == 1:
+        checked, executor = map(_validate_job, work), None
+    else:
+        executor = ProcessPoolExecutor(max_workers=workers)
+        window = (workers or os.cpu_count() or 1) * 2
+        checked = bounded_map(executor, _validate_job, work, window)
+    try:
+        for source, problems in checked:
+            report.checked.append(source)
+            report.problems.extend(problems)
+            if problems and fail_fast:
+                report.stopped = True
+                break
+    finally:
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
+    return report
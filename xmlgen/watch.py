@@ -0,0 +1,292 @@
+"""Watch a folder and convert workbooks as they are dropped into it.
+
+``python -m xmlgen watch inbox/ -o xml/`` keeps running until interrupted.
+New or changed workbooks are converted once they have stopped changing for
+``settle`` seconds and look like complete .xlsx files, so a workbook that is
+still being copied in is not picked up half-written. Conversions run on a
+bounded process pool and each XML file is replaced atomically.
+
+File system events come from watchdog (inotify on Linux) when it is
+installed; without it the folder is polled, comparing only file sizes and
+modification times. Either way the folder is rescanned, events merely wake
+the scan early.
+
+A stats file, if given, is rewritten after every conversion with the
+counters from Watcher.stats(), including throughput and the latency from a
+file settling to its XML being written.
+"""
+
+import collections
+import json
+import os
+import signal
+import threading
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import partial
+
+from .converter import _is_workbook, _run_job
+from .metrics import LATENCY_WINDOW, latency_summary
+from .output import write_output
+from .readers import DEFAULT_BACKEND
+
+# Seconds a workbook's size and mtime must stay the same before converting it
+DEFAULT_SETTLE = 2.0
+# Seconds between scans when polling
+DEFAULT_INTERVAL = 1.0
+# Seconds between safety rescans when file system events are available
+EVENT_RESCAN = 30.0
+# Files that never become valid .xlsx are converted (and reported as failed)
+# after staying unchanged this many settle periods
+INCOMPLETE_SETTLES = 10
+
+
+def _signature(entry):
+    stat = entry.stat()
+    return stat.st_size, stat.st_mtime_ns
+
+
+class Watcher:
+    """Convert the workbooks under input_dir into output_dir as they appear.
+
+    Drive it with run(), or call step() repeatedly (e.g. from a test) to
+    scan, submit ready workbooks and collect finished conversions once.
+    """
+
+    def __init__(self, input_dir, output_dir, workers=None, settle=DEFAULT_SETTLE,
+                 interval=DEFAULT_INTERVAL, backend=DEFAULT_BACKEND, plan=None, cache=None,
+                 stats_file=None, recursive=True, use_events=True, profile=None,
+                 journal_rows=None, normalize_fa=False, incremental=False,
+                 complete_dates=False):
+        self.input_dir = os.path.abspath(input_dir)
+        self.output_dir = os.path.abspath(output_dir)
+        self.workers = workers or os.cpu_count() or 1
+        self.settle = settle
+        self.interval = interval
+        self.backend = backend
+        self.plan = plan
+        self.cache = cache
+        self.stats_file = stats_file
+        self.recursive = recursive
+        self.use_events = use_events
+        self.profile = profile
+        self.journal_rows = journal_rows
+        self.normalize_fa = normalize_fa
+        self.incremental = incremental
+        self.complete_dates = complete_dates
+
+        self.candidates = {}  # path -> (signature, time it was first seen)
+        self.converted = {}  # path -> signature of the last conversion
+        self.ready = collections.deque()  # (path, signature, settled time)
+        self.in_flight = {}  # future -> (path, signature, settled time)
+        self.counts = collections.Counter()
+        self.latencies = collections.deque(maxlen=LATENCY_WINDOW)
+        self.started = time.time()
+        self.wake = threading.Event()
+        self.stop_event = threading.Event()
+        self._executor = None
+        self._observer = None
+
+    def output_for(self, path):
+        relative = os.path.relpath(path, self.input_dir)
+        return os.path.join(self.output_dir, os.path.splitext(relative)[0] + ".xml")
+
+    def _scan(self):
+        """Yield (path, signature) for every workbook under input_dir."""
+        pending = [self.input_dir]
+        while pending:
+            directory = pending.pop()
+            try:
+                entries = list(os.scandir(directory))
+            except FileNotFoundError:
+                continue
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    # Don't feed our own output back in
+                    if self.recursive and entry.path != self.output_dir:
+                        pending.append(entry.path)
+                elif _is_workbook(entry.name) and entry.is_file():
+                    try:
+                        yield entry.path, _signature(entry)
+                    except FileNotFoundError:
+                        pass  # Removed while scanning
+
+    def _up_to_date(self, path, signature):
+        # Workbooks converted before the watcher started are not redone
+        try:
+            return os.stat(self.output_for(path)).st_mtime_ns >= signature[1]
+        except FileNotFoundError:
+            return False
+
+    def scan(self, now=None):
+        """Find workbooks that have settled and queue them for conversion."""
+        now = time.monotonic() if now is None else now
+        busy = {path for path, _, _ in self.in_flight.values()}
+        busy.update(path for path, _, _ in self.ready)
+        present = set()
+        for path, signature in self._scan():
+            present.add(path)
+            if path in busy or self.converted.get(path) == signature:
+                continue
+            if path not in self.converted and self._up_to_date(path, signature):
+                self.converted[path] = signature
+                continue
+            seen = self.candidates.get(path)
+            if seen is None or seen[0] != signature:
+                self.candidates[path] = (signature, now)  # New or still changing
+            elif now - seen[1] >= self.settle:
+                # A workbook still being written has no zip directory yet
+                if (zipfile.is_zipfile(path)
+                        or now - seen[1] >= self.settle * INCOMPLETE_SETTLES):
+                    del self.candidates[path]
+                    self.ready.append((path, signature, now))
+        for path in set(self.candidates).difference(present):
+            del self.candidates[path]
+        for path in set(self.converted).difference(present):
+            del self.converted[path]
+
+    def submit(self):
+        """Hand ready workbooks to the pool, at most two per worker at a time."""
+        if self.ready and self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers)
+        run = partial(_run_job, backend=self.backend,
+                      cache_dir=self.cache.directory if self.cache else None, plan=self.plan,
+                      profile=self.profile, journal_rows=self.journal_rows,
+                      normalize_fa=self.normalize_fa, incremental=self.incremental,
+                      complete_dates=self.complete_dates)
+        while self.ready and len(self.in_flight) < self.workers * 2:
+            path, signature, settled = self.ready.popleft()
+            future = self._executor.submit(run, (path, self.output_for(path)))
+            future.add_done_callback(lambda _: self.wake.set())
+            self.in_flight[future] = (path, signature, settled)
+
+    def collect(self):
+        """Record finished conversions; returns their ConversionResults."""
+        results = []
+        for future in [future for future in self.in_flight if future.done()]:
+            path, signature, settled = self.in_flight.pop(future)
+            # A failed workbook is retried once it changes, not on every scan
+            self.converted[path] = signature
+            try:
+                result = future.result()
+            except Exception as e:  # The worker process itself died
+                if isinstance(e, BrokenProcessPool):
+                    self._executor = None  # Start a fresh pool for the next workbook
+                self.counts["failed"] += 1
+                print(f"FAILED  {path}: {type(e).__name__}: {e}", flush=True)
+                continue
+            self.latencies.append(time.monotonic() - settled)
+            if result.ok:
+                self.counts["converted"] += 1
+                self.counts["cached"] += result.cached
+                self.counts["unchanged"] += result.unchanged
+                if self.cache is not None and result.cache_key:
+                    self.cache.record(result.cache_key, result.cached,
+                                      os.path.getsize(result.output))
+                status = "CACHED" if result.cached else "SAME" if result.unchanged else "OK"
+                print(f"{status:<8}{path} -> {result.output}", flush=True)
+            else:
+                self.counts["failed"] += 1
+                print(f"FAILED  {path}: {result.error}", flush=True)
+            results.append(result)
+        if results:
+            if self.cache is not None:
+                self.cache.save()
+            self.write_stats()
+        return results
+
+    def step(self, now=None):
+        self.scan(now)
+        self.submit()
+        return self.collect()
+
+    def stats(self):
+        uptime = time.time() - self.started
+        done = self.counts["converted"] + self.counts["failed"]
+        return {
+            "started": self.started,
+            "uptime_seconds": round(uptime, 3),
+            "converted": self.counts["converted"],
+            "failed": self.counts["failed"],
+            "cached": self.counts["cached"],
+            "unchanged": self.counts["unchanged"],
+            "waiting": len(self.candidates) + len(self.ready),
+            "in_flight": len(self.in_flight),
+            "per_minute": round(done * 60 / uptime, 3) if uptime else None,
+            "latency_seconds": latency_summary(self.latencies),
+        }
+
+    def write_stats(self):
+        if self.stats_file:
+            data = json.dumps(self.stats(), indent=2).encode("utf-8")
+            write_output(self.stats_file, data)
+
+    def _start_events(self):
+        """Wake the scan on file system events; False if watchdog is missing."""
+        try:
+            from watchdog.events import FileSystemEventHandler
+            from watchdog.observers import Observer
+        except ImportError:
+            return False
+        wake = self.wake
+
+        class Handler(FileSystemEventHandler):
+            def on_any_event(self, event):
+                wake.set()
+
+        self._observer = Observer()
+        self._observer.schedule(Handler(), self.input_dir, recursive=self.recursive)
+        self._observer.start()
+        return True
+
+    def _timeout(self, events):
+        timeout = EVENT_RESCAN if events else self.interval
+        if self.candidates:
+            # Come back when the oldest unsettled workbook may have settled
+            first_seen = min(seen for _, seen in self.candidates.values())
+            timeout = min(timeout, max(0.05, first_seen + self.settle - time.monotonic()))
+        return timeout
+
+    def run(self):
+        """Convert until stop() is called or the process is interrupted."""
+        os.makedirs(self.output_dir, exist_ok=True)
+        events = self.use_events and self._start_events()
+        print(f"Watching {self.input_dir} ({'events' if events else 'polling'}), "
+              f"writing to {self.output_dir}", flush=True)
+        self.write_stats()
+        try:
+            while not self.stop_event.is_set():
+                self.wake.clear()
+                self.step()
+                self.wake.wait(self._timeout(events))
+        finally:
+            self.close()
+
+    def stop(self):
+        self.stop_event.set()
+        self.wake.set()
+
+    def close(self):
+        if self._observer is not None:
+            self._observer.stop()
+            self._observer.join()
+            self._observer = None
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self.collect()
+            self._executor = None
+        self.write_stats()
+
+
+def run_watcher(watcher):
+    """Run watcher in the foreground, stopping cleanly on SIGINT or SIGTERM."""
+    def handle(signum, frame):
+        watcher.stop()
+
+    signal.signal(signal.SIGINT, handle)
+    if hasattr(signal, "SIGTERM"):
+        signal.signal(signal.SIGTERM, handle)
+    watcher.run()
+    return 0
@@ -0,0 +1,126 @@
+"""Write many articles into one XML document in constant memory.
+
+An issue (or a whole archive) becomes a single ``<issue>`` document whose
+children are the ``<article>`` trees produced by build_tree. The document
+is written with lxml's incremental ``etree.xmlfile`` writer: each article is
+built, written, flushed and dropped before the next one is read, so peak
+memory does not grow with the number of articles. The document is written
+next to the output and moved into place once it is complete, so a failed
+or cancelled run leaves no truncated file behind.
+"""
+
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from lxml import etree
+
+from .converter import ConversionResult, build_tree, read_rows
+from .output import temp_path
+from .pool import bounded_map
+from .readers import DEFAULT_BACKEND
+
+ISSUE_TAG = "issue"
+
+
+class IssueWriter:
+    """Incrementally write article elements into one pretty-printed document.
+
+    output only appears, complete, when the with block ends without an
+    error.
+
+        with IssueWriter("issue.xml") as issue:
+            for article in articles:
+                issue.write(article)
+    """
+
+    def __init__(self, output, root_tag=ISSUE_TAG):
+        self.output = output
+        self.root_tag = root_tag
+        self.count = 0
+        self._context = None
+
+    def __enter__(self):
+        self._partial = temp_path(self.output)
+        self._context = etree.xmlfile(self._partial, encoding="UTF-8")
+        self._file = self._context.__enter__()
+        self._file.write_declaration()
+        self._root = self._file.element(self.root_tag)
+        self._root.__enter__()
+        self._file.write("\n")
+        return self
+
+    def __exit__(self, *exc_info):
+        try:
+            try:
+                self._root.__exit__(*exc_info)
+            finally:
+                self._context.__exit__(*exc_info)
+            if exc_info[0] is None:
+                os.replace(self._partial, self.output)
+        finally:
+            if os.path.exists(self._partial):
+                os.unlink(self._partial)
+
+    def write(self, article):
+        # Indent the article as a child of the issue root, matching serialize()
+        etree.indent(article, level=1)
+        article.tail = "\n"
+        self._file.write("  ")
+        self._file.write(article)
+        self._file.flush()
+        self.count += 1
+
+
+def _read_job(args):
+    source, backend, plan, journal_rows, normalize_fa, complete_dates = args
+    start = time.perf_counter()
+    try:
+        rows = read_rows(source, backend, plan, journal_rows, normalize_fa, complete_dates)
+        error = None
+    except Exception as e:
+        rows, error = None, f"{type(e).__name__}: {e}"
+    return source, rows, error, time.perf_counter() - start
+
+
+def write_issue(sources, output, workers=None, backend=DEFAULT_BACKEND, plan=None,
+                journal_rows=None, normalize_fa=False, complete_dates=False):
+    """Convert every workbook in sources into one issue XML document.
+
+    Workbooks are read on a process pool (workers=1 reads them in this
+    process) and written in the order given. A workbook that fails to read
+    or build is left out of the document and reported in the returned list
+    of ConversionResult, one per source. plan is an optional TemplatePlan
+    to read the workbooks with; journal_rows replaces every workbook's
+    'Journal' sheet, normalize_fa normalizes the Persian fields and
+    complete_dates completes the publication dates.
+    """
+    parent = os.path.dirname(output)
+    if parent:
+        os.makedirs(parent, exist_ok=True)
+
+    jobs = ((source, backend, plan, journal_rows, normalize_fa, complete_dates)
+            for source in sources)
+    results = []
+    with IssueWriter(output) as issue:
+        if workers == 1:
+            read = map(_read_job, jobs)
+            executor = None
+        else:
+            executor = ProcessPoolExecutor(max_workers=workers)
+            window = (workers or os.cpu_count() or 1) * 2
+            read = bounded_map(executor, _read_job, jobs, window)
+        try:
+            for source, rows, error, seconds in read:
+                start = time.perf_counter()
+                if error is None:
+                    try:
+                        issue.write(build_tree(*rows))
+                    except Exception as e:
+                        error = f"{type(e).__name__}: {e}"
+                results.append(ConversionResult(source, output, error is None, error,
+                                                seconds + time.perf_counter() - start))
+        finally:
+            if executor is not None:
+                executor.shutdown()
+    return results